@@ -0,0 +1,64 @@
+"""
+Сравнение прежнего загрузчика (DictReader + Transaction со strptime)
+с потоковым загрузчиком на синтетическом файле.
+
+    python -m benchmarks.bench_csv_loader --rows 10000000
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+from benchmarks.ledger import write_csv
+from solution.csv_loader import aggregate_csv, iter_row_batches
+from solution.transaction import Transaction
+
+
+def legacy_load(path):
+    """Загрузка так, как она была реализована в FinanceTracker.load_from_csv."""
+    transactions = []
+    with open(path, "r", encoding="utf-8") as my_file:
+        reader = csv.DictReader(my_file)
+        for row in reader:
+            transactions.append(Transaction(float(row["Amount"]), row["Category"], row["Date"], row["Type"]))
+    return len(transactions)
+
+
+def streaming_load(path):
+    """Потоковый разбор в строки без создания Transaction."""
+    return sum(len(batch) for batch in iter_row_batches(path))
+
+
+def streaming_aggregate(path):
+    """Потоковый подсчет итогов без хранения строк."""
+    return aggregate_csv(path).balance()
+
+
+def measure(name, func, path):
+    start = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<22} {elapsed:8.2f} s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Количество строк в синтетическом файле")
+    parser.add_argument("--skip-legacy", action="store_true", help="Не запускать прежний загрузчик")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ledger.csv")
+        write_csv(path, args.rows)
+        print(f"Файл: {args.rows} строк, {os.path.getsize(path) / 2**20:.1f} МБ")
+        if not args.skip_legacy:
+            legacy = measure("legacy DictReader", legacy_load, path)
+        streaming = measure("streaming rows", streaming_load, path)
+        measure("streaming aggregate", streaming_aggregate, path)
+        if not args.skip_legacy:
+            print(f"Ускорение разбора: x{legacy / streaming:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Время импорта ядра трекера в чистом интерпретаторе. Тяжелые зависимости
+(matplotlib, prompt_toolkit) не должны загружаться при импорте.
+
+    python -m benchmarks.bench_import --runs 10 --max-ms 150
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+MODULES = ["solution.finance_tracker", "solution.storage", "solution.snapshot"]
+HEAVY_MODULES = ["matplotlib", "prompt_toolkit", "numpy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_once():
+    """Импортирует модули ядра в новом процессе и возвращает время и загруженные тяжелые модули."""
+    code = PROBE.format(modules=MODULES, heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Количество запусков")
+    parser.add_argument("--max-ms", type=float, default=None, help="Допустимая медиана, мс")
+    args = parser.parse_args()
+
+    results = [measure_once() for _ in range(args.runs)]
+    timings = [result["ms"] for result in results]
+    loaded = sorted({module for result in results for module in result["loaded"]})
+    median = statistics.median(timings)
+    print(f"импорт ядра: медиана {median:.1f} мс, минимум {min(timings):.1f} мс")
+    print(f"тяжелые модули: {', '.join(loaded) if loaded else 'нет'}")
+    if loaded or (args.max_ms is not None and median > args.max_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
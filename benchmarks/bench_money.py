@@ -0,0 +1,49 @@
+"""
+Сравнение суммирования денег: float, целые копейки в Python и numpy,
+а также полный пересчет итогов построчно и пакетно по колонкам.
+
+    python -m benchmarks.bench_money --rows 10000000
+"""
+import argparse
+import random
+import time
+from array import array
+from benchmarks.ledger import CATEGORIES
+from solution.aggregates import RunningAggregates
+from solution.columnar_store import ColumnarStore
+from solution.compat import optional_numpy
+from solution.reductions import sum_minor
+
+
+def measure(name, func):
+    start = time.perf_counter()
+    result = func()
+    print(f"{name:<28} {time.perf_counter() - start:8.3f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Количество сумм")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    amounts = array("q", (rng.randint(1, 10_000_000) for _ in range(args.rows)))
+    floats = [a / 100 for a in amounts]
+
+    print(f"numpy: {'да' if optional_numpy() else 'нет'}")
+    exact = measure("sum(int) Python", lambda: sum(amounts.tolist()))
+    measure("sum_minor", lambda: sum_minor(amounts))
+    drifted = measure("sum(float)", lambda: sum(floats))
+    print(f"Погрешность float: {drifted - exact / 100:.6f} руб.")
+
+    store = ColumnarStore()
+    for i, amount in enumerate(amounts):
+        store.append_row((730000 + i // 3000, "expense", CATEGORIES[i % len(CATEGORIES)], amount))
+    rows = measure("RunningAggregates.from_rows", lambda: RunningAggregates.from_rows(store.rows()))
+    columns = measure("RunningAggregates.from_store", lambda: RunningAggregates.from_store(store))
+    assert rows == columns
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Ускорение параллельной загрузки нескольких CSV-файлов в зависимости
+от количества процессов: загрузка строк в трекер и режим map-reduce.
+
+    python -m benchmarks.bench_parallel_loader --files 8 --rows 500000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.ledger import write_csv
+from solution.finance_tracker import FinanceTracker
+from solution.parallel_loader import aggregate_files, load_files
+
+
+def measure(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=8, help="Количество файлов")
+    parser.add_argument("--rows", type=int, default=500_000, help="Строк в каждом файле")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Количество процессов")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(args.files):
+            write_csv(os.path.join(tmp, f"account{i:02d}.csv"), args.rows, seed=i)
+        print(f"Файлы: {args.files} x {args.rows} строк, ядер: {os.cpu_count()}")
+        print(f"{'процессы':>8} {'строки, с':>10} {'x':>5} {'map-reduce, с':>14} {'x':>5}")
+        base_load = base_reduce = None
+        for workers in args.workers:
+            load_time, _ = measure(lambda: load_files(tmp, FinanceTracker(columnar=True), workers))
+            reduce_time, totals = measure(lambda: aggregate_files(tmp, workers))
+            base_load = base_load or load_time
+            base_reduce = base_reduce or reduce_time
+            print(
+                f"{workers:>8} {load_time:>10.2f} {base_load / load_time:>5.1f}"
+                f" {reduce_time:>14.2f} {base_reduce / reduce_time:>5.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
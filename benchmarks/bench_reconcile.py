@@ -0,0 +1,72 @@
+"""
+Сверка выписки с большим журналом: построение и загрузка индекса сверки
+и сопоставление строк выписки (точное, в окне дат и сумм, конфликты).
+
+    python -m benchmarks.bench_reconcile --rows 10000000 --statement 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from itertools import chain
+from solution.csv_loader import iter_row_batches
+from solution.reconcile import LedgerIndex, reconcile
+from benchmarks.ledger import write_csv
+
+
+def make_statement(ledger_rows, count, seed=0):
+    """
+    Выписка из count строк по последним транзакциям журнала: большинство
+    совпадает точно, часть сдвинута на день или на несколько копеек, часть новые.
+    """
+    rng = random.Random(seed)
+    source = ledger_rows[-count:]
+    statement = []
+    for ordinal, transaction_type, category, amount_minor in source:
+        roll = rng.random()
+        if roll < 0.1:
+            ordinal += rng.choice((-1, 1))
+        elif roll < 0.2:
+            amount_minor += rng.randint(-30, 30)
+        elif roll < 0.3:
+            amount_minor += 100_000
+        statement.append((ordinal, transaction_type, category.upper(), amount_minor))
+    rng.shuffle(statement)
+    return statement
+
+
+def timed(label, function, rows):
+    start = time.perf_counter()
+    result = function()
+    elapsed = time.perf_counter() - start
+    print(f"{label}: {elapsed:.2f} с ({rows / elapsed:,.0f} строк/с)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Строк в журнале")
+    parser.add_argument("--statement", type=int, default=100_000, help="Строк в выписке")
+    parser.add_argument("--days", type=int, default=2, help="Окно дат сверки")
+    parser.add_argument("--tolerance", type=int, default=50, help="Допуск суммы в копейках")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        csv_path = os.path.join(directory, "data.csv")
+        write_csv(csv_path, args.rows)
+        ledger_rows = list(chain.from_iterable(iter_row_batches(csv_path)))
+        statement = make_statement(ledger_rows, args.statement)
+        index = timed("построение индекса", lambda: LedgerIndex.build(ledger_rows), args.rows)
+        del ledger_rows
+        index_file = os.path.join(directory, "data.csv.match")
+        timed("сохранение индекса", lambda: index.save(index_file, "bench"), args.rows)
+        index, _ = timed("загрузка индекса", lambda: LedgerIndex.load(index_file), args.rows)
+        report = timed(
+            "сверка выписки", lambda: reconcile(index, statement, args.days, args.tolerance), args.statement
+        )
+        print(", ".join(f"{status}: {count}" for status, count in report.counts().items()))
+
+
+if __name__ == "__main__":
+    main()
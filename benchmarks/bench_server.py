@@ -0,0 +1,97 @@
+"""
+Нагрузочный тест сервера: несколько клиентов одновременно отправляют
+запросы чтения и добавления, для каждого метода выводятся задержки p50/p99
+и общая пропускная способность (запросов в секунду).
+
+    python -m benchmarks.bench_server --rows 100000 --clients 32 --requests 500 --writes 0.1
+"""
+import argparse
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.ledger import CATEGORIES, write_csv
+from solution.server import Client
+
+
+def percentile(values, fraction):
+    """Значение, ниже которого лежит доля fraction отсортированных values."""
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def next_request(rng, writes):
+    """Случайный запрос: добавление с вероятностью writes, иначе чтение."""
+    if rng.random() < writes:
+        return "add", {
+            "amount": f"{rng.randint(1, 5000)}.00",
+            "category": rng.choice(CATEGORIES[:-1]),
+            "date": f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "type": "expense",
+        }
+    return rng.choice([
+        ("balance", {}),
+        ("balance", {"at": f"2016-{rng.randint(1, 12):02d}-01"}),
+        ("report", {"month": rng.randint(1, 12), "year": 2015}),
+        ("query", {"type": "expense"}),
+    ])
+
+
+async def run_client(socket_path, count, writes, seed, latencies):
+    """Один клиент: count запросов подряд по одному соединению."""
+    rng = random.Random(seed)
+    client = await Client.connect(socket_path)
+    for _ in range(count):
+        method, params = next_request(rng, writes)
+        start = time.perf_counter()
+        await client.request(method, **params)
+        latencies.setdefault(method, []).append(time.perf_counter() - start)
+    await client.close()
+
+
+async def load_test(socket_path, clients, count, writes):
+    latencies = {}
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(socket_path, count, writes, seed, latencies) for seed in range(clients)))
+    return time.perf_counter() - start, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Строк в журнале")
+    parser.add_argument("--clients", type=int, default=32, help="Одновременных клиентов")
+    parser.add_argument("--requests", type=int, default=500, help="Запросов от каждого клиента")
+    parser.add_argument("--writes", type=float, default=0.1, help="Доля добавлений среди запросов")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data = os.path.join(tmp, "data.csv")
+        socket_path = os.path.join(tmp, "finance.sock")
+        write_csv(data, args.rows)
+        server = subprocess.Popen(
+            [sys.executable, "-m", "solution", "serve", "--data", data, "--socket", socket_path],
+            stderr=subprocess.PIPE, text=True,
+        )
+        try:
+            server.stderr.readline()  # Сервер сообщает о запуске после загрузки журнала
+            elapsed, latencies = asyncio.run(load_test(socket_path, args.clients, args.requests, args.writes))
+        finally:
+            server.terminate()
+            server.wait()
+
+    total = sum(len(values) for values in latencies.values())
+    print(f"Журнал: {args.rows} строк, клиентов: {args.clients}, доля добавлений: {args.writes}")
+    print(f"{'метод':>8} {'запросов':>9} {'p50, мс':>8} {'p99, мс':>8}")
+    for method, values in sorted(latencies.items()):
+        values.sort()
+        print(
+            f"{method:>8} {len(values):>9} {1000 * percentile(values, 0.5):>8.2f}"
+            f" {1000 * percentile(values, 0.99):>8.2f}"
+        )
+    print(f"Всего: {total} запросов за {elapsed:.2f} с, {total / elapsed:.0f} запросов/с")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Память и скорость Transaction и компактной FrozenTransaction:
+tracemalloc при создании объектов из строк, затем хэширование в множество
+и попарное сравнение.
+
+    python -m benchmarks.bench_transaction_memory --rows 1000000
+"""
+import argparse
+import time
+import tracemalloc
+from benchmarks.ledger import generate_rows
+from solution.csv_loader import parse_date
+from solution.money import parse_minor
+from solution.transaction import FrozenTransaction, Transaction
+
+
+def measure_memory(cls, rows):
+    """
+    Создает объекты из строк и возвращает их и занятую ими память в байтах.
+    Список выделяется заранее, чтобы в замер попали только сами объекты.
+    """
+    objects = [None] * len(rows)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i, row in enumerate(rows):
+        objects[i] = cls.from_row(row)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return objects, used
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Количество транзакций")
+    args = parser.parse_args()
+
+    rows = [
+        (parse_date(day), kind, category, parse_minor(amount))
+        for day, kind, category, amount in generate_rows(args.rows)
+    ]
+    print(f"{'класс':<18} {'байт/объект':>12} {'set(), с':>9} {'повторно, с':>12} {'==, с':>7}")
+    for cls in (Transaction, FrozenTransaction):
+        objects, used = measure_memory(cls, rows)
+        first_hash = measure(lambda: set(objects))
+        second_hash = measure(lambda: set(objects))
+        copies = [cls.from_row(row) for row in rows]
+        compare = measure(lambda: sum(a == b for a, b in zip(objects, copies)))
+        print(
+            f"{cls.__name__:<18} {used / len(objects):>12.1f} {first_hash:>9.3f}"
+            f" {second_hash:>12.3f} {compare:>7.3f}"
+        )
+        del objects, copies
+
+
+if __name__ == "__main__":
+    main()
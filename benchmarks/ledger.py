@@ -0,0 +1,30 @@
+import csv
+import random
+from datetime import date, timedelta
+
+
+CATEGORIES = ["Еда", "Транспорт", "Жилье", "Связь", "Развлечения", "Здоровье", "Одежда", "Зарплата"]
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}  # Стандартные размеры журнала
+
+
+def generate_rows(count, seed=0, start=date(2015, 1, 1)):
+    """
+    Генерирует синтетические строки журнала [дата, тип, категория, сумма].
+    Даты идут по возрастанию, примерно 30 транзакций в день.
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        day = start + timedelta(days=i // 30)
+        if rng.random() < 0.1:
+            yield [day.isoformat(), "income", "Зарплата", f"{rng.randint(1000, 100000)}.00"]
+        else:
+            amount = rng.randint(1, 500000)
+            yield [day.isoformat(), "expense", rng.choice(CATEGORIES[:-1]), f"{amount // 100}.{amount % 100:02d}"]
+
+
+def write_csv(path, count, seed=0):
+    """Записывает синтетический журнал из count строк в CSV-файл."""
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Type", "Category", "Amount"])
+        writer.writerows(generate_rows(count, seed))
@@ -0,0 +1,144 @@
+"""
+Набор бенчмарков горячих путей трекера на синтетических журналах
+стандартных размеров. Результаты сохраняются в JSON для сравнения
+между коммитами.
+
+    python -m benchmarks.suite --sizes 10k 1m --out results.json
+    python -m benchmarks.suite --sizes 10k 1m --compare results.json
+
+Размеры: 10k, 1m, 10m или число строк.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.ledger import SIZES, write_csv
+from solution.finance_tracker import FinanceTracker
+
+
+QUERY_CALLS = 1000  # Сколько раз повторяются быстрые запросы для усреднения
+BULK = {"load_from_csv", "export_to_csv", "_get_new_transaction"}  # Операции, проходящие по всем строкам
+
+
+def parse_size(text):
+    """Размер журнала: имя из SIZES или число строк."""
+    return SIZES[text.lower()] if text.lower() in SIZES else int(text)
+
+
+def git_commit():
+    """Текущий коммит репозитория или None."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def best_time(func, repeat):
+    """Лучшее время из repeat запусков func."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def mean_time(func, calls):
+    """Среднее время одного вызова func."""
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls
+
+
+def run_size(rows, folder, columnar, repeat):
+    """Замеры для одного размера журнала: список (операция, секунды на вызов)."""
+    source = os.path.join(folder, f"ledger{rows}.csv")
+    exported = os.path.join(folder, f"export{rows}.csv")
+    write_csv(source, rows)
+    results = []
+    tracker = FinanceTracker(columnar=columnar)
+    results.append(("load_from_csv", best_time(lambda: tracker.load_from_csv(source), repeat)))
+    results.append(("get_balance", mean_time(tracker.get_balance, QUERY_CALLS)))
+    results.append(("get_monthly_report", mean_time(lambda: tracker.get_monthly_report(6, 2015), QUERY_CALLS // 10)))
+    results.append(("export_to_csv", best_time(lambda: tracker.export_to_csv(exported), repeat)))
+
+    def scan():
+        # Без отметки уровня сравниваются все строки трекера с отпечатками файла
+        tracker._append_state.take(source)
+        tracker._get_new_transaction(source)
+    results.append(("_get_new_transaction", best_time(scan, repeat)))
+    return results
+
+
+def compare(results, baseline):
+    """Печатает отношение времени к базовым результатам."""
+    base = {(item["rows"], item["operation"]): item["seconds"] for item in baseline["results"]}
+    print(f"Сравнение с {baseline.get('commit') or 'базой'}:", file=sys.stderr)
+    for item in results:
+        before = base.get((item["rows"], item["operation"]))
+        if before:
+            print(
+                f"{item['rows']:>10} {item['operation']:>22} {before:>10.6f} -> {item['seconds']:>10.6f}"
+                f"  x{before / item['seconds']:.2f}",
+                file=sys.stderr,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["10k", "1m"], help="Размеры журнала")
+    parser.add_argument("--store", choices=["columnar", "list"], default="columnar", help="Хранилище трекера")
+    parser.add_argument("--repeat", type=int, default=3, help="Запусков долгих операций (берется лучший)")
+    parser.add_argument("--out", help="Файл для результатов JSON (по умолчанию stdout)")
+    parser.add_argument("--compare", help="JSON с результатами другого коммита")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for size in args.sizes:
+            rows = parse_size(size)
+            # Сообщения трекера о загрузке и экспорте не смешиваются с результатами
+            with contextlib.redirect_stdout(io.StringIO()):
+                measured = run_size(rows, folder, args.store == "columnar", args.repeat)
+            for operation, seconds in measured:
+                results.append({
+                    "rows": rows,
+                    "operation": operation,
+                    "seconds": round(seconds, 9),
+                    "rows_per_second": round(rows / seconds) if operation in BULK and seconds else None,
+                })
+                print(f"{rows:>10} {operation:>22} {seconds:>12.6f} с", file=sys.stderr)
+
+    document = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "store": args.store,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            compare(results, json.load(file))
+    text = json.dumps(document, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, mode="w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
-from .main import main
+import sys
+from .cli import main
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
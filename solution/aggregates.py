@@ -0,0 +1,149 @@
+from datetime import date
+from functools import lru_cache
+from solution.columnar_store import FLAG_TYPES, INCOME, type_flag
+from solution.reductions import column_totals
+
+
+@lru_cache(maxsize=8192)
+def year_month(ordinal):
+    """Год и месяц для порядкового номера дня (с кэшем для повторяющихся дат)."""
+    day = date.fromordinal(ordinal)
+    return day.year, day.month
+
+
+class RunningAggregates:
+    """
+    Накопительные итоги по транзакциям: доходы, расходы, суммы по категориям
+    и по месяцам. Все суммы хранятся в копейках и обновляются приращениями,
+    поэтому запрос итогов не зависит от размера журнала.
+    """
+    def __init__(self):
+        self.income = 0  # Сумма доходов в копейках
+        self.expense = 0  # Сумма расходов в копейках
+        self.by_category = {}  # (категория, тип) -> сумма в копейках
+        self.by_month = {}  # (год, месяц, тип) -> сумма в копейках
+        self._counts = {}  # Ключ итога -> количество транзакций в нем
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Полный пересчет итогов по строкам (порядковый номер дня, тип, категория, сумма)."""
+        aggregates = cls()
+        for row in rows:
+            aggregates.apply(row)
+        return aggregates
+
+    @classmethod
+    def from_store(cls, store):
+        """
+        Полный пересчет итогов по колоночному хранилищу пакетными
+        целочисленными свертками (numpy, если установлен).
+        """
+        aggregates = cls()
+        by_category, by_month = column_totals(store.dates, store.kinds, store.category_codes, store.amounts)
+        for (code, kind), (total, count) in by_category.items():
+            key = (store.categories[code], FLAG_TYPES[kind])
+            aggregates.by_category[key] = total
+            aggregates._counts[key] = count
+            if kind == INCOME:
+                aggregates.income += total
+            else:
+                aggregates.expense += total
+        for (year, month, kind), (total, count) in by_month.items():
+            key = (year, month, FLAG_TYPES[kind])
+            aggregates.by_month[key] = total
+            aggregates._counts[key] = count
+        return aggregates
+
+    def __eq__(self, other):
+        if not isinstance(other, RunningAggregates):
+            return NotImplemented
+        return (
+            self.income == other.income
+            and self.expense == other.expense
+            and self.by_category == other.by_category
+            and self.by_month == other.by_month
+        )
+
+    def merge(self, other):
+        """
+        Прибавляет итоги other к текущим (свертка частичных итогов,
+        посчитанных по разным файлам).
+        """
+        self.income += other.income
+        self.expense += other.expense
+        for totals, other_totals in ((self.by_category, other.by_category), (self.by_month, other.by_month)):
+            for key, total in other_totals.items():
+                totals[key] = totals.get(key, 0) + total
+        for key, count in other._counts.items():
+            self._counts[key] = self._counts.get(key, 0) + count
+        return self
+
+    def copy(self):
+        """Независимая копия итогов за O(категорий + месяцев)."""
+        aggregates = RunningAggregates()
+        aggregates.income = self.income
+        aggregates.expense = self.expense
+        aggregates.by_category = dict(self.by_category)
+        aggregates.by_month = dict(self.by_month)
+        aggregates._counts = dict(self._counts)
+        return aggregates
+
+    def balance(self):
+        """Баланс в копейках (доходы минус расходы)."""
+        return self.income - self.expense
+
+    def category_total(self, category, transaction_type="expense"):
+        """Сумма по категории и типу в копейках."""
+        return self.by_category.get((category, transaction_type), 0)
+
+    def month_total(self, month, year, transaction_type="expense"):
+        """Сумма за месяц по типу в копейках."""
+        return self.by_month.get((year, month, transaction_type), 0)
+
+    def apply(self, row, sign=1):
+        """
+        Добавляет (sign=1) или вычитает (sign=-1) строку из итогов.
+        :param row: Кортеж (порядковый номер дня, тип, категория, сумма в копейках).
+        :raises ValueError: Если тип строки не "income" и не "expense".
+        """
+        ordinal, transaction_type, category, amount_minor = row
+        delta = sign * amount_minor
+        # Неизвестный тип (например, "Income") не считается расходом
+        if type_flag(transaction_type) == INCOME:
+            self.income += delta
+        else:
+            self.expense += delta
+        year, month = year_month(ordinal)
+        self._add(self.by_category, (category, transaction_type), delta, sign)
+        self._add(self.by_month, (year, month, transaction_type), delta, sign)
+
+    def _add(self, totals, key, delta, sign):
+        """Обновляет один итог и удаляет его, когда в нем не осталось транзакций."""
+        count = self._counts.get(key, 0) + sign
+        if count:
+            self._counts[key] = count
+            totals[key] = totals.get(key, 0) + delta
+        else:
+            self._counts.pop(key, None)
+            totals.pop(key, None)
+
+    # Методы-наблюдатели, которые вызывает FinanceTracker при изменениях.
+
+    def on_add(self, index, row):
+        self.apply(row)
+
+    def on_extend(self, start, rows):
+        for row in rows:
+            self.apply(row)
+
+    def on_edit(self, index, old_row, new_row):
+        self.apply(old_row, sign=-1)
+        self.apply(new_row)
+
+    def on_delete(self, index, row):
+        self.apply(row, sign=-1)
+
+    def on_reset(self, rows):
+        self.__init__()
+        for row in rows:
+            self.apply(row)
@@ -0,0 +1,447 @@
+import csv
+import gzip
+import heapq
+import io
+import json
+import os
+from bisect import bisect_left
+from itertools import chain, tee
+from solution.aggregates import year_month
+from solution.compat import optional_zstd
+from solution.csv_loader import CSV_HEADER, DEFAULT_CHUNK_SIZE, ID_COLUMN, format_row, iter_id_batches, read_id_batches
+from solution.dates import month_bounds
+from solution.ids import IdIndex
+from solution.journal import Journal, atomic_write_csv, replay_with_index
+from solution.rollups import net_amount
+
+
+ARCHIVE_SUFFIX = ".archive"  # Расширение папки архива
+MANIFEST = "manifest.json"
+ARCHIVE_VERSION = 1
+EXTENSIONS = {"gzip": ".csv.gz", "zstd": ".csv.zst"}
+WRITE_BUFFER = 200_000  # Сколько строк копится в памяти перед сбросом в разделы
+GZIP_LEVEL = 6  # Уровень сжатия gzip: 9 заметно медленнее при почти том же размере
+
+
+def default_codec():
+    """zstd, если установлен пакет zstandard, иначе gzip из стандартной библиотеки."""
+    return "zstd" if optional_zstd() is not None else "gzip"
+
+
+def open_partition(path, codec, mode="r"):
+    """
+    Открывает сжатый файл раздела как текстовый поток CSV.
+    :param mode: "r", "w" или "a". При дозаписи в конец файла добавляется новый
+        сжатый блок; при чтении блоки читаются подряд.
+    """
+    if codec == "gzip":
+        return gzip.open(path, mode + "t", compresslevel=GZIP_LEVEL, encoding="utf-8", newline="")
+    zstd = optional_zstd()
+    if zstd is None:
+        raise RuntimeError("Архив сжат zstd: установите пакет zstandard.")
+    raw = open(path, mode + "b")
+    if mode == "r":
+        stream = zstd.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+    else:
+        stream = zstd.ZstdCompressor().stream_writer(raw)
+    return io.TextIOWrapper(stream, encoding="utf-8", newline="")
+
+
+class Partition:
+    """Сводка раздела архива (одного месяца), которая хранится в манифесте."""
+    def __init__(self, year, month, filename):
+        self.year = year
+        self.month = month
+        self.filename = filename
+        self.rows = 0
+        self.size = None  # Размер файла раздела на момент записи манифеста
+        self.min_id = None  # Наименьший и наибольший id раздела: по ним
+        self.max_id = None  # ищутся разделы для правки и удаления
+        self.totals = {}  # Тип -> сумма в копейках
+        self.categories = {}  # Тип -> {категория: сумма в копейках}
+
+    @property
+    def key(self):
+        return self.year, self.month
+
+    def add(self, row, transaction_id):
+        """Учитывает строку раздела в сводке."""
+        _, transaction_type, category, amount_minor = row
+        self.rows += 1
+        self.totals[transaction_type] = self.totals.get(transaction_type, 0) + amount_minor
+        by_category = self.categories.setdefault(transaction_type, {})
+        by_category[category] = by_category.get(category, 0) + amount_minor
+        if self.min_id is None or transaction_id < self.min_id:
+            self.min_id = transaction_id
+        if self.max_id is None or transaction_id > self.max_id:
+            self.max_id = transaction_id
+
+    def net(self):
+        """Изменение баланса за месяц в копейках."""
+        return self.totals.get("income", 0) - self.totals.get("expense", 0)
+
+    def may_contain(self, sorted_ids):
+        """Может ли раздел содержать какой-нибудь id из отсортированного списка."""
+        if self.min_id is None:
+            return False
+        position = bisect_left(sorted_ids, self.min_id)
+        return position < len(sorted_ids) and sorted_ids[position] <= self.max_id
+
+    def to_dict(self):
+        return {
+            "month": f"{self.year:04d}-{self.month:02d}",
+            "file": self.filename,
+            "rows": self.rows,
+            "bytes": self.size,
+            "min_id": self.min_id,
+            "max_id": self.max_id,
+            "totals": self.totals,
+            "categories": self.categories,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        year, month = map(int, data["month"].split("-"))
+        partition = cls(year, month, data["file"])
+        partition.rows = data["rows"]
+        partition.size = data.get("bytes")
+        partition.min_id = data["min_id"]
+        partition.max_id = data["max_id"]
+        partition.totals = data["totals"]
+        partition.categories = data["categories"]
+        return partition
+
+
+class Archive:
+    """
+    Архив транзакций, разбитый по месяцам.
+
+    Каждый месяц хранится в своем сжатом CSV-файле (gzip или zstd) со
+    столбцом Id, а манифест содержит для каждого раздела количество строк,
+    диапазон id и суммы по типам и категориям. Баланс и итоги по целым
+    месяцам считаются по манифесту, отчет за период читает только разделы
+    его месяцев, а изменение транзакции переписывает только ее раздел.
+    """
+    def __init__(self, directory, codec=None):
+        """
+        :param directory: Папка архива.
+        :param codec: "gzip" или "zstd" для нового архива; по умолчанию zstd,
+            если он установлен. Существующий архив читается в своем формате.
+        """
+        self.directory = directory
+        self.codec = codec or default_codec()
+        self.next_id = 1  # Следующий свободный id
+        self.partitions = {}  # (год, месяц) -> Partition
+        manifest_path = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, mode="r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if manifest.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"Неподдерживаемая версия архива: {manifest.get('version')}")
+            self.codec = manifest["codec"]
+            self.next_id = manifest["next_id"]
+            for data in manifest["partitions"]:
+                partition = Partition.from_dict(data)
+                self.partitions[partition.key] = partition
+            self._drop_uncommitted()
+
+    @staticmethod
+    def exists(directory):
+        """Есть ли в папке архив (манифест)."""
+        return os.path.exists(os.path.join(directory, MANIFEST))
+
+    def __len__(self):
+        return sum(partition.rows for partition in self.partitions.values())
+
+    def _path(self, partition, suffix=""):
+        return os.path.join(self.directory, partition.filename + suffix)
+
+    def _new_partition(self, key):
+        year, month = key
+        return Partition(year, month, f"{year:04d}-{month:02d}{EXTENSIONS[self.codec]}")
+
+    def _drop_uncommitted(self):
+        """
+        Отрезает от разделов сжатые блоки, дописанные после последней записи
+        манифеста (сбой между дозаписью и манифестом). Манифест — точка
+        фиксации: блоки дописываются целиком, поэтому файл, обрезанный до
+        записанного в манифесте размера, снова заканчивается на границе блока.
+        """
+        for partition in self.partitions.values():
+            path = self._path(partition)
+            if partition.size is not None and os.path.getsize(path) > partition.size:
+                with open(path, mode="r+b") as file:
+                    file.truncate(partition.size)
+
+    def write_manifest(self):
+        """Атомарно сохраняет манифест вместе с текущими размерами файлов разделов."""
+        os.makedirs(self.directory, exist_ok=True)
+        for partition in self.partitions.values():
+            partition.size = os.path.getsize(self._path(partition))
+        manifest = {
+            "version": ARCHIVE_VERSION,
+            "codec": self.codec,
+            "next_id": self.next_id,
+            "partitions": [partition.to_dict() for _, partition in sorted(self.partitions.items())],
+        }
+        path = os.path.join(self.directory, MANIFEST)
+        with open(f"{path}.tmp", mode="w", encoding="utf-8") as file:
+            json.dump(manifest, file, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+    def read(self, partition):
+        """Перебирает пары (строка, id) раздела по возрастанию id."""
+        with open_partition(self._path(partition), self.codec) as file:
+            for batch, ids in read_id_batches(file):
+                yield from zip(batch, ids)
+
+    def iter_id_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Выдает все строки порциями (строки, id) в порядке id, сливая разделы."""
+        partitions = sorted(self.partitions.values(), key=lambda partition: partition.min_id)
+        streams = [self.read(partition) for partition in partitions]
+        if all(left.max_id < right.min_id for left, right in zip(partitions, partitions[1:])):
+            # Диапазоны id разделов не пересекаются (журнал шел по датам): слияние не нужно
+            pairs = chain.from_iterable(streams)
+        else:
+            pairs = heapq.merge(*streams, key=lambda pair: pair[1])
+        batch, ids = [], []
+        for row, transaction_id in pairs:
+            batch.append(row)
+            ids.append(transaction_id)
+            if len(batch) >= chunk_size:
+                yield batch, ids
+                batch, ids = [], []
+        if batch:
+            yield batch, ids
+
+    def write(self, pairs, next_id=None):
+        """
+        Перезаписывает архив целиком, потоково раскладывая пары (строка, id)
+        по разделам месяцев. Строки копятся в памяти не больше WRITE_BUFFER и
+        сбрасываются в разделы новыми сжатыми блоками, поэтому одновременно
+        открыт только один файл, сколько бы месяцев ни было в журнале.
+        :param next_id: Следующий свободный id; не меньше наибольшего id плюс один.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        old = self.partitions
+        self.partitions = {}
+        self.next_id = next_id or 1
+        started = set()  # Разделы, временный файл которых уже начат
+        buffers = {}  # (год, месяц) -> записи CSV, еще не сброшенные в раздел
+        buffered = 0
+        unsorted = set()  # Разделы, в которые id пришли не по возрастанию
+        for row, transaction_id in pairs:
+            key = year_month(row[0])
+            partition = self.partitions.get(key)
+            if partition is None:
+                partition = self.partitions[key] = self._new_partition(key)
+            elif transaction_id < partition.max_id:
+                unsorted.add(key)
+            buffers.setdefault(key, []).append(format_row(row, transaction_id))
+            partition.add(row, transaction_id)
+            if transaction_id >= self.next_id:
+                self.next_id = transaction_id + 1
+            buffered += 1
+            if buffered >= WRITE_BUFFER:
+                self._flush(buffers, started)
+                buffered = 0
+        self._flush(buffers, started)
+        for partition in self.partitions.values():
+            os.replace(self._path(partition, ".tmp"), self._path(partition))
+        for key in unsorted:
+            # Разделы хранятся по возрастанию id, чтобы их можно было сливать при чтении
+            partition = self.partitions[key]
+            self._rewrite(partition, sorted(self.read(partition), key=lambda pair: pair[1]))
+        for key, partition in old.items():
+            if key not in self.partitions and os.path.exists(self._path(partition)):
+                os.remove(self._path(partition))
+        self.write_manifest()
+
+    def _flush(self, buffers, started):
+        """Дописывает накопленные записи во временные файлы разделов."""
+        for key, records in buffers.items():
+            path = self._path(self.partitions[key], ".tmp")
+            with open_partition(path, self.codec, "a" if key in started else "w") as file:
+                writer = csv.writer(file)
+                if key not in started:
+                    writer.writerow(CSV_HEADER + [ID_COLUMN])
+                    started.add(key)
+                writer.writerows(records)
+        buffers.clear()
+
+    def append(self, pairs):
+        """Дописывает пары (строка, id) в разделы их месяцев."""
+        by_month = {}
+        for row, transaction_id in pairs:
+            by_month.setdefault(year_month(row[0]), []).append((row, transaction_id))
+        if not by_month:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for key, month_pairs in by_month.items():
+            month_pairs.sort(key=lambda pair: pair[1])
+            partition = self.partitions.get(key)
+            if partition is not None and month_pairs[0][1] < partition.max_id:
+                # Строка с меньшим id (например, перенесенная правкой из другого
+                # месяца) вставляется в раздел с сохранением порядка id
+                merged = sorted([*self.read(partition), *month_pairs], key=lambda pair: pair[1])
+                self._rewrite(partition, merged)
+                self.next_id = max(self.next_id, merged[-1][1] + 1)
+                continue
+            is_new = partition is None
+            if is_new:
+                partition = self.partitions[key] = self._new_partition(key)
+            with open_partition(self._path(partition), self.codec, "w" if is_new else "a") as file:
+                writer = csv.writer(file)
+                if is_new:
+                    writer.writerow(CSV_HEADER + [ID_COLUMN])
+                for row, transaction_id in month_pairs:
+                    writer.writerow(format_row(row, transaction_id))
+                    partition.add(row, transaction_id)
+                    if transaction_id >= self.next_id:
+                        self.next_id = transaction_id + 1
+        self.write_manifest()
+
+    def _rewrite(self, partition, pairs):
+        """Переписывает раздел парами (строка, id); пустой раздел удаляется."""
+        del self.partitions[partition.key]
+        if not pairs:
+            os.remove(self._path(partition))
+            return
+        rewritten = self.partitions[partition.key] = self._new_partition(partition.key)
+        with open_partition(self._path(rewritten, ".tmp"), self.codec, "w") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER + [ID_COLUMN])
+            for row, transaction_id in pairs:
+                writer.writerow(format_row(row, transaction_id))
+                rewritten.add(row, transaction_id)
+        os.replace(self._path(rewritten, ".tmp"), self._path(rewritten))
+
+    def replace(self, transaction_id, row):
+        """Заменяет строку с указанным id; при смене месяца строка переносится в другой раздел."""
+        for partition in list(self.partitions.values()):
+            if not partition.may_contain([transaction_id]):
+                continue
+            pairs = list(self.read(partition))
+            position = next((i for i, pair in enumerate(pairs) if pair[1] == transaction_id), None)
+            if position is None:
+                continue
+            if year_month(row[0]) == partition.key:
+                pairs[position] = (row, transaction_id)
+                self._rewrite(partition, pairs)
+                self.write_manifest()
+            else:
+                del pairs[position]
+                self._rewrite(partition, pairs)
+                self.append([(row, transaction_id)])
+            return
+
+    def delete_many(self, ids):
+        """Удаляет строки с id из ids, переписывая только разделы, где они могут быть."""
+        ids = set(ids)
+        sorted_ids = sorted(ids)
+        for partition in list(self.partitions.values()):
+            if not partition.may_contain(sorted_ids):
+                continue
+            pairs = list(self.read(partition))
+            kept = [pair for pair in pairs if pair[1] not in ids]
+            if len(kept) != len(pairs):
+                self._rewrite(partition, kept)
+        self.write_manifest()
+
+    # Запросы: по манифесту и только по нужным разделам.
+
+    def _overlapping(self, start, end):
+        """
+        Разделы, месяцы которых пересекаются с полуинтервалом [start, end)
+        порядковых номеров дней: пары (раздел, покрыт ли месяц целиком).
+        """
+        first, last = year_month(start), year_month(end - 1)
+        for key, partition in sorted(self.partitions.items()):
+            if first <= key <= last:
+                month_start, month_end = month_bounds(key[1], key[0])
+                yield partition, start <= month_start and month_end <= end
+
+    def balance(self, at=None):
+        """
+        Баланс в копейках.
+        :param at: Порядковый номер дня, на конец которого считается баланс;
+            читается только раздел его месяца.
+        """
+        if at is None:
+            return sum(partition.net() for partition in self.partitions.values())
+        key = year_month(at)
+        total = sum(partition.net() for month, partition in self.partitions.items() if month < key)
+        partition = self.partitions.get(key)
+        if partition is not None:
+            total += sum(net_amount(row) for row, _ in self.read(partition) if row[0] <= at)
+        return total
+
+    def totals_between(self, start, end):
+        """Суммы по типам в копейках за полуинтервал [start, end) порядковых номеров дней."""
+        totals = {}
+        for partition, whole in self._overlapping(start, end):
+            if whole:
+                for transaction_type, total in partition.totals.items():
+                    totals[transaction_type] = totals.get(transaction_type, 0) + total
+                continue
+            for row, _ in self.read(partition):
+                if start <= row[0] < end:
+                    totals[row[1]] = totals.get(row[1], 0) + row[3]
+        return totals
+
+    def rows_between(self, start, end):
+        """Строки за полуинтервал [start, end), упорядоченные по дате и id."""
+        pairs = [
+            pair
+            for partition, _ in self._overlapping(start, end)
+            for pair in self.read(partition)
+            if start <= pair[0][0] < end
+        ]
+        pairs.sort(key=lambda pair: (pair[0][0], pair[1]))
+        return [row for row, _ in pairs]
+
+    def category_totals(self, transaction_type):
+        """Суммы по категориям в копейках по манифесту."""
+        totals = {}
+        for partition in self.partitions.values():
+            for category, total in partition.categories.get(transaction_type, {}).items():
+                totals[category] = totals.get(category, 0) + total
+        return totals
+
+
+def csv_to_archive(csv_path, directory, codec=None):
+    """
+    Импортирует CSV-файл (в том числе старого формата, без столбца Id) в архив.
+    Без журнала файл читается потоково; если журнал есть, его изменения
+    применяются в памяти, а сам CSV не меняется.
+    """
+    archive = Archive(directory, codec)
+    journal = Journal(csv_path)
+    if journal.records():
+        rows, index = replay_with_index(csv_path)
+        archive.write(zip(rows, index), index.next_id)
+        return archive
+    index = IdIndex()
+    pairs = (
+        (row, index.append(transaction_id))
+        for batch, ids in iter_id_batches(csv_path)
+        for row, transaction_id in zip(batch, ids or [None] * len(batch))
+    )
+    archive.write(pairs, journal.next_id)
+    return archive
+
+
+def archive_to_csv(directory, csv_path):
+    """Собирает архив обратно в один CSV-файл."""
+    if not Archive.exists(directory):
+        raise FileNotFoundError(directory)
+    archive = Archive(directory)
+    pairs = (
+        (row, transaction_id)
+        for batch, ids in archive.iter_id_batches()
+        for row, transaction_id in zip(batch, ids)
+    )
+    rows, ids = tee(pairs)
+    atomic_write_csv(csv_path, (row for row, _ in rows), (transaction_id for _, transaction_id in ids))
+    # Следующий свободный id переходит в заголовок нового журнала CSV
+    Journal(csv_path).reset(archive.next_id)
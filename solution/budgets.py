@@ -0,0 +1,267 @@
+import json
+import os
+from solution.aggregates import year_month
+from solution.money import format_minor, parse_amount
+
+
+BUDGETS_FILE = "budgets.json"  # Файл правил рядом с файлами данных (в папке files)
+DEFAULT_THRESHOLDS = (80, 100)  # Пороги предупреждений в процентах от лимита
+
+
+def parse_period(text):
+    """
+    Разбирает месяц бюджета.
+    :param text: Строка ГГГГ-ММ или None (бюджет на каждый месяц).
+    :return: (год, месяц) или None.
+    """
+    if text is None:
+        return None
+    year, _, month = text.partition("-")
+    period = int(year), int(month)
+    if not 1 <= period[1] <= 12:
+        raise ValueError(f"Некорректный месяц бюджета: {text!r}")
+    return period
+
+
+def format_period(period):
+    """Строка ГГГГ-ММ для (год, месяц) или None."""
+    return None if period is None else f"{period[0]:04d}-{period[1]:02d}"
+
+
+class Budget:
+    """Месячный лимит расходов по категории."""
+    def __init__(self, category, limit_minor, period=None, thresholds=DEFAULT_THRESHOLDS):
+        """
+        :param category: Категория расходов.
+        :param limit_minor: Лимит в копейках.
+        :param period: (год, месяц) — бюджет только на этот месяц; None — на каждый месяц.
+        :param thresholds: Пороги предупреждений в процентах от лимита.
+        """
+        if limit_minor <= 0:
+            raise ValueError("Лимит бюджета должен быть больше нуля.")
+        self.category = category
+        self.limit_minor = limit_minor
+        self.period = period
+        self.thresholds = tuple(sorted(thresholds))
+
+    def __eq__(self, other):
+        if not isinstance(other, Budget):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"Budget({self.category!r}, {format_minor(self.limit_minor)}, {format_period(self.period)})"
+
+    def level(self, spent):
+        """Количество порогов, достигнутых при расходах spent копеек."""
+        reached = 0
+        for threshold in self.thresholds:
+            if 100 * spent < threshold * self.limit_minor:
+                break
+            reached += 1
+        return reached
+
+    def to_dict(self):
+        return {
+            "category": self.category,
+            "limit": format_minor(self.limit_minor),
+            "month": format_period(self.period),
+            "thresholds": list(self.thresholds),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            data["category"],
+            parse_amount(str(data["limit"])),
+            parse_period(data.get("month")),
+            data.get("thresholds", DEFAULT_THRESHOLDS),
+        )
+
+
+class Alert:
+    """Предупреждение о достижении порога бюджета."""
+    def __init__(self, budget, year, month, threshold, spent_minor):
+        self.budget = budget
+        self.year = year
+        self.month = month
+        self.threshold = threshold  # Достигнутый порог в процентах
+        self.spent_minor = spent_minor  # Расходы по категории за месяц в копейках
+
+    def __str__(self):
+        return (
+            f"Бюджет «{self.budget.category}» за {self.year:04d}-{self.month:02d}: "
+            f"потрачено {format_minor(self.spent_minor)} из {format_minor(self.budget.limit_minor)} "
+            f"(порог {self.threshold}%)"
+        )
+
+    def __repr__(self):
+        return f"Alert({self.budget.category!r}, {self.year}, {self.month}, {self.threshold})"
+
+
+class BudgetEngine:
+    """
+    Бюджеты по категориям и предупреждения о превышении порогов.
+
+    Наблюдатель FinanceTracker: ведет расходы по парам (категория, месяц)
+    и при добавлении, правке или удалении транзакции проверяет только
+    бюджет затронутой категории и месяца, поэтому стоимость проверки не
+    зависит ни от размера журнала, ни от количества бюджетов. Бюджет на
+    конкретный месяц заменяет бюджет категории на каждый месяц.
+
+    Уровень бюджета (сколько порогов достигнуто) не хранится: он
+    вычисляется по расходам до и после изменения, и предупреждение
+    выдается, только когда изменение поднимает уровень. Массовая загрузка
+    (on_extend, on_reset) обновляет расходы без предупреждений.
+    """
+    def __init__(self):
+        self.spent = {}  # Категория -> {(год, месяц): расходы в копейках}
+        self.budgets = {}  # Категория -> {(год, месяц) или None: Budget}
+        self.alerts = []  # Предупреждения, еще не полученные через pop_alerts
+
+    def __len__(self):
+        return sum(len(budgets) for budgets in self.budgets.values())
+
+    def __iter__(self):
+        """Перебирает бюджеты по категориям."""
+        for category in sorted(self.budgets):
+            budgets = self.budgets[category]
+            yield from (budgets[period] for period in sorted(budgets, key=lambda p: p or (0, 0)))
+
+    def set_budget(self, budget):
+        """Добавляет бюджет или заменяет бюджет той же категории и месяца."""
+        self.budgets.setdefault(budget.category, {})[budget.period] = budget
+
+    def remove_budget(self, category, period=None):
+        """
+        Удаляет бюджет категории.
+        :return: True, если бюджет был.
+        """
+        budgets = self.budgets.get(category)
+        if not budgets or period not in budgets:
+            return False
+        del budgets[period]
+        if not budgets:
+            del self.budgets[category]
+        return True
+
+    def budget_for(self, category, year, month):
+        """Бюджет, действующий для категории в месяце, или None."""
+        budgets = self.budgets.get(category)
+        if not budgets:
+            return None
+        return budgets.get((year, month)) or budgets.get(None)
+
+    def spent_in(self, category, year, month):
+        """Расходы по категории за месяц в копейках."""
+        return self.spent.get(category, {}).get((year, month), 0)
+
+    def status(self, year, month):
+        """
+        Состояние бюджетов за месяц.
+        :return: Список (бюджет, расходы в копейках) по категориям.
+        """
+        result = []
+        for category in sorted(self.budgets):
+            budget = self.budget_for(category, year, month)
+            if budget is not None:
+                result.append((budget, self.spent_in(category, year, month)))
+        return result
+
+    def pop_alerts(self):
+        """Возвращает накопленные предупреждения и очищает их."""
+        alerts, self.alerts = self.alerts, []
+        return alerts
+
+    def _change(self, row, sign):
+        """
+        Изменяет расходы по строке.
+        :return: ((категория, год, месяц), расходы до изменения) или None для дохода.
+        """
+        ordinal, transaction_type, category, amount_minor = row
+        if transaction_type != "expense":
+            return None
+        year, month = year_month(ordinal)
+        months = self.spent.setdefault(category, {})
+        before = months.get((year, month), 0)
+        after = before + sign * amount_minor
+        if after:
+            months[(year, month)] = after
+        else:
+            months.pop((year, month), None)
+            if not months:
+                del self.spent[category]
+        return (category, year, month), before
+
+    def _check(self, key, before):
+        """Проверяет бюджет месяца key после изменения расходов с before."""
+        budget = self.budget_for(*key)
+        if budget is None:
+            return
+        after = self.spent_in(*key)
+        level = budget.level(after)
+        if level > budget.level(before):
+            self.alerts.append(Alert(budget, key[1], key[2], budget.thresholds[level - 1], after))
+
+    def add_totals(self, totals):
+        """
+        Прибавляет расходы без предупреждений.
+        :param totals: Пары ((категория, порядковый номер дня), расходы в копейках).
+        """
+        for (category, ordinal), amount_minor in totals:
+            self._change((ordinal, "expense", category, amount_minor), 1)
+
+    @staticmethod
+    def _daily_expense(rows):
+        """Свертка расходов порции строк по (категория, день) перед разбором дат."""
+        totals = {}
+        for ordinal, transaction_type, category, amount_minor in rows:
+            if transaction_type == "expense":
+                key = (category, ordinal)
+                totals[key] = totals.get(key, 0) + amount_minor
+        return totals
+
+    def save(self, filepath):
+        """Атомарно сохраняет бюджеты в JSON."""
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            json.dump({"budgets": [budget.to_dict() for budget in self]}, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, filepath)
+
+    def load(self, filepath):
+        """Заменяет бюджеты сохраненными в filepath (если файла нет — бюджетов нет)."""
+        self.budgets = {}
+        if not os.path.exists(filepath):
+            return
+        with open(filepath, mode="r", encoding="utf-8") as file:
+            for data in json.load(file)["budgets"]:
+                self.set_budget(Budget.from_dict(data))
+
+    # Методы-наблюдатели, которые вызывает FinanceTracker при изменениях.
+
+    def on_add(self, index, row):
+        change = self._change(row, 1)
+        if change is not None:
+            self._check(*change)
+
+    def on_extend(self, start, rows):
+        self.add_totals(self._daily_expense(rows).items())
+
+    def on_edit(self, index, old_row, new_row):
+        removed = self._change(old_row, -1)
+        added = self._change(new_row, 1)
+        if added is None:
+            return
+        key, before = added
+        if removed is not None and removed[0] == key:
+            # Правка внутри одного месяца и категории сравнивается с суммой до правки
+            before = removed[1]
+        self._check(key, before)
+
+    def on_delete(self, index, row):
+        # Удаление только уменьшает расходы и не может достичь нового порога
+        self._change(row, -1)
+
+    def on_reset(self, rows):
+        self.spent = {}
+        self.add_totals(self._daily_expense(rows).items())
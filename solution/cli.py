@@ -0,0 +1,291 @@
+"""
+Неинтерактивный режим трекера для скриптов и cron.
+
+    python -m solution import выписка.csv --data files/data.csv
+    python -m solution balance --data files/data.csv
+    python -m solution series --from 2023-01-01 --to 2023-12-31 --period week --data files/data.csv
+    python -m solution report --month 10 --year 2023 --data files/data.db
+    python -m solution by-category --type expense --data files/data.snap
+    cat выписка.csv | python -m solution export --data - --out files/data.snap
+    python -m solution plot --data files/data.csv --out chart.png
+    python -m solution serve --data files/data.csv --socket /tmp/finance.sock
+    python -m solution export --data files/data.csv --out files/data.archive
+    python -m solution report --month 10 --year 2023 --data files/data.archive
+    python -m solution reconcile выписка.csv --data files/data.csv --days 3 --tolerance 1.00 --apply
+
+Без аргументов запускается интерактивное меню.
+Коды возврата: 0 — успех, 1 — ошибка выполнения, 2 — ошибка в аргументах.
+"""
+import argparse
+import csv
+import os
+import sys
+from itertools import chain
+from solution.archive import ARCHIVE_SUFFIX, Archive
+from solution.csv_loader import CSV_HEADER, ID_COLUMN, format_date, format_row, read_row_batches
+from solution.finance_tracker import FinanceTracker
+from solution.dates import month_bounds, quarter_bounds, to_ordinal
+from solution.money import format_amount, format_minor, from_minor, to_minor
+from solution.parallel_loader import load_files
+from solution.reconcile import STATUSES, LedgerIndex, reconcile
+from solution.snapshot import SNAPSHOT_SUFFIX
+from solution.storage import ArchiveBackend, CsvBackend, SnapshotBackend, SqliteBackend
+
+
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+STDIO = "-"  # Имя файла для stdin/stdout
+
+
+def open_backend(path):
+    """Выбирает хранилище по расширению файла."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in SQLITE_SUFFIXES:
+        return SqliteBackend(path)
+    if extension == SNAPSHOT_SUFFIX:
+        return SnapshotBackend(path)
+    if extension == ARCHIVE_SUFFIX:
+        return ArchiveBackend(path)
+    return CsvBackend(path)
+
+
+def open_archive(path):
+    """
+    Архив по месяцам, если path указывает на него, иначе None.
+    Запросы к архиву читают только манифест и разделы нужных месяцев.
+    """
+    if os.path.splitext(path)[1].lower() != ARCHIVE_SUFFIX:
+        return None
+    if not Archive.exists(path):
+        raise FileNotFoundError(f"Архив {path} не найден")
+    return Archive(path)
+
+
+def open_tracker(path, create=False):
+    """
+    Открывает трекер с данными из файла.
+    :param path: Путь к CSV, снапшоту или базе SQLite; "-" — CSV из stdin.
+    :param create: Создать пустой файл, если его нет.
+    """
+    if path == STDIO:
+        tracker = FinanceTracker()
+        tracker.import_rows(read_row_batches(sys.stdin))
+        return tracker
+    if not create and not os.path.exists(path):
+        raise FileNotFoundError(f"Файл {path} не найден")
+    backend = open_backend(path)
+    if create and not backend.pushdown and not os.path.exists(path):
+        backend.save_all(())
+    return FinanceTracker(backend=backend)
+
+
+def read_batches(path):
+    """Порции строк CSV из файла или stdin."""
+    if path == STDIO:
+        yield from read_row_batches(sys.stdin)
+        return
+    with open(path, "r", newline="", encoding="utf-8") as file:
+        yield from read_row_batches(file)
+
+
+def write_rows(rows, out, ids=None):
+    """Пишет строки в CSV-поток; если переданы ids, добавляется столбец Id."""
+    writer = csv.writer(out, lineterminator="\n")
+    if ids is None:
+        writer.writerow(CSV_HEADER)
+        for row in rows:
+            writer.writerow(format_row(row))
+        return
+    writer.writerow(CSV_HEADER + [ID_COLUMN])
+    for row, transaction_id in zip(rows, ids):
+        writer.writerow(format_row(row, transaction_id))
+
+
+def cmd_import(args):
+    tracker = open_tracker(args.data, create=True)
+    if args.workers:
+        count = load_files(args.sources, tracker, args.workers)
+    else:
+        count = 0
+        for source in args.sources:
+            count += tracker.import_rows(read_batches(source))
+    print(f"Импортировано транзакций: {count}", file=sys.stderr)
+
+
+def cmd_balance(args):
+    archive = open_archive(args.data)
+    if archive is not None:
+        balance = from_minor(archive.balance(None if args.at is None else to_ordinal(args.at)))
+    else:
+        tracker = open_tracker(args.data)
+        balance = tracker.get_balance() if args.at is None else tracker.get_balance_at(args.at)
+    print(format_amount(balance))
+
+
+def cmd_series(args):
+    tracker = open_tracker(args.data)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(["Period", "Flow", "Balance"])
+    for first_day, flow, balance in tracker.get_balance_series(args.start, args.end, args.period):
+        writer.writerow([first_day.isoformat(), format_amount(flow), format_amount(balance)])
+
+
+def cmd_report(args):
+    archive = open_archive(args.data)
+    if archive is not None:
+        if args.quarter is not None:
+            rows = archive.rows_between(*quarter_bounds(args.quarter, args.year))
+        else:
+            rows = archive.rows_between(*month_bounds(args.month, args.year))
+        write_rows(rows, sys.stdout)
+        return
+    tracker = open_tracker(args.data)
+    if args.quarter is not None:
+        transactions = tracker.get_quarterly_report(args.quarter, args.year)
+    else:
+        transactions = tracker.get_monthly_report(args.month, args.year)
+    write_rows((t.to_row() for t in transactions), sys.stdout)
+
+
+def cmd_by_category(args):
+    archive = open_archive(args.data)
+    if archive is not None:
+        totals = {category: from_minor(total) for category, total in archive.category_totals(args.type).items()}
+    else:
+        totals = open_tracker(args.data).get_category_totals(args.type)
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(["Category", "Amount"])
+    for category, total in sorted(totals.items()):
+        writer.writerow([category, format_amount(total)])
+
+
+def cmd_export(args):
+    tracker = open_tracker(args.data)
+    if args.out == STDIO:
+        write_rows((t.to_row() for t in tracker.transactions), sys.stdout, tracker.ids)
+    else:
+        tracker.save_to(open_backend(args.out))
+
+
+def cmd_reconcile(args):
+    batches = read_batches(args.statement)
+    if args.apply or args.data == STDIO:
+        tracker = open_tracker(args.data, create=args.apply)
+        report = tracker.reconcile_statement(batches, args.days, args.tolerance, apply=args.apply)
+    else:
+        if not os.path.exists(args.data):
+            raise FileNotFoundError(f"Файл {args.data} не найден")
+        # Сохраненный индекс сверки избавляет от загрузки журнала, пока файл не изменился
+        index = LedgerIndex.for_source(args.data, lambda: open_tracker(args.data)._rows())
+        report = reconcile(index, chain.from_iterable(batches), args.days, to_minor(args.tolerance))
+    writer = csv.writer(sys.stdout, lineterminator="\n")
+    writer.writerow(["Status"] + CSV_HEADER + ["LedgerDate", "LedgerAmount"])
+    for status, row, partner in report:
+        ledger = ["", ""] if partner is None else [format_date(partner[0]), format_minor(partner[1])]
+        writer.writerow([status] + format_row(row) + ledger)
+    counts = report.counts()
+    print(", ".join(f"{status}: {counts[status]}" for status in STATUSES), file=sys.stderr)
+
+
+def cmd_plot(args):
+    from solution.plotting import plot_spending
+
+    tracker = open_tracker(args.data)
+    plot_spending(tracker.get_category_totals("expense"), args.out, args.top)
+
+
+def cmd_serve(args):
+    import asyncio
+    from solution.server import serve
+
+    tracker = open_tracker(args.data, create=True)
+
+    def ready(address):
+        print(f"Сервер запущен: {address}", file=sys.stderr, flush=True)
+
+    try:
+        asyncio.run(serve(tracker, args.socket, port=args.port, ready=ready))
+    except KeyboardInterrupt:
+        pass
+
+
+def build_parser():
+    """Парсер аргументов командной строки."""
+    parser = argparse.ArgumentParser(
+        prog="python -m solution", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    data = argparse.ArgumentParser(add_help=False)
+    data.add_argument(
+        "--data", required=True, help="CSV, снапшот (.snap), архив (.archive) или база SQLite (.db); - для stdin"
+    )
+
+    command = commands.add_parser("import", parents=[data], help="Добавить транзакции из CSV-файлов")
+    command.add_argument("sources", nargs="+", help="CSV-файлы; - для stdin")
+    command.add_argument(
+        "--workers", type=int, help="Разбирать файлы параллельно в N процессах (можно указать папки и шаблоны)"
+    )
+    command.set_defaults(handler=cmd_import)
+
+    command = commands.add_parser("balance", parents=[data], help="Текущий баланс или баланс на дату")
+    command.add_argument("--at", help="Дата ГГГГ-ММ-ДД")
+    command.set_defaults(handler=cmd_balance)
+
+    command = commands.add_parser("series", parents=[data], help="Баланс во времени (CSV)")
+    command.add_argument("--from", dest="start", required=True, help="Первый день ГГГГ-ММ-ДД")
+    command.add_argument("--to", dest="end", required=True, help="Последний день ГГГГ-ММ-ДД")
+    command.add_argument("--period", choices=["day", "week", "month"], default="month")
+    command.set_defaults(handler=cmd_series)
+
+    command = commands.add_parser("report", parents=[data], help="Транзакции за месяц или квартал (CSV)")
+    period = command.add_mutually_exclusive_group(required=True)
+    period.add_argument("--month", type=int, choices=range(1, 13), metavar="1-12")
+    period.add_argument("--quarter", type=int, choices=range(1, 5), metavar="1-4")
+    command.add_argument("--year", type=int, required=True)
+    command.set_defaults(handler=cmd_report)
+
+    command = commands.add_parser("by-category", parents=[data], help="Суммы по категориям (CSV)")
+    command.add_argument("--type", choices=["income", "expense"], default="expense")
+    command.set_defaults(handler=cmd_by_category)
+
+    command = commands.add_parser("export", parents=[data], help="Сохранить транзакции в CSV, снапшот, архив или базу")
+    command.add_argument("--out", required=True, help="Путь к файлу; - для stdout")
+    command.set_defaults(handler=cmd_export)
+
+    command = commands.add_parser("reconcile", parents=[data], help="Сверить выписку с журналом (CSV)")
+    command.add_argument("statement", help="CSV-файл выписки; - для stdin")
+    command.add_argument("--days", type=int, default=0, help="Допустимое расхождение дат в днях")
+    command.add_argument("--tolerance", default="0", help="Допустимое расхождение сумм в рублях")
+    command.add_argument("--apply", action="store_true", help="Добавить в журнал новые строки выписки")
+    command.set_defaults(handler=cmd_reconcile)
+
+    command = commands.add_parser("plot", parents=[data], help="Диаграмма расходов в PNG или SVG")
+    command.add_argument("--out", required=True, help="Путь к файлу .png или .svg")
+    command.add_argument("--top", type=int, help="Показать N крупнейших категорий, остальные — «Прочее»")
+    command.set_defaults(handler=cmd_plot)
+
+    command = commands.add_parser("serve", parents=[data], help="Сервер для нескольких клиентов (JSON по строкам)")
+    address = command.add_mutually_exclusive_group()
+    address.add_argument("--socket", help="Путь к Unix-сокету")
+    address.add_argument("--port", type=int, default=0, help="TCP-порт на localhost (0 — свободный)")
+    command.set_defaults(handler=cmd_serve)
+    return parser
+
+
+def main(argv=None):
+    """
+    Точка входа командной строки.
+    :return: Код возврата.
+    """
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        from solution.main import main as interactive_main
+
+        interactive_main()
+        return 0
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except Exception as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    return 0
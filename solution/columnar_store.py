@@ -0,0 +1,133 @@
+from array import array
+from solution.reductions import masked_sum, sum_minor
+from solution.transaction import Transaction
+
+
+INCOME = 1  # Битовая маска типа "income"
+EXPENSE = 2  # Битовая маска типа "expense"
+
+TYPE_FLAGS = {"income": INCOME, "expense": EXPENSE}
+FLAG_TYPES = {INCOME: "income", EXPENSE: "expense"}
+
+
+def type_flag(transaction_type):
+    """
+    Битовая маска типа транзакции.
+    :raises ValueError: Если тип не "income" и не "expense".
+    """
+    flag = TYPE_FLAGS.get(transaction_type)
+    if flag is None:
+        raise ValueError(f"Неизвестный тип транзакции: {transaction_type!r}.")
+    return flag
+
+
+class ColumnarStore:
+    """
+    Колоночное хранилище транзакций на массивах array.
+
+    Каждая транзакция занимает 17 байт: дата как int32 (порядковый номер дня),
+    сумма как int64 в копейках, тип как битовая маска и код категории из словаря.
+    Объекты Transaction создаются только при обращении к строкам.
+    """
+    def __init__(self):
+        self.dates = array("i")  # Порядковые номера дней (date.toordinal())
+        self.amounts = array("q")  # Суммы в копейках
+        self.kinds = array("B")  # Битовые маски типов
+        self.category_codes = array("I")  # Коды категорий
+        self.categories = []  # Код -> название категории
+        self._category_lookup = {}  # Название категории -> код
+
+    def __len__(self):
+        return len(self.dates)
+
+    def __iter__(self):
+        for i in range(len(self.dates)):
+            yield Transaction.from_row(self.row(i))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [Transaction.from_row(self.row(i)) for i in range(*index.indices(len(self)))]
+        return Transaction.from_row(self.row(self._normalize(index)))
+
+    def __setitem__(self, index, transaction):
+        self.set_row(self._normalize(index), transaction.to_row())
+
+    def _normalize(self, index):
+        """Приводит отрицательный индекс к положительному и проверяет границы."""
+        if index < 0:
+            index += len(self.dates)
+        if not 0 <= index < len(self.dates):
+            raise IndexError("индекс транзакции вне диапазона")
+        return index
+
+    def encode_category(self, category):
+        """Возвращает код категории, добавляя ее в словарь при необходимости."""
+        code = self._category_lookup.get(category)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(category)
+            self._category_lookup[category] = code
+        return code
+
+    def row(self, index):
+        """Возвращает строку (порядковый номер дня, тип, категория, сумма в копейках)."""
+        return (
+            self.dates[index],
+            FLAG_TYPES[self.kinds[index]],
+            self.categories[self.category_codes[index]],
+            self.amounts[index],
+        )
+
+    def rows(self):
+        """Перебирает строки хранилища без создания объектов Transaction."""
+        for i in range(len(self.dates)):
+            yield self.row(i)
+
+    def append(self, transaction):
+        """Добавляет транзакцию в конец хранилища."""
+        self.append_row(transaction.to_row())
+
+    def append_row(self, row):
+        """
+        Добавляет строку (порядковый номер дня, тип, категория, сумма в копейках).
+        :raises ValueError: Если тип неизвестен; столбцы при этом не меняются.
+        """
+        ordinal, transaction_type, category, amount_minor = row
+        kind = type_flag(transaction_type)  # До изменения столбцов, чтобы они не разошлись
+        self.dates.append(ordinal)
+        self.kinds.append(kind)
+        self.category_codes.append(self.encode_category(category))
+        self.amounts.append(amount_minor)
+
+    def extend_rows(self, rows):
+        """Добавляет несколько строк подряд."""
+        for row in rows:
+            self.append_row(row)
+
+    def set_row(self, index, row):
+        """Заменяет строку по индексу."""
+        ordinal, transaction_type, category, amount_minor = row
+        kind = type_flag(transaction_type)
+        self.dates[index] = ordinal
+        self.kinds[index] = kind
+        self.category_codes[index] = self.encode_category(category)
+        self.amounts[index] = amount_minor
+
+    def pop(self, index=-1):
+        """Удаляет строку по индексу и возвращает ее в виде Transaction."""
+        index = self._normalize(index)
+        transaction = Transaction.from_row(self.row(index))
+        for column in (self.dates, self.amounts, self.kinds, self.category_codes):
+            column.pop(index)
+        return transaction
+
+    def clear(self):
+        """Удаляет все строки, сохраняя словарь категорий."""
+        for column in (self.dates, self.amounts, self.kinds, self.category_codes):
+            del column[:]
+
+    def total(self, kind_mask):
+        """Сумма в копейках по всем строкам, тип которых входит в маску."""
+        if kind_mask == INCOME | EXPENSE:
+            return sum_minor(self.amounts)
+        return masked_sum(self.amounts, self.kinds, kind_mask)
@@ -0,0 +1,24 @@
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def optional_numpy():
+    """
+    Возвращает модуль numpy, если он установлен, иначе None.
+    Импорт выполняется при первом обращении, чтобы не замедлять запуск.
+    """
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+@lru_cache(maxsize=None)
+def optional_zstd():
+    """Возвращает модуль zstandard, если он установлен, иначе None."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
@@ -0,0 +1,122 @@
+import csv
+from datetime import date, datetime
+from functools import lru_cache
+from solution.aggregates import RunningAggregates
+from solution.money import format_minor, parse_minor
+
+
+CSV_HEADER = ["Date", "Type", "Category", "Amount"]
+ID_COLUMN = "Id"  # Столбец с постоянным идентификатором транзакции (в старых файлах его нет)
+DEFAULT_CHUNK_SIZE = 50_000  # Количество строк в одной порции
+
+
+@lru_cache(maxsize=8192)
+def parse_date(text):
+    """
+    Переводит дату ГГГГ-ММ-ДД в порядковый номер дня.
+    Строка фиксированного формата разбирается срезами без strptime,
+    а повторяющиеся даты берутся из кэша.
+    """
+    if len(text) == 10 and text[4] == "-" and text[7] == "-":
+        try:
+            return date(int(text[:4]), int(text[5:7]), int(text[8:])).toordinal()
+        except ValueError:
+            pass
+    return datetime.strptime(text, "%Y-%m-%d").toordinal()
+
+
+def iter_row_batches(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Потоково читает CSV-файл и выдает порции строк ограниченного размера.
+    Каждая строка — кортеж (порядковый номер дня, тип, категория, сумма в копейках).
+    В памяти одновременно находится не больше одной порции.
+    :param filepath: Путь к CSV-файлу.
+    :param chunk_size: Максимальное количество строк в порции.
+    """
+    with open(filepath, "r", newline="", encoding="utf-8") as file:
+        yield from read_row_batches(file, chunk_size)
+
+
+def read_row_batches(file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    То же, что iter_row_batches, но для уже открытого текстового потока
+    (например, sys.stdin).
+    """
+    for rows, _ in read_id_batches(file, chunk_size):
+        yield rows
+
+
+def iter_id_batches(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Как iter_row_batches, но выдает пары (порция строк, id строк); см. read_id_batches."""
+    with open(filepath, "r", newline="", encoding="utf-8") as file:
+        yield from read_id_batches(file, chunk_size)
+
+
+def read_id_batches(file, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Читает порции строк вместе с идентификаторами из столбца Id.
+    Если столбца нет (файл старого формата), вместо списка id выдается None.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    date_col, type_col, category_col, amount_col = (header.index(name) for name in CSV_HEADER)
+    id_col = header.index(ID_COLUMN) if ID_COLUMN in header else None
+    strings = {}  # Одна копия строки на каждую категорию и тип
+    batch = []
+    ids = [] if id_col is not None else None
+    for record in reader:
+        if not record:
+            continue
+        transaction_type = record[type_col]
+        category = record[category_col]
+        batch.append((
+            parse_date(record[date_col]),
+            strings.setdefault(transaction_type, transaction_type),
+            strings.setdefault(category, category),
+            parse_minor(record[amount_col]),
+        ))
+        if id_col is not None:
+            ids.append(int(record[id_col]) if record[id_col] else None)
+        if len(batch) >= chunk_size:
+            yield batch, ids
+            batch = []
+            ids = [] if id_col is not None else None
+    if batch:
+        yield batch, ids
+
+
+def has_id_column(filepath):
+    """Проверяет, есть ли в заголовке CSV-файла столбец Id."""
+    with open(filepath, "r", newline="", encoding="utf-8") as file:
+        return ID_COLUMN in next(csv.reader(file), [])
+
+
+def aggregate_csv(filepath, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Считает итоги по CSV-файлу, не загружая его целиком в память.
+    :return: RunningAggregates с итогами по файлу.
+    """
+    aggregates = RunningAggregates()
+    for batch in iter_row_batches(filepath, chunk_size):
+        aggregates.on_extend(0, batch)
+    return aggregates
+
+
+@lru_cache(maxsize=8192)
+def format_date(ordinal):
+    """Переводит порядковый номер дня обратно в строку ГГГГ-ММ-ДД."""
+    return date.fromordinal(ordinal).isoformat()
+
+
+def format_row(row, transaction_id=None):
+    """
+    Переводит строку (порядковый номер дня, тип, категория, копейки) в запись CSV.
+    :param transaction_id: id транзакции для столбца Id; None — без столбца.
+    """
+    ordinal, transaction_type, category, amount_minor = row
+    record = [format_date(ordinal), transaction_type, category, format_minor(amount_minor)]
+    if transaction_id is not None:
+        record.append(transaction_id)
+    return record
@@ -0,0 +1,39 @@
+from datetime import date, datetime
+
+
+def month_bounds(month, year):
+    """
+    Возвращает полуинтервал [start, end) порядковых номеров дней для месяца.
+    :param month: Месяц (1-12).
+    :param year: Год.
+    """
+    start = date(year, month, 1).toordinal()
+    if month == 12:
+        end = date(year + 1, 1, 1).toordinal()
+    else:
+        end = date(year, month + 1, 1).toordinal()
+    return start, end
+
+
+def quarter_bounds(quarter, year):
+    """
+    Возвращает полуинтервал [start, end) порядковых номеров дней для квартала.
+    :param quarter: Квартал (1-4).
+    :param year: Год.
+    """
+    if not 1 <= quarter <= 4:
+        raise ValueError("Квартал должен быть от 1 до 4.")
+    first_month = 3 * (quarter - 1) + 1
+    start, _ = month_bounds(first_month, year)
+    _, end = month_bounds(first_month + 2, year)
+    return start, end
+
+
+def to_ordinal(value):
+    """
+    Переводит дату в порядковый номер дня.
+    :param value: Строка ГГГГ-ММ-ДД, date или datetime.
+    """
+    if isinstance(value, str):
+        value = datetime.strptime(value, "%Y-%m-%d")
+    return value.toordinal()
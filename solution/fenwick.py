@@ -0,0 +1,55 @@
+class FenwickTree:
+    """
+    Дерево Фенвика: префиксные суммы массива с изменением элемента
+    и добавлением в конец за O(log n). Индексы элементов начинаются с 0.
+    """
+    def __init__(self, values=()):
+        """:param values: Начальные значения; дерево строится за O(n)."""
+        tree = [0]
+        tree.extend(values)
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self._tree = tree  # Узел i покрывает элементы (i - lowbit(i), i], индексы с 1
+
+    def __len__(self):
+        return len(self._tree) - 1
+
+    def prefix(self, count):
+        """Сумма первых count элементов."""
+        total = 0
+        tree = self._tree
+        while count > 0:
+            total += tree[count]
+            count &= count - 1
+        return total
+
+    def add(self, position, delta):
+        """Прибавляет delta к элементу с индексом position."""
+        i = position + 1
+        tree = self._tree
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def append(self, value):
+        """Добавляет элемент в конец."""
+        i = len(self._tree)
+        self._tree.append(value + self.prefix(i - 1) - self.prefix(i - (i & -i)))
+
+    def select(self, k):
+        """
+        Индекс элемента, на котором префиксная сумма впервые превышает k
+        (для неотрицательных значений). Для массива из 0 и 1 — позиция k-й единицы.
+        """
+        tree = self._tree
+        position = 0
+        step = 1 << len(tree).bit_length()
+        while step:
+            following = position + step
+            if following < len(tree) and tree[following] <= k:
+                position = following
+                k -= tree[following]
+            step >>= 1
+        return position
@@ -1,7 +1,35 @@
 import csv
 import os
-import matplotlib.pyplot as plt
-from solution.transaction import Transaction
+from contextlib import contextmanager
+from datetime import date
+from itertools import chain
+from solution.aggregates import RunningAggregates
+from solution.archive import Archive
+from solution.budgets import BUDGETS_FILE, DEFAULT_THRESHOLDS, Budget, BudgetEngine, parse_period
+from solution.columnar_store import ColumnarStore, type_flag
+from solution.csv_loader import CSV_HEADER, DEFAULT_CHUNK_SIZE, ID_COLUMN, format_row, has_id_column
+from solution.dates import month_bounds, quarter_bounds, to_ordinal
+from solution.ids import IdIndex, PositionView, saved_next_id
+from solution.indexes import CategoryIndex, DateIndex
+from solution.instrumentation import Instrumentation, instrumented
+from solution.journal import Journal, compact_file
+from solution.money import from_minor, to_minor
+from solution.plotting import ChartData, SpendingChart
+from solution.reconcile import LedgerIndex, index_path, reconcile, source_signature
+from solution.rollups import BalanceRollup
+from solution.row_fingerprints import AppendState, FingerprintWriter, load_fingerprints, row_fingerprint
+from solution.snapshot import Snapshot, write_snapshot
+from solution.storage import ArchiveBackend, BackendIds, BackendRows, CsvBackend
+from solution.transaction import FrozenTransaction, Transaction
+
+
+class _Batch:
+    """Изменения, накопленные внутри FinanceTracker.batch()."""
+    def __init__(self):
+        self.operations = []  # (op, id, row) для сохранения в хранилище
+        self.deletes = set()  # id транзакций, которые удаляются при выходе из пакета
+        self.undo = []  # Как отменить добавления и правки при исключении
+        self.filenames = set()  # Файлы, указанные в edit_transaction и delete_transaction
 
 
 def ensure_files_directory_exists():
@@ -11,13 +39,407 @@ def ensure_files_directory_exists():
 
 class FinanceTracker:
     """Класс для управления финансами."""
-    def __init__(self):
-        self.transactions = []  # Список для хранения всех транзакций
-    
+    def __init__(self, columnar=False, check_consistency=False, backend=None, frozen=False):
+        """
+        :param columnar: Хранить транзакции в колоночном хранилище ColumnarStore
+            вместо списка объектов Transaction (экономит память на больших журналах).
+        :param check_consistency: Перед каждым запросом итогов сверять накопительные
+            итоги с полным пересчетом (режим отладки).
+        :param backend: Хранилище (StorageBackend), к которому сразу подключается трекер.
+        :param frozen: Создавать транзакции из загруженных строк как компактные
+            неизменяемые FrozenTransaction вместо Transaction.
+        """
+        self.columnar = columnar
+        self.transaction_class = FrozenTransaction if frozen else Transaction
+        self.check_consistency = check_consistency
+        self.backend = None  # Хранилище, содержимое которого совпадает с трекером
+        self._new_storage()  # Хранилище транзакций, их id и self.transactions
+        self.aggregates = RunningAggregates()  # Накопительные итоги
+        self.date_index = DateIndex()  # Индекс по датам для отчетов за период
+        self.category_index = CategoryIndex()  # Индекс по категориям
+        self.rollup = BalanceRollup()  # Баланс во времени (префиксные суммы по дням)
+        self._append_state = AppendState()  # Отметки уровня для дозаписи в CSV-файлы
+        self.budgets = BudgetEngine()  # Бюджеты по категориям и предупреждения о порогах
+        self.budgets_path = None  # Файл бюджетов (см. load_budgets)
+        # Данные диаграммы расходов, пересчитываются только после изменений
+        self.chart_data = ChartData(lambda: self.get_category_totals("expense"))
+        self._chart = None  # Диаграмма создается при первом построении
+        self._batch = None  # Открытый пакет изменений (см. batch)
+        # Замеры операций (см. enable_instrumentation); по умолчанию выключены
+        self.instrumentation = Instrumentation.from_environment()
+        # Наблюдатели, которые получают уведомления об изменениях транзакций
+        self._listeners = self._default_listeners()
+        if backend is not None:
+            self.open_backend(backend)
+
+    def enable_instrumentation(self, profile=False, trace_memory=False):
+        """
+        Включает замеры операций: время и количество вызовов, счетчики строк,
+        по желанию профиль cProfile и пик памяти tracemalloc.
+        :return: Instrumentation; статистика — instrumentation.stats() или dump().
+        """
+        self.disable_instrumentation()
+        self.instrumentation = Instrumentation(profile=profile, trace_memory=trace_memory)
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """Выключает замеры и возвращает собранные (или None)."""
+        instrumentation, self.instrumentation = self.instrumentation, None
+        if instrumentation is not None:
+            instrumentation.close()
+        return instrumentation
+
+    def _count(self, name, value=1):
+        """Прибавляет value к счетчику замеров, если они включены."""
+        if self.instrumentation is not None:
+            self.instrumentation.count(name, value)
+
+    def _default_listeners(self):
+        """Наблюдатели, которые ведут структуры в памяти."""
+        return [
+            self.aggregates, self.date_index, self.category_index,
+            self.rollup, self._append_state, self.chart_data, self.budgets,
+        ]
+
+    @property
+    def _pushdown(self):
+        """Выполняются ли запросы в хранилище, а не в памяти."""
+        return self.backend is not None and self.backend.pushdown
+
+    def _new_storage(self):
+        """
+        Создает пустое хранилище транзакций (self._store) и индекс их id.
+
+        Строки в памяти адресуются слотами: удаление оставляет надгробие
+        в индексе id, а хранилище и индексы по слотам не сдвигаются
+        (см. _remove_row). self.transactions показывает живые транзакции
+        по позициям. У хранилища с pushdown слоты совпадают с позициями.
+        """
+        if self._pushdown:
+            self._store = self.transactions = BackendRows(self.backend)
+            self.ids = BackendIds(self.backend)
+            return
+        self._store = ColumnarStore() if self.columnar else []
+        self.ids = IdIndex(auto_compact=False)
+        self.transactions = PositionView(self._store, self.ids)
+
+    def _slot(self, index):
+        """Слот транзакции по ее индексу."""
+        return index if self._pushdown else self.ids.slot_at(index)
+
+    def _slot_row(self, slot):
+        """Возвращает строку транзакции по слоту без создания Transaction."""
+        if isinstance(self._store, list):
+            return self._store[slot].to_row()
+        return self._store.row(slot)
+
+    def _row(self, index):
+        """Возвращает строку транзакции по индексу без создания Transaction."""
+        return self.transactions.row(index)
+
+    def _rows(self):
+        """Перебирает строки всех транзакций."""
+        return self.transactions.rows()
+
+    def _reset(self):
+        """Очищает хранилище и все производные структуры."""
+        self._new_storage()
+        for listener in self._listeners:
+            listener.on_reset(())
+
+    def _insert_row(self, row, transaction=None, transaction_id=None):
+        """
+        Добавляет строку в конец хранилища и уведомляет наблюдателей.
+        :param transaction_id: Сохраненный id; по умолчанию выдается новый.
+        :return: id добавленной транзакции.
+        """
+        type_flag(row[1])  # Неизвестный тип отклоняется до изменения хранилища
+        slot = len(self._store)
+        if isinstance(self._store, list):
+            self._store.append(transaction or self.transaction_class.from_row(row))
+        else:
+            self._store.append_row(row)
+        transaction_id = self.ids.append(transaction_id)
+        for listener in self._listeners:
+            listener.on_add(slot, row)
+        return transaction_id
+
+    def _replace_row(self, index, row, transaction=None):
+        """Заменяет строку по индексу и уведомляет наблюдателей."""
+        type_flag(row[1])
+        slot = self._slot(index)
+        old_row = self._slot_row(slot)
+        if isinstance(self._store, list):
+            self._store[slot] = transaction or self.transaction_class.from_row(row)
+        else:
+            self._store.set_row(slot, row)
+        for listener in self._listeners:
+            listener.on_edit(slot, old_row, row)
+
+    def _remove_row(self, index):
+        """
+        Удаляет строку по индексу и уведомляет наблюдателей.
+        В памяти строка только отмечается удаленной за O(log n): ее слот
+        становится надгробием, пока хранилище не будет уплотнено.
+        """
+        slot = self._slot(index)
+        row = self._slot_row(slot)
+        self.ids.remove_at(index)
+        if self._pushdown:
+            self._store.pop(index)
+        elif isinstance(self._store, list):
+            self._store[slot] = None  # Объект транзакции больше не нужен
+        for listener in self._listeners:
+            listener.on_delete(slot, row)
+        self._compact_store()
+
+    def _compact_store(self):
+        """
+        Уплотняет хранилище в памяти, когда надгробий становится больше,
+        чем живых строк: живые строки переходят на слоты своих позиций, а
+        индексы по слотам (и отметки дозаписи) перестраиваются. Стоит O(n),
+        но выполняется не чаще, чем раз в n/2 удалений.
+        """
+        if self._pushdown or not self.ids.needs_compaction():
+            return
+        if isinstance(self._store, list):
+            self._store = list(self.transactions)
+        else:
+            store = ColumnarStore()
+            store.extend_rows(self._rows())
+            self._store = store
+        self.ids.compact()
+        self.transactions = PositionView(self._store, self.ids)
+        rows = list(self._rows())
+        for listener in (self.date_index, self.category_index, self._append_state):
+            listener.on_reset(rows)
+
+    def _extend_rows(self, rows, ids=None):
+        """
+        Добавляет порцию строк (порядковый номер дня, тип, категория, сумма в копейках).
+        Используется при массовой загрузке, чтобы не создавать лишних объектов.
+        :param ids: Сохраненные id строк; по умолчанию выдаются новые.
+        """
+        for transaction_type in {row[1] for row in rows}:
+            type_flag(transaction_type)  # Неизвестный тип отклоняется до изменения хранилища
+        start = len(self._store)
+        if isinstance(self._store, list):
+            self._store.extend(self.transaction_class.from_row(row) for row in rows)
+        else:
+            self._store.extend_rows(rows)
+        self.ids.extend(ids, len(rows))
+        for listener in self._listeners:
+            listener.on_extend(start, rows)
+
+    @instrumented
+    def open_backend(self, backend, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Подключает хранилище. Хранилище с pushdown используется напрямую,
+        остальные загружаются в память порциями, после чего применяются
+        их накопленные изменения.
+        :param backend: Экземпляр StorageBackend.
+        """
+        self.backend = backend
+        if backend.pushdown:
+            self._listeners = [self.rollup, self._append_state, self.chart_data, self.budgets]
+        else:
+            self._listeners = self._default_listeners()
+        if backend.pushdown:
+            self._sync_pushdown()
+            return
+        self._reset()
+        self.backend = None  # Пока идет загрузка, изменения не пишутся обратно
+        for batch, ids in backend.iter_id_batches(chunk_size):
+            self._extend_rows(batch, ids)
+        self._count("rows_loaded", len(self.transactions))
+        records = backend.changes()
+        for record in records:
+            self._apply_record(record)
+        self._count("journal_records", len(records))
+        # id удаленных последними строк не выдаются повторно
+        self.ids.reserve(backend.next_id())
+        self.backend = backend
+
+    def _sync_pushdown(self):
+        """Перестраивает структуры в памяти по хранилищу с pushdown."""
+        self._reset()
+        # Суммы по дням считаются в хранилище одним запросом
+        self.rollup.add_days(self.backend.daily_net())
+        self.budgets.add_totals(self.backend.category_daily_expense())
+
+    def _remove_rows(self, ids):
+        """Удаляет транзакции по множеству id (отложенные удаления пакета)."""
+        if self._pushdown:
+            # Удаляемые строки читаются по первичному ключу, а наблюдатели получают
+            # по уведомлению на строку (с конца, чтобы позиции не сдвигались)
+            removed = sorted(
+                (self.backend.position_of(transaction_id), self.backend.row_by_id(transaction_id))
+                for transaction_id in ids
+            )
+            self.backend.delete_many(ids)
+            for position, row in reversed(removed):
+                for listener in self._listeners:
+                    listener.on_delete(position, row)
+            return
+        # Удаление в памяти не сдвигает слоты, поэтому строки удаляются по одной
+        for transaction_id in ids:
+            self._remove_row(self.ids.position(transaction_id))
+
+    @contextmanager
+    def batch(self):
+        """
+        Пакет изменений:
+
+            with tracker.batch():
+                tracker.edit_transaction(0, transaction)
+                tracker.delete_transaction(5)
+                tracker.delete_transaction(6)
+
+        Внутри пакета индексы не сдвигаются: удаления только отмечаются по id
+        и выполняются при выходе одним проходом. Изменения сохраняются один раз
+        при выходе, а при исключении отменяются все изменения пакета.
+        Вложенный пакет становится частью внешнего.
+        """
+        if self._batch is not None:
+            yield self
+            return
+        batch = self._batch = _Batch()
+        if self._pushdown:
+            self.backend.begin()
+        try:
+            yield self
+        except BaseException:
+            self._batch = None
+            self._rollback(batch)
+            raise
+        self._batch = None
+        self._commit(batch)
+
+    def _commit(self, batch):
+        """Выполняет отложенные удаления и сохраняет пакет одним действием."""
+        if batch.deletes:
+            self._remove_rows(batch.deletes)
+        if self._pushdown:
+            self.backend.commit()
+            return
+        backend = self.backend
+        if backend is not None:
+            if batch.deletes:
+                backend.save_all(self._rows(), self.ids)
+            elif batch.operations:
+                backend.apply(batch.operations)
+                if backend.needs_compaction():
+                    backend.compact(self._rows(), self.ids)
+        for filename in sorted(batch.filenames):
+            if not self._is_synced(os.path.join("files", filename)):
+                self.export_to_csv(filename)
+
+    def _rollback(self, batch):
+        """Отменяет добавления и правки пакета; сохранять нечего, так как запись отложена."""
+        if self._pushdown:
+            self.backend.rollback()
+            self._sync_pushdown()
+            return
+        for undo in reversed(batch.undo):
+            if undo[0] == "add":
+                self._remove_row(len(self.transactions) - 1)
+            else:
+                _, index, row, transaction = undo
+                self._replace_row(index, row, transaction)
+
+    @instrumented
+    def import_rows(self, batches):
+        """
+        Массово добавляет строки порциями и сохраняет их в подключенное
+        хранилище одним действием, а не по одной транзакции.
+        :param batches: Порции строк (порядковый номер дня, тип, категория, сумма в копейках).
+        :return: Количество добавленных строк.
+        """
+        start = len(self.transactions)
+        for batch in batches:
+            self._extend_rows(batch)
+        self._count("rows_imported", len(self.transactions) - start)
+        backend = self.backend
+        if backend is not None and not backend.pushdown:
+            if isinstance(backend, CsvBackend):
+                self._append_to_csv(backend.filepath)
+            elif isinstance(backend, ArchiveBackend):
+                # В архив дописываются только новые строки, в разделы их месяцев
+                positions = range(start, len(self.transactions))
+                backend.extend([self._row(i) for i in positions], [self.ids.id_at(i) for i in positions])
+            else:
+                backend.save_all(self._rows(), self.ids)
+        return len(self.transactions) - start
+
+    @instrumented
+    def reconcile_statement(self, batches, days=0, tolerance=0, apply=False):
+        """
+        Сверяет выписку с транзакциями трекера (см. solution.reconcile).
+        :param batches: Порции строк выписки (порядковый номер дня, тип, категория, сумма в копейках).
+        :param days: Допустимое расхождение дат в днях.
+        :param tolerance: Допустимое расхождение сумм в рублях.
+        :param apply: Добавить в трекер строки выписки, которых в нем нет.
+        :return: ReconcileReport.
+        """
+        index, path = self._ledger_index()
+        report = reconcile(index, chain.from_iterable(batches), days, to_minor(tolerance))
+        self._count("rows_reconciled", len(report))
+        new_rows = report.new_rows()
+        if apply and new_rows:
+            self.import_rows([new_rows])
+            if path is not None:
+                # Индекс дополняется новыми строками, а не строится заново
+                index.add(new_rows)
+                index.save(index_path(path), source_signature(path))
+        return report
+
+    def _ledger_index(self):
+        """
+        Индекс сверки для транзакций трекера.
+        Если трекер совпадает с файлом хранилища, индекс сохраняется рядом
+        с файлом и при следующей сверке строится заново, только если файл изменился.
+        :return: (LedgerIndex, путь к файлу данных или None).
+        """
+        path = getattr(self.backend, "filepath", None)
+        if path is None or self._batch is not None:
+            return LedgerIndex.build(self._rows()), None
+        return LedgerIndex.for_source(path, self._rows), path
+
+    @instrumented
+    def save_to(self, backend):
+        """Перезаписывает хранилище backend всеми транзакциями трекера вместе с их id."""
+        backend.save_all(self._rows(), self.ids)
+
+    @instrumented
     def add_transaction(self, transaction):
-        """Добавление новой транзакции в список."""
-        self.transactions.append(transaction)
+        """
+        Добавление новой транзакции в список.
+        :return: Постоянный id транзакции.
+        """
+        row = transaction.to_row()
+        type_flag(row[1])  # До сохранения, чтобы неверная строка не попала в журнал
+        if self._batch is not None:
+            transaction_id = self._insert_row(row, transaction)
+            self._batch.undo.append(("add",))
+            self._persist("add", transaction_id, row)
+            return transaction_id
+        if not self._pushdown:
+            # Строка сохраняется до добавления в память (с id, который она получит):
+            # при ошибке записи трекер не меняется и id не расходуется
+            self._persist("add", self.ids.next_id, row)
+        transaction_id = self._insert_row(row, transaction)
+        self._compact_backend()
+        return transaction_id
+
+    def get_id(self, index):
+        """Постоянный id транзакции по ее текущему индексу."""
+        return self.ids.id_at(index)
+
+    def index_of(self, transaction_id):
+        """Текущий индекс транзакции с указанным id или None."""
+        return self.ids.position(transaction_id)
 
+    @instrumented
     def edit_transaction(self, index, new_transaction, filename="data.csv"):
         """
         Редактирует транзакцию по индексу.
@@ -25,36 +447,290 @@ class FinanceTracker:
         :param new_transaction: Новая транзакция.
         """
         if 0 <= index < len(self.transactions):
-            self.transactions[index] = new_transaction
-            self.export_to_csv(filename)
-    
+            self._edit(index, self.get_id(index), new_transaction, filename)
+
+    @instrumented
+    def edit_transaction_by_id(self, transaction_id, new_transaction, filename="data.csv"):
+        """
+        Редактирует транзакцию по постоянному id.
+        :return: True, если транзакция найдена.
+        """
+        index = self.index_of(transaction_id)
+        if index is None:
+            return False
+        self._edit(index, transaction_id, new_transaction, filename)
+        return True
+
+    def _edit(self, index, transaction_id, new_transaction, filename):
+        """Заменяет транзакцию и сохраняет изменение по ее id."""
+        row = new_transaction.to_row()
+        type_flag(row[1])
+        if self._batch is not None:
+            old_transaction = self.transactions[index] if isinstance(self._store, list) else None
+            self._batch.undo.append(("edit", index, self._row(index), old_transaction))
+        apply = lambda: self._replace_row(index, row, new_transaction)
+        self._persist_change(filename, "edit", transaction_id, row, apply)
+
+    @instrumented
     def delete_transaction(self, index, filename="data.csv"):
         """
         Удаляет транзакцию по индексу
         :param index: Индекс транзакции
         """
         if 0 <= index < len(self.transactions):
-            self.transactions.pop(index)
+            self._delete(index, self.get_id(index), filename)
+
+    @instrumented
+    def delete_transaction_by_id(self, transaction_id, filename="data.csv"):
+        """
+        Удаляет транзакцию по постоянному id.
+        :return: True, если транзакция найдена.
+        """
+        index = self.index_of(transaction_id)
+        if index is None:
+            return False
+        self._delete(index, transaction_id, filename)
+        return True
+
+    def _delete(self, index, transaction_id, filename):
+        """Удаляет транзакцию (в пакете — отмечает) и сохраняет удаление по ее id."""
+        if self._batch is not None:
+            self._batch.deletes.add(transaction_id)
+            self._batch.filenames.add(filename)
+            return
+        self._persist_change(filename, "delete", transaction_id, apply=lambda: self._remove_row(index))
+
+    def _is_synced(self, filepath):
+        """Проверяет, совпадает ли содержимое файла с трекером."""
+        return self.backend is not None and self.backend.describes(filepath)
+
+    def _persist_change(self, filename, op, transaction_id, row=None, apply=None):
+        """
+        Применяет изменение в памяти (apply) и сохраняет его: если трекер
+        подключен к этому файлу (или к хранилищу с pushdown), изменение
+        передается хранилищу до изменения памяти, чтобы при ошибке записи
+        трекер остался прежним; иначе файл перезаписывается целиком.
+        Внутри пакета сохранение откладывается.
+        """
+        if self._batch is not None:
+            self._batch.filenames.add(filename)
+            apply()
+            self._persist(op, transaction_id, row)
+        elif self._pushdown or self._is_synced(os.path.join("files", filename)):
+            self._persist(op, transaction_id, row)
+            apply()
+            self._compact_backend()
+        else:
+            apply()
             self.export_to_csv(filename)
-    
+
+    def _persist(self, op, transaction_id=None, row=None):
+        """Передает изменение подключенному хранилищу."""
+        backend = self.backend
+        if backend is None or backend.pushdown:
+            # Хранилище с pushdown уже изменено через self.transactions
+            return
+        if self._batch is not None:
+            self._batch.operations.append((op, transaction_id, row))
+            return
+        if op == "add":
+            backend.append(row, transaction_id)
+        elif op == "edit":
+            backend.replace(transaction_id, row)
+        elif op == "delete":
+            backend.delete(transaction_id)
+
+    def _compact_backend(self):
+        """Сворачивает накопленные изменения хранилища, если их стало много."""
+        backend = self.backend
+        if backend is not None and not backend.pushdown and backend.needs_compaction():
+            backend.compact(self._rows(), self.ids)
+
+    @instrumented
+    def compact(self, filename=None):
+        """
+        Сворачивает журнал в базовый CSV-файл с атомарной заменой.
+        :param filename: Имя файла; по умолчанию файл, с которым синхронизирован трекер.
+        """
+        if filename is not None and not self._is_synced(os.path.join("files", filename)):
+            compact_file(os.path.join("files", filename))
+        elif self.backend is not None:
+            self.backend.compact(self._rows(), self.ids)
+
+    @instrumented
+    def verify_aggregates(self):
+        """
+        Пересчитывает итоги с нуля и сверяет их с накопительными.
+        :raises RuntimeError: Если итоги расходятся.
+        """
+        if isinstance(self._store, ColumnarStore) and len(self._store) == len(self.ids):
+            # Надгробий нет: итоги сворачиваются прямо по столбцам хранилища
+            expected = RunningAggregates.from_store(self._store)
+        else:
+            expected = RunningAggregates.from_rows(self._rows())
+        if expected != self.aggregates:
+            raise RuntimeError("Накопительные итоги не совпадают с полным пересчетом.")
+
+    def _checked_aggregates(self):
+        """Возвращает накопительные итоги, при необходимости сверив их."""
+        if self.check_consistency:
+            self.verify_aggregates()
+        return self.aggregates
+
+    def load_budgets(self, filepath=None):
+        """
+        Загружает бюджеты; дальнейшие изменения бюджетов сохраняются в тот же файл.
+        :param filepath: Файл бюджетов; по умолчанию budgets.json в папке files,
+            рядом с файлами данных.
+        """
+        if filepath is None:
+            ensure_files_directory_exists()
+            filepath = os.path.join("files", BUDGETS_FILE)
+        self.budgets.load(filepath)
+        self.budgets_path = filepath
+
+    def _save_budgets(self):
+        """Сохраняет бюджеты в файл, из которого они загружены (или в файл по умолчанию)."""
+        if self.budgets_path is None:
+            ensure_files_directory_exists()
+            self.budgets_path = os.path.join("files", BUDGETS_FILE)
+        self.budgets.save(self.budgets_path)
+
+    def set_budget(self, category, limit, month=None, thresholds=DEFAULT_THRESHOLDS):
+        """
+        Задает месячный лимит расходов по категории и сохраняет бюджеты.
+        :param limit: Лимит в рублях.
+        :param month: Месяц ГГГГ-ММ; по умолчанию лимит действует на каждый месяц.
+        :param thresholds: Пороги предупреждений в процентах от лимита.
+        :return: Budget.
+        """
+        budget = Budget(category, to_minor(limit), parse_period(month), thresholds)
+        self.budgets.set_budget(budget)
+        self._save_budgets()
+        return budget
+
+    def remove_budget(self, category, month=None):
+        """
+        Удаляет бюджет категории и сохраняет бюджеты.
+        :return: True, если бюджет был.
+        """
+        removed = self.budgets.remove_budget(category, parse_period(month))
+        if removed:
+            self._save_budgets()
+        return removed
+
+    @instrumented
+    def get_budget_report(self, month, year):
+        """
+        Состояние бюджетов за месяц.
+        :return: Список (категория, потрачено, лимит) в рублях.
+        """
+        return [
+            (budget.category, from_minor(spent), from_minor(budget.limit_minor))
+            for budget, spent in self.budgets.status(year, month)
+        ]
+
+    def pop_alerts(self):
+        """Предупреждения о достигнутых порогах бюджетов с прошлого вызова."""
+        return self.budgets.pop_alerts()
+
+    @instrumented
     def get_balance(self):
         """Расчет текущего баланса (доходы минус расходы)."""
-        income = sum(t.amount for t in self.transactions if t.type == "income")
-        expense = sum(t.amount for t in self.transactions if t.type == "expense")
-        return income - expense
+        if self._pushdown:
+            return from_minor(self.backend.balance())
+        return from_minor(self._checked_aggregates().balance())
+
+    @instrumented
+    def get_category_totals(self, transaction_type="expense"):
+        """Суммы по категориям для указанного типа транзакций."""
+        if self._pushdown:
+            totals = self.backend.category_totals(transaction_type)
+            return {category: from_minor(total) for category, total in totals.items()}
+        aggregates = self._checked_aggregates()
+        return {
+            category: from_minor(total)
+            for (category, kind), total in aggregates.by_category.items()
+            if kind == transaction_type
+        }
+
+    @instrumented
+    def get_monthly_totals(self, month, year):
+        """Доходы и расходы за указанный месяц."""
+        if self._pushdown:
+            totals = self.backend.totals_between(*month_bounds(month, year))
+            return {kind: from_minor(totals.get(kind, 0)) for kind in ("income", "expense")}
+        aggregates = self._checked_aggregates()
+        return {
+            kind: from_minor(aggregates.month_total(month, year, kind))
+            for kind in ("income", "expense")
+        }
+
+    @instrumented
+    def get_balance_at(self, day):
+        """
+        Баланс на конец дня.
+        :param day: Строка ГГГГ-ММ-ДД, date или datetime.
+        """
+        return from_minor(self.rollup.balance_at(to_ordinal(day)))
+
+    @instrumented
+    def get_net_flow(self, start, end):
+        """Доходы минус расходы за период с start по end включительно."""
+        return from_minor(self.rollup.net_flow(to_ordinal(start), to_ordinal(end)))
+
+    @instrumented
+    def get_balance_series(self, start, end, period="month"):
+        """
+        Баланс во времени по дням, неделям или месяцам.
+        :param period: "day", "week" или "month".
+        :return: Список (начало периода как date, оборот за период, баланс на конец периода).
+        """
+        return [
+            (date.fromordinal(first_day), from_minor(flow), from_minor(balance))
+            for first_day, flow, balance in self.rollup.series(to_ordinal(start), to_ordinal(end), period)
+        ]
 
+    @instrumented
     def get_transactions_by_category(self, category):
         """Получение всех транзакций по указанной категории."""
-        return [t for t in self.transactions if t.category == category]
+        if self._pushdown:
+            return [self.transaction_class.from_row(row) for row in self.backend.category_rows(category)]
+        return [self._store[slot] for slot in self.category_index.slots(category)]
+
+    @instrumented
+    def get_report_between(self, start, end):
+        """
+        Получение всех транзакций за период, упорядоченных по дате.
+        :param start: Первый день периода (строка ГГГГ-ММ-ДД, date или datetime).
+        :param end: Последний день периода включительно.
+        """
+        return self._report(to_ordinal(start), to_ordinal(end) + 1)
 
+    @instrumented
     def get_monthly_report(self, month, year):
-        """Получение всех транзакций за указанный месяц и год."""
-        monthly_transactions = [
-            t for t in self.transactions
-            if t.date.month == month and t.date.year == year
-        ]
-        return monthly_transactions
+        """
+        Получение всех транзакций за указанный месяц и год.
+        Для несуществующего месяца (например, 13) возвращается пустой список.
+        """
+        try:
+            start, end = month_bounds(month, year)
+        except ValueError:
+            return []
+        return self._report(start, end)
+
+    @instrumented
+    def get_quarterly_report(self, quarter, year):
+        """Получение всех транзакций за указанный квартал (1-4) и год."""
+        return self._report(*quarter_bounds(quarter, year))
 
+    def _report(self, start, end):
+        """Транзакции с датой в полуинтервале [start, end) порядковых номеров дней."""
+        if self._pushdown:
+            return [self.transaction_class.from_row(row) for row in self.backend.rows_between(start, end)]
+        return [self._store[slot] for slot in self.date_index.slots_between(start, end)]
+
+    @instrumented
     def export_to_csv(self, filename, mode="w"):
         """
         Экспортирует транзакции в CSV-файл.
@@ -64,91 +740,210 @@ class FinanceTracker:
         ensure_files_directory_exists()
         filepath = os.path.join("files", filename)  # Полный путь к файлу
         try:
-            with open(filepath, mode=mode, newline="", encoding="utf-8") as file:
-                self._writer_header(file, mode)
-                new_transactions = self._get_new_transaction(filepath, mode)
-                self._write_transactions(file, new_transactions)
+            if mode == "w":
+                # Файл заменяется атомарно и с этого момента совпадает с трекером
+                backend = CsvBackend(filepath)
+                backend.save_all(self._rows(), self.ids)
+                if not self._pushdown:
+                    self.backend = backend
+            else:
+                self._append_to_csv(filepath)
             print(f"Данные успешно экспортированы в {filepath}.")
         except Exception as e:
             print(f"Ошибка при экспорте данных: {e}")
 
-    def _writer_header(self, file, mode):
+    @instrumented
+    def _append_to_csv(self, filepath):
         """
-        Записывает заголовок CSV-файла, если файл открыт в режиме перезаписи
+        Дописывает в CSV-файл транзакции, которых в нем еще нет, сохраняя их порядок.
+        Перед этим журнал файла сворачивается, а после — начинается заново,
+        так как базовый файл изменился.
         """
-        if mode == "w":
-            writer = csv.writer(file)
-            writer.writerow(["Date", "Type", "Category", "Amount"])
+        if self._is_synced(filepath):
+            journal = self.backend.journal
+            if journal.pending:
+                journal.compact(self._rows(), self.ids)
+        else:
+            journal = Journal(filepath)
+            compact_file(filepath)
+        new_rows, leftover = self._get_new_transaction(filepath)
+        write_header = not os.path.exists(filepath)
+        # В файл старого формата (без столбца Id) строки дописываются без id
+        with_ids = write_header or has_id_column(filepath)
+        fingerprints = FingerprintWriter(filepath, mode="w" if write_header else "a")
+        try:
+            with open(filepath, mode="a", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                if write_header:
+                    writer.writerow(CSV_HEADER + [ID_COLUMN])
+                for row, transaction_id in new_rows:
+                    writer.writerow(format_row(row, transaction_id if with_ids else None))
+                    fingerprints.add(row)
+        except Exception:
+            fingerprints.abort()
+            raise
+        fingerprints.close()
+        self._append_state.set(filepath, len(self._store), leftover)
+        if os.path.exists(journal.path):
+            journal.reset(saved_next_id(self.ids))
 
-    def _get_new_transaction(self, filename, mode):
+    @instrumented
+    def _get_new_transaction(self, filepath):
         """
-        Возвращает список новых транзакций, которые еще не записаны в файл.
+        Возвращает пары (строка, id) транзакций, которых еще нет в файле,
+        и остаток отпечатков файла.
+
+        Строки файла сравниваются как мультимножество: две одинаковые покупки
+        в один день — это две транзакции. Отпечатки файла берутся из файла
+        отпечатков, а транзакции, уже сопоставленные прошлой дозаписью
+        (до отметки уровня), повторно не просматриваются.
         """
-        if mode == "a":
-            existing_transactions = self._load_existing_transactions(filename)
-            # Используем множества для поиска новых транзакций
-            existing_set = set(existing_transactions)
-            current_set = set(self.transactions)
-            new_transactions = list(current_set - existing_set)
-            return new_transactions
-        return self.transactions
+        state = self._append_state.take(filepath)
+        if state is None:
+            mark, leftover = 0, load_fingerprints(filepath)
+        else:
+            mark, leftover = state
+        new_rows = []
+        self._count("rows_scanned", len(self._store) - mark)
+        for slot, transaction_id in self._slot_ids(mark):
+            row = self._slot_row(slot)
+            fingerprint = row_fingerprint(row)
+            if leftover[fingerprint]:
+                leftover[fingerprint] -= 1
+            else:
+                new_rows.append((row, transaction_id))
+        self._count("rows_appended", len(new_rows))
+        return new_rows, leftover
 
-    def _write_transactions(self, file, transactions):
+    def _slot_ids(self, start):
+        """Пары (слот, id) транзакций начиная со слота start."""
+        if self._pushdown:
+            return ((slot, self.ids.id_at(slot)) for slot in range(start, len(self._store)))
+        return self.ids.items(start)
+
+    @instrumented
+    def load_from_csv(self, filename, chunk_size=DEFAULT_CHUNK_SIZE):
         """
-        Записывает транзакции в CSV-файл.
+        Загружает тразакции из csv.
+        Файл читается потоково порциями по chunk_size строк, затем
+        применяются операции из журнала файла.
         """
-        writer = csv.writer(file)
-        for t in transactions:
-            writer.writerow([t.date.strftime("%Y-%m-%d"), t.type, t.category, t.amount])
+        ensure_files_directory_exists()  # Убедимся, что папка 'files' существует
+        filepath = os.path.join("files", filename)  # Полный путь к файлу
+        try:
+            self.backend = None
+            self.open_backend(CsvBackend(filepath), chunk_size)
+            print(f"Данные успешно загружены из {filepath}")
+        except FileNotFoundError:
+            print(f"Файл {filepath} не найден. Начните с пустого списка транзакций.")
+        except Exception as e:
+            print(f"Ошибка при загрузке данных: {e}")
 
-    def _load_existing_transactions(self, filename):
+    @instrumented
+    def export_to_snapshot(self, filename):
         """
-        Загружает существующие транзакции из CSV-файла.
+        Сохраняет транзакции в бинарный снапшот в папке files.
+        :param filename: Имя файла снапшота (например, data.snap).
         """
-        existing_transactions = []
+        ensure_files_directory_exists()
+        filepath = os.path.join("files", filename)
         try:
-            with open(filename, mode="r", encoding="utf-8") as file:
-                reader = csv.DictReader(file)
-                for row in reader:
-                    amount = float(row["Amount"])
-                    category = row["Category"]
-                    date = row["Date"]
-                    transaction_type = row["Type"]
-                    transaction = Transaction(amount, category, date, transaction_type)
-                    existing_transactions.append(transaction)
+            write_snapshot(filepath, self._rows(), self.ids)
+            print(f"Снапшот сохранен в {filepath}.")
         except Exception as e:
-            print(f"Ошибка при загрузке существующих транзакций: {e}")
-        return existing_transactions
+            print(f"Ошибка при сохранении снапшота: {e}")
 
-    def load_from_csv(self, filename):
-        """Загружает тразакции из csv."""
-        ensure_files_directory_exists()  # Убедимся, что папка 'files' существует
-        filepath = os.path.join("files", filename)  # Полный путь к файлу
+    @instrumented
+    def export_to_archive(self, filename, codec=None):
+        """
+        Сохраняет транзакции в архив по месяцам в папке files; после этого
+        изменения сохраняются в разделы архива.
+        :param filename: Имя папки архива (например, data.archive).
+        :param codec: "gzip" или "zstd"; по умолчанию zstd, если он установлен.
+        """
+        ensure_files_directory_exists()
+        filepath = os.path.join("files", filename)
+        try:
+            backend = ArchiveBackend(filepath, codec)
+            backend.save_all(self._rows(), self.ids)
+            if not self._pushdown:
+                self.backend = backend
+            print(f"Архив сохранен в {filepath}.")
+        except Exception as e:
+            print(f"Ошибка при сохранении архива: {e}")
+
+    @instrumented
+    def load_archive(self, filename):
+        """
+        Загружает транзакции из архива по месяцам в папке files.
+        :param filename: Имя папки архива (например, data.archive).
+        """
+        ensure_files_directory_exists()
+        filepath = os.path.join("files", filename)
+        try:
+            if not Archive.exists(filepath):
+                raise FileNotFoundError(filepath)
+            self.backend = None
+            self.open_backend(ArchiveBackend(filepath))
+            print(f"Данные успешно загружены из {filepath}")
+        except FileNotFoundError:
+            print(f"Архив {filepath} не найден. Начните с пустого списка транзакций.")
+        except Exception as e:
+            print(f"Ошибка при загрузке архива: {e}")
+
+    @instrumented
+    def load_snapshot(self, filename):
+        """
+        Загружает транзакции из бинарного снапшота без разбора текста.
+        :param filename: Имя файла снапшота в папке files.
+        """
+        ensure_files_directory_exists()
+        filepath = os.path.join("files", filename)
         try:
-            self.transactions = []
-            with open(filepath, "r", encoding="utf-8") as my_file:
-                reader = csv.DictReader(my_file)
-                for row in reader:
-                    amount = float(row["Amount"])
-                    category = row["Category"]
-                    date = row["Date"]
-                    transaction_type = row["Type"]
-                    transaction = Transaction(amount, category, date, transaction_type)
-                    self.add_transaction(transaction)
+            self.backend = None
+            self._listeners = self._default_listeners()
+            self._reset()
+            with Snapshot(filepath) as snapshot:
+                for batch, ids in snapshot.iter_id_batches():
+                    self._extend_rows(batch, ids)
+                self.ids.reserve(snapshot.next_id)
+            self._count("rows_loaded", len(self.transactions))
             print(f"Данные успешно загружены из {filepath}")
         except FileNotFoundError:
             print(f"Файл {filepath} не найден. Начните с пустого списка транзакций.")
         except Exception as e:
-            print(f"Ошибка при загрузке данных: {e}")
+            print(f"Ошибка при загрузке снапшота: {e}")
+
+    def _apply_record(self, record):
+        """
+        Применяет операцию из журнала, не записывая ее повторно.
+        Записи старого формата адресуют транзакцию позицией "index" вместо id.
+        """
+        op = record["op"]
+        if op == "add":
+            self._insert_row(record["row"], transaction_id=record.get("id"))
+            return
+        index = self.index_of(record["id"]) if "id" in record else record["index"]
+        if op == "edit":
+            self._replace_row(index, record["row"])
+        elif op == "delete":
+            self._remove_row(index)
 
-    def plot_spending_by_category(self):
-        """Визуализация расходов по категориям в виде круговой диаграммы."""
-        categories = {}
-        for t in self.transactions:
-            if t.type == "expense":
-                categories[t.category] = categories.get(t.category, 0) + t.amount
-
-        plt.figure(figsize=(8, 8))
-        plt.pie(categories.values(), labels=categories.keys(), autopct="%1.1f%%", startangle=140)
-        plt.title("Распределение расходов по категориям")
-        plt.show()
+    @instrumented
+    def plot_spending_by_category(self, output=None, limit=None):
+        """
+        Визуализация расходов по категориям в виде круговой диаграммы.
+        Повторные вызовы обновляют ту же диаграмму.
+        :param output: Путь к файлу .png или .svg для сохранения без окна.
+        :param limit: Сколько крупнейших категорий показать; остальные сводятся в «Прочее».
+        """
+        try:
+            if self._chart is None:
+                self._chart = SpendingChart()
+            path = self._chart.render(self.chart_data.slices(limit), output)
+            if path is not None:
+                print(f"График сохранен в {path}.")
+        except ImportError:
+            print("Для построения графиков установите matplotlib.")
+        except Exception as e:
+            print(f"Ошибка при построении графика: {e}")
@@ -0,0 +1,286 @@
+from array import array
+from bisect import bisect_left
+from solution.fenwick import FenwickTree
+
+
+def saved_next_id(ids):
+    """
+    Следующий свободный id, который сохраняется вместе со строками.
+    У IdIndex это next_id: он не уменьшается после удалений, поэтому id
+    удаленной последней строки не будет выдан повторно после перезагрузки.
+    Для простой последовательности id возвращается None.
+    """
+    return getattr(ids, "next_id", None)
+
+
+class IdIndex:
+    """
+    Постоянные идентификаторы транзакций и их позиции.
+
+    id хранятся по слотам в массиве int64. Пока id добавляются по
+    возрастанию (обычный случай: новые id выдаются по порядку), слот
+    находится без хеш-таблицы: для непрерывного диапазона id — вычитанием
+    за O(1), после пропусков — двоичным поиском. Если id пришли не по
+    порядку, строится словарь id -> слот.
+
+    Слоты не сдвигаются при удалении: удаленный слот становится надгробием,
+    а позиция транзакции (номер среди живых слотов) считается деревом
+    Фенвика за O(log n). Пока надгробий нет, позиция совпадает со слотом
+    и дерево не строится. Когда надгробий становится больше, чем живых
+    слотов, слоты уплотняются.
+    """
+    def __init__(self, auto_compact=True):
+        """
+        :param auto_compact: Уплотнять слоты автоматически. Трекер передает False:
+            его хранилище и индексы адресуют строки теми же слотами, поэтому
+            он уплотняет их вместе (см. needs_compaction и compact).
+        """
+        self.auto_compact = auto_compact
+        self._slot_ids = array("q")  # Слот -> id
+        self._dead = bytearray()  # 1 для удаленного слота (надгробие)
+        self._slots = None  # id -> слот для живых слотов, если id идут не по возрастанию
+        self._alive = None  # Дерево Фенвика по живым слотам (строится при первом удалении)
+        self._tombstones = 0  # Количество удаленных слотов
+        self.next_id = 1  # Следующий свободный id
+
+    def __len__(self):
+        return len(self._slot_ids) - self._tombstones
+
+    def __iter__(self):
+        """Перебирает id в порядке позиций."""
+        if not self._tombstones:
+            return iter(self._slot_ids)
+        return (transaction_id for transaction_id, dead in zip(self._slot_ids, self._dead) if not dead)
+
+    def items(self, start=0):
+        """Пары (слот, id) живых транзакций начиная со слота start."""
+        pairs = zip(range(start, len(self._slot_ids)), self._slot_ids[start:])
+        if not self._tombstones:
+            return pairs
+        return ((slot, transaction_id) for slot, transaction_id in pairs if not self._dead[slot])
+
+    def slots(self):
+        """Перебирает слоты живых транзакций в порядке позиций."""
+        return (slot for slot, _ in self.items())
+
+    def __contains__(self, transaction_id):
+        return self._slot(transaction_id) is not None
+
+    def _slot(self, transaction_id):
+        """Слот живой транзакции или None."""
+        if self._slots is not None:
+            return self._slots.get(transaction_id)
+        slot_ids = self._slot_ids
+        if not slot_ids:
+            return None
+        slot = transaction_id - slot_ids[0]
+        if not (0 <= slot < len(slot_ids) and slot_ids[slot] == transaction_id):
+            slot = bisect_left(slot_ids, transaction_id)
+            if slot == len(slot_ids) or slot_ids[slot] != transaction_id:
+                return None
+        return None if self._dead[slot] else slot
+
+    def append(self, transaction_id=None):
+        """
+        Добавляет транзакцию в конец.
+        :param transaction_id: Сохраненный id; если он не указан или уже занят,
+            выдается новый.
+        :return: id транзакции.
+        """
+        if transaction_id is None or self._slot(transaction_id) is not None:
+            transaction_id = self.next_id
+        slot = len(self._slot_ids)
+        if self._slots is None and slot and transaction_id <= self._slot_ids[-1]:
+            self._build_slots()
+        self._slot_ids.append(transaction_id)
+        self._dead.append(0)
+        if self._slots is not None:
+            self._slots[transaction_id] = slot
+        if self._alive is not None:
+            self._alive.append(1)
+        if transaction_id >= self.next_id:
+            self.next_id = transaction_id + 1
+        return transaction_id
+
+    def extend(self, ids, count):
+        """
+        Добавляет count транзакций в конец.
+        :param ids: Сохраненные id или None, если их нужно выдать заново.
+        """
+        if ids is None:
+            ids = range(self.next_id, self.next_id + count)
+        elif not self._increasing(ids):
+            # Повторные, недостающие или идущие не по порядку id добавляются по одному
+            for transaction_id in ids:
+                self.append(transaction_id)
+            return
+        if self._slots is not None:
+            start = len(self._slot_ids)
+            self._slots.update(zip(ids, range(start, start + count)))
+        self._slot_ids.extend(ids)
+        self._dead.extend(bytes(count))
+        self._alive = None  # Дерево перестроится при следующем запросе
+        if count:
+            self.next_id = max(self.next_id, ids[-1] + 1)
+
+    def _increasing(self, ids):
+        """
+        Идут ли id строго по возрастанию после уже добавленных и свободны ли они.
+        После id не по порядку последний слот уже не самый большой id, поэтому
+        занятость проверяется по словарю слотов.
+        """
+        if None in ids:
+            return False
+        if self._slots is not None and not self._slots.keys().isdisjoint(ids):
+            return False
+        last = self._slot_ids[-1] if self._slot_ids else 0
+        for transaction_id in ids:
+            if transaction_id <= last:
+                return False
+            last = transaction_id
+        return True
+
+    def reserve(self, next_id):
+        """Не выдавать id меньше next_id (сохраненной границы выданных id)."""
+        if next_id is not None and next_id > self.next_id:
+            self.next_id = next_id
+
+    def position(self, transaction_id):
+        """Позиция транзакции или None, если такого id нет."""
+        slot = self._slot(transaction_id)
+        if slot is None or not self._tombstones:
+            return slot
+        return self._tree().prefix(slot)
+
+    def slot_at(self, position):
+        """Слот транзакции на позиции position."""
+        if not 0 <= position < len(self):
+            raise IndexError("индекс транзакции вне диапазона")
+        if not self._tombstones:
+            return position
+        return self._tree().select(position)
+
+    def id_at(self, position):
+        """id транзакции на позиции position."""
+        return self._slot_ids[self.slot_at(position)]
+
+    def remove(self, transaction_id):
+        """
+        Удаляет транзакцию, оставляя надгробие на ее слоте.
+        :return: Слот удаленной транзакции.
+        """
+        slot = self._slot(transaction_id)
+        if slot is None:
+            raise KeyError(transaction_id)
+        if self._slots is not None:
+            del self._slots[transaction_id]
+        if self.auto_compact and not self._tombstones and slot == len(self._slot_ids) - 1:
+            # Без надгробий последний слот просто отбрасывается
+            self._slot_ids.pop()
+            self._dead.pop()
+            self._alive = None
+            return slot
+        tree = self._tree()
+        self._dead[slot] = 1
+        tree.add(slot, -1)
+        self._tombstones += 1
+        if self.auto_compact and self.needs_compaction():
+            self.compact()
+        return slot
+
+    def remove_at(self, position):
+        """Удаляет транзакцию по позиции и возвращает ее id."""
+        transaction_id = self.id_at(position)
+        self.remove(transaction_id)
+        return transaction_id
+
+    def remove_many(self, ids):
+        """Удаляет несколько транзакций и уплотняет слоты одним проходом."""
+        slots = {transaction_id: self._slot(transaction_id) for transaction_id in ids}
+        for transaction_id, slot in slots.items():
+            if slot is None:
+                raise KeyError(transaction_id)
+        for transaction_id, slot in slots.items():
+            if self._slots is not None:
+                del self._slots[transaction_id]
+            self._dead[slot] = 1
+            self._tombstones += 1
+        self.compact()
+
+    def _build_slots(self):
+        """Строит словарь id -> слот (id перестали идти по возрастанию)."""
+        self._slots = {
+            transaction_id: slot
+            for slot, (transaction_id, dead) in enumerate(zip(self._slot_ids, self._dead))
+            if not dead
+        }
+
+    def _tree(self):
+        """Дерево Фенвика по живым слотам, строится при необходимости за O(n)."""
+        if self._alive is None:
+            self._alive = FenwickTree([1 - dead for dead in self._dead])
+        return self._alive
+
+    def needs_compaction(self):
+        """Стало ли надгробий больше, чем живых слотов."""
+        return self._tombstones > len(self)
+
+    def compact(self):
+        """
+        Убирает надгробия; id и порядок транзакций не меняются, а живые слоты
+        получают номера своих позиций.
+        """
+        self._slot_ids = array("q", self)
+        self._dead = bytearray(len(self._slot_ids))
+        self._alive = None
+        self._tombstones = 0
+        if self._slots is not None:
+            self._build_slots()
+
+
+class PositionView:
+    """
+    Транзакции хранилища по позициям.
+
+    Хранилище (список Transaction или ColumnarStore) адресуется слотами
+    IdIndex: удаленная строка остается на своем слоте до уплотнения, а
+    позиция переводится в слот деревом Фенвика индекса id.
+    """
+    def __init__(self, store, ids):
+        self.store = store
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        store = self.store
+        return (store[slot] for slot in self.ids.slots())
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        return self.store[self.ids.slot_at(index)]
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def _slot_row(self, slot):
+        store = self.store
+        return store[slot].to_row() if isinstance(store, list) else store.row(slot)
+
+    def row(self, index):
+        return self._slot_row(self.ids.slot_at(index))
+
+    def rows(self):
+        return (self._slot_row(slot) for slot in self.ids.slots())
+
+    def append(self, transaction):
+        """Добавляет транзакцию в конец без уведомления наблюдателей трекера."""
+        self.store.append(transaction)
+        self.ids.append()
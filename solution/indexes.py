@@ -0,0 +1,122 @@
+from bisect import bisect_left, insort
+
+
+class DateIndex:
+    """
+    Отсортированный индекс (порядковый номер дня, слот строки в хранилище).
+    Позволяет выбирать транзакции за любой период бинарным поиском за O(log n + k).
+
+    Удаленная строка не убирается из индекса, а только отмечается и
+    отбрасывается при запросе: слоты не сдвигаются, поэтому удаление стоит O(1).
+    После уплотнения хранилища индекс перестраивается через on_reset.
+    """
+    def __init__(self):
+        self._keys = []  # Отсортированный список пар (порядковый номер дня, слот)
+        self._sorted = True  # False, пока после массовой загрузки не выполнена сортировка
+        self._dead = set()  # Слоты удаленных строк
+
+    def __len__(self):
+        return len(self._keys) - len(self._dead)
+
+    def slots_between(self, start, end):
+        """
+        Слоты строк с датой в полуинтервале [start, end), упорядоченные по дате.
+        :param start: Порядковый номер первого дня.
+        :param end: Порядковый номер дня, следующего за последним.
+        """
+        keys = self._ensure_sorted()
+        lo = bisect_left(keys, (start,))
+        hi = bisect_left(keys, (end,), lo)
+        dead = self._dead
+        return [slot for _, slot in keys[lo:hi] if slot not in dead]
+
+    def on_add(self, index, row):
+        insort(self._ensure_sorted(), (row[0], index))
+
+    def on_extend(self, start, rows):
+        # Массовая загрузка только дописывает ключи, а сортирует их один раз
+        # при первом запросе: для уже упорядоченного файла это O(n).
+        self._keys.extend((row[0], start + i) for i, row in enumerate(rows))
+        self._sorted = False
+
+    def on_edit(self, index, old_row, new_row):
+        if old_row[0] != new_row[0]:
+            self._ensure_sorted()
+            self._remove((old_row[0], index))
+            insort(self._keys, (new_row[0], index))
+
+    def on_delete(self, index, row):
+        self._dead.add(index)
+
+    def on_reset(self, rows):
+        self._keys = sorted((row[0], i) for i, row in enumerate(rows))
+        self._sorted = True
+        self._dead = set()
+
+    def _ensure_sorted(self):
+        """Сортирует ключи, если после массовой загрузки они еще не упорядочены."""
+        if not self._sorted:
+            self._keys.sort()
+            self._sorted = True
+        return self._keys
+
+    def _remove(self, key):
+        """Удаляет ключ из индекса."""
+        i = bisect_left(self._keys, key)
+        del self._keys[i]
+
+
+class CategoryIndex:
+    """
+    Хэш-индекс: категория -> отсортированный список слотов строк.
+    Как и в DateIndex, удаленные строки только отмечаются и отбрасываются при запросе.
+    """
+    def __init__(self):
+        self._slots = {}  # Категория -> список слотов по возрастанию
+        self._dead = set()  # Слоты удаленных строк
+
+    def slots(self, category):
+        """Слоты строк указанной категории в порядке добавления."""
+        dead = self._dead
+        return [slot for slot in self._slots.get(category, ()) if slot not in dead]
+
+    def categories(self):
+        """Все категории, для которых есть транзакции."""
+        dead = self._dead
+        return [
+            category for category, slots in self._slots.items()
+            if any(slot not in dead for slot in slots)
+        ]
+
+    def on_add(self, index, row):
+        self._slots.setdefault(row[2], []).append(index)
+
+    def on_extend(self, start, rows):
+        slots = self._slots
+        for i, row in enumerate(rows, start):
+            category = row[2]
+            if category in slots:
+                slots[category].append(i)
+            else:
+                slots[category] = [i]
+
+    def on_edit(self, index, old_row, new_row):
+        if old_row[2] != new_row[2]:
+            self._remove(old_row[2], index)
+            insort(self._slots.setdefault(new_row[2], []), index)
+
+    def on_delete(self, index, row):
+        self._dead.add(index)
+
+    def on_reset(self, rows):
+        self._slots = {}
+        self._dead = set()
+        for i, row in enumerate(rows):
+            self._slots.setdefault(row[2], []).append(i)
+
+    def _remove(self, category, index):
+        """Удаляет слот из списка категории."""
+        slots = self._slots[category]
+        del slots[bisect_left(slots, index)]
+        if not slots:
+            del self._slots[category]
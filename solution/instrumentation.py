@@ -0,0 +1,184 @@
+import atexit
+import cProfile
+import functools
+import json
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+
+STATS_ENV = "FINANCE_TRACKER_STATS"  # Путь к файлу, в который дописывается статистика при выходе
+PROFILE_ENV = "FINANCE_TRACKER_PROFILE"  # "1" — профилировать операции через cProfile
+TRACEMALLOC_ENV = "FINANCE_TRACKER_TRACEMALLOC"  # "1" — замерять пик памяти операций
+PROFILE_LIMIT = 20  # Сколько функций профиля попадает в статистику
+
+_shared = {}  # Файл статистики -> общий Instrumentation трекеров процесса
+
+
+def _dump_shared():
+    """Обработчик выхода: по строке статистики в каждый файл из _shared."""
+    for path, instrumentation in _shared.items():
+        instrumentation.dump(path)
+
+
+class Instrumentation:
+    """
+    Замеры операций FinanceTracker: количество вызовов и время каждой
+    операции, счетчики (например, количество загруженных строк) и, по
+    желанию, профиль cProfile и пик памяти tracemalloc.
+
+    Профиль и память снимаются только для внешних операций: вложенные
+    вызовы (например, get_balance внутри другой операции) учитываются
+    только в таймерах.
+    """
+    def __init__(self, profile=False, trace_memory=False):
+        """
+        :param profile: Профилировать операции через cProfile.
+        :param trace_memory: Замерять пик выделенной памяти операций через tracemalloc.
+        """
+        self.timers = {}  # Операция -> [вызовы, суммарное время, максимальное время] в секундах
+        self.counters = {}  # Счетчик -> значение
+        self.peaks = {}  # Операция -> максимальный пик памяти в байтах
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self._started_tracing = False
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self._depth = 0  # Глубина вложенности замеряемых операций
+        self.shared = False  # Общий для процесса (см. from_environment)
+
+    @classmethod
+    def from_environment(cls):
+        """
+        Включает замеры, если задана переменная окружения FINANCE_TRACKER_STATS;
+        статистика дописывается в этот файл одной строкой JSON при выходе.
+        Все трекеры процесса получают один общий Instrumentation, а обработчик
+        выхода регистрируется один раз, сколько бы трекеров ни создавалось.
+        :return: Instrumentation или None.
+        """
+        path = os.environ.get(STATS_ENV)
+        if not path:
+            return None
+        instrumentation = _shared.get(path)
+        if instrumentation is None:
+            instrumentation = cls(
+                profile=os.environ.get(PROFILE_ENV) == "1",
+                trace_memory=os.environ.get(TRACEMALLOC_ENV) == "1",
+            )
+            instrumentation.shared = True
+            if not _shared:
+                atexit.register(_dump_shared)
+            _shared[path] = instrumentation
+        return instrumentation
+
+    @contextmanager
+    def timed(self, name):
+        """Замеряет операцию name."""
+        outer = self._depth == 0
+        self._depth += 1
+        if outer:
+            if self.trace_memory:
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+            if self.profiler is not None:
+                self.profiler.enable()
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self._depth -= 1
+            if outer:
+                if self.profiler is not None:
+                    self.profiler.disable()
+                if self.trace_memory:
+                    peak = tracemalloc.get_traced_memory()[1] - base
+                    self.peaks[name] = max(self.peaks.get(name, 0), peak)
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, elapsed, elapsed]
+            else:
+                timer[0] += 1
+                timer[1] += elapsed
+                if elapsed > timer[2]:
+                    timer[2] = elapsed
+
+    def count(self, name, value=1):
+        """Прибавляет value к счетчику name."""
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def stats(self):
+        """Статистика в виде словаря, который можно сохранить в JSON."""
+        timers = {}
+        for name, (calls, total, longest) in sorted(self.timers.items()):
+            timers[name] = {
+                "calls": calls,
+                "total_ms": round(1000 * total, 3),
+                "mean_ms": round(1000 * total / calls, 3),
+                "max_ms": round(1000 * longest, 3),
+            }
+            if name in self.peaks:
+                timers[name]["peak_kib"] = round(self.peaks[name] / 1024, 1)
+        result = {"pid": os.getpid(), "timers": timers, "counters": dict(sorted(self.counters.items()))}
+        if self.profiler is not None:
+            result["profile"] = self.profile_rows()
+        return result
+
+    def profile_rows(self, limit=PROFILE_LIMIT):
+        """Функции с наибольшим суммарным временем (вместе с вложенными вызовами)."""
+        if self.profiler is None or not self.profiler.getstats():
+            return []
+        entries = pstats.Stats(self.profiler).stats
+        top = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:limit]
+        return [
+            {
+                "function": f"{filename}:{line}({function})",
+                "calls": calls,
+                "own_ms": round(1000 * own, 3),
+                "cumulative_ms": round(1000 * cumulative, 3),
+            }
+            for (filename, line, function), (_, calls, own, cumulative, _) in top
+        ]
+
+    def dump(self, path=None):
+        """
+        Сохраняет статистику.
+        :param path: Файл, в который дописывается одна строка JSON; без него
+            строка JSON возвращается.
+        """
+        line = json.dumps(self.stats(), ensure_ascii=False)
+        if path is None:
+            return line
+        with open(path, mode="a", encoding="utf-8") as file:
+            file.write(line + "\n")
+        return line
+
+    def close(self):
+        """
+        Останавливает tracemalloc, если он был запущен этими замерами.
+        Общие замеры процесса продолжают работать для остальных трекеров.
+        """
+        if self._started_tracing and not self.shared:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+
+def instrumented(method):
+    """
+    Декоратор метода FinanceTracker: если у трекера включены замеры
+    (self.instrumentation), вызов замеряется под именем метода. Без
+    замеров добавляется только проверка атрибута.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return method(self, *args, **kwargs)
+        with instrumentation.timed(name):
+            return method(self, *args, **kwargs)
+    return wrapper
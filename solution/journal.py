@@ -0,0 +1,235 @@
+import csv
+import json
+import os
+import zlib
+from itertools import count
+from solution.csv_loader import CSV_HEADER, ID_COLUMN, format_date, format_row, iter_id_batches, parse_date
+from solution.ids import IdIndex, saved_next_id
+from solution.row_fingerprints import FingerprintWriter
+
+
+JOURNAL_SUFFIX = ".journal"
+STALE_SUFFIX = ".stale"  # Устаревший журнал, отложенный при загрузке
+COMPACT_THRESHOLD = 10_000  # После стольких записей журнал сворачивается в CSV
+
+
+def file_fingerprint(filepath):
+    """
+    Отпечаток файла: размер и CRC32 содержимого.
+    По нему журнал понимает, к какой версии базового CSV относятся его записи.
+    """
+    if not os.path.exists(filepath):
+        return [0, 0]
+    crc = 0
+    size = 0
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+    return [size, crc]
+
+
+def atomic_write_csv(filepath, rows, ids=None):
+    """
+    Записывает CSV-файл целиком через временный файл и атомарное переименование,
+    чтобы при сбое на диске оставалась либо старая, либо новая версия.
+    Рядом записывается файл отпечатков строк для дозаписи.
+    :param ids: id строк для столбца Id; по умолчанию 1, 2, 3...
+    """
+    tmp_path = f"{filepath}.tmp"
+    fingerprints = FingerprintWriter(filepath, mode="w")
+    with open(tmp_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(CSV_HEADER + [ID_COLUMN])
+        for row, transaction_id in zip(rows, count(1) if ids is None else ids):
+            writer.writerow(format_row(row, transaction_id))
+            fingerprints.add(row)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, filepath)
+    # Отпечатки заменяются после CSV: при сбое между заменами они окажутся
+    # устаревшими по отметке CSV и будут построены заново.
+    fingerprints.close()
+
+
+class Journal:
+    """
+    Журнал упреждающей записи для CSV-файла.
+
+    Добавление, редактирование и удаление дописывают в журнал по одной
+    строке JSON, не переписывая CSV. Записи адресуют транзакции по id,
+    поэтому не зависят от сдвига позиций после удалений (в журналах
+    старого формата вместо id хранится позиция "index"). Первая строка журнала хранит отпечаток
+    базового CSV: если после сбоя при свертке CSV уже заменен новой версией,
+    отпечаток не совпадет и устаревший журнал будет проигнорирован. Там же
+    хранится следующий свободный id: по одному CSV его не восстановить, если
+    последняя строка была удалена.
+    """
+    def __init__(self, filepath):
+        """:param filepath: Путь к базовому CSV-файлу."""
+        self.base_path = filepath
+        self.path = f"{filepath}{JOURNAL_SUFFIX}"
+        self.pending = 0  # Количество записей с момента последней свертки
+        self.next_id = None  # Следующий свободный id из заголовка (см. records)
+
+    def append(self, op, transaction_id=None, row=None):
+        """
+        Дописывает операцию в журнал.
+        :param op: "add", "edit" или "delete".
+        :param transaction_id: id транзакции.
+        :param row: Строка (порядковый номер дня, тип, категория, копейки) для "add" и "edit".
+        """
+        self._write(_encode(op, transaction_id, row))
+        self.pending += 1
+
+    def append_batch(self, operations):
+        """
+        Дописывает несколько операций одной строкой журнала: после сбоя
+        они применяются либо все, либо ни одна.
+        :param operations: Кортежи (op, id, row), как аргументы append.
+        """
+        operations = [_encode(*operation) for operation in operations]
+        if operations:
+            self._write({"op": "batch", "ops": operations})
+            self.pending += len(operations)
+
+    def _write(self, record):
+        """Дописывает запись в конец журнала и сбрасывает ее на диск."""
+        if not os.path.exists(self.path):
+            self.reset()
+        with open(self.path, mode="a", encoding="utf-8") as file:
+            file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+
+    def records(self):
+        """
+        Возвращает операции журнала, относящиеся к текущему базовому CSV.
+        Недописанная при сбое последняя строка отрезается от файла.
+        """
+        self.pending = 0
+        self.next_id = None
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, mode="rb") as file:
+            data = file.read()
+        lines = data.split(b"\n")
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            header = {}
+        if header.get("base") != file_fingerprint(self.base_path):
+            # Журнал относится к другой версии CSV (сбой при свертке). Он
+            # откладывается в сторону, и начинается новый: иначе следующие записи
+            # оказались бы за устаревшим заголовком и пропали при загрузке.
+            # id из старого журнала уже могли быть выданы, поэтому граница сохраняется.
+            os.replace(self.path, f"{self.path}{STALE_SUFFIX}")
+            self.reset(header.get("next_id"))
+            return []
+        self.next_id = header.get("next_id")
+        records = []
+        offset = len(lines[0]) + 1
+        # Последний элемент после split — хвост без перевода строки (обычно пустой)
+        for line in lines[1:-1]:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            for operation in record["ops"] if record["op"] == "batch" else [record]:
+                if "row" in operation:
+                    date_text, transaction_type, category, amount_minor = operation["row"]
+                    operation["row"] = (parse_date(date_text), transaction_type, category, amount_minor)
+                records.append(operation)
+            offset += len(line) + 1
+        if offset < len(data):
+            with open(self.path, mode="r+b") as file:
+                file.truncate(offset)
+        self.pending = len(records)
+        return records
+
+    def reset(self, next_id=None):
+        """
+        Начинает пустой журнал для текущей версии базового CSV.
+        :param next_id: Следующий свободный id для заголовка журнала.
+        """
+        header = {"base": file_fingerprint(self.base_path)}
+        if next_id is not None:
+            header["next_id"] = next_id
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, mode="w", encoding="utf-8") as file:
+            file.write(json.dumps(header) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.path)
+        self.pending = 0
+        self.next_id = next_id
+
+    def compact(self, rows, ids=None):
+        """
+        Сворачивает журнал: атомарно заменяет базовый CSV строками rows
+        и начинает новый журнал.
+        :param rows: Итоговые строки (база + журнал).
+        :param ids: id итоговых строк (IdIndex сохраняет и следующий свободный id).
+        """
+        atomic_write_csv(self.base_path, rows, ids)
+        self.reset(saved_next_id(ids))
+
+
+def _encode(op, transaction_id=None, row=None):
+    """Запись журнала для одной операции."""
+    record = {"op": op}
+    if transaction_id is not None:
+        record["id"] = transaction_id
+    if row is not None:
+        ordinal, transaction_type, category, amount_minor = row
+        record["row"] = [format_date(ordinal), transaction_type, category, amount_minor]
+    return record
+
+
+def replay(filepath):
+    """
+    Восстанавливает строки файла: базовый CSV плюс операции журнала.
+    :return: Список строк (порядковый номер дня, тип, категория, копейки).
+    """
+    return replay_with_ids(filepath)[0]
+
+
+def replay_with_ids(filepath):
+    """
+    То же, что replay, но вместе с id строк.
+    id выдаются так же, как при загрузке в FinanceTracker.
+    :return: Пара (список строк, список id).
+    """
+    rows, index = replay_with_index(filepath)
+    return rows, list(index)
+
+
+def replay_with_index(filepath):
+    """Строки файла с журналом и IdIndex их id (вместе со следующим свободным id)."""
+    index = IdIndex()
+    rows = {}  # id -> строка; словарь сохраняет порядок добавления
+    if os.path.exists(filepath):
+        for batch, ids in iter_id_batches(filepath):
+            for row, transaction_id in zip(batch, ids or [None] * len(batch)):
+                rows[index.append(transaction_id)] = row
+    journal = Journal(filepath)
+    for record in journal.records():
+        op = record["op"]
+        if op == "add":
+            rows[index.append(record.get("id"))] = record["row"]
+            continue
+        transaction_id = record["id"] if "id" in record else index.id_at(record["index"])
+        if op == "edit":
+            rows[transaction_id] = record["row"]
+        elif op == "delete":
+            index.remove(transaction_id)
+            del rows[transaction_id]
+    index.reserve(journal.next_id)
+    return list(rows.values()), index
+
+
+def compact_file(filepath):
+    """Сворачивает журнал файла в базовый CSV, не загружая трекер."""
+    journal = Journal(filepath)
+    if journal.records():
+        journal.compact(*replay_with_index(filepath))
@@ -1,4 +1,7 @@
+from solution.archive import ARCHIVE_SUFFIX, archive_to_csv, csv_to_archive
 from solution.finance_tracker import FinanceTracker, ensure_files_directory_exists
+from solution.money import format_amount, from_minor, parse_amount
+from solution.snapshot import SNAPSHOT_SUFFIX, csv_to_snapshot, snapshot_to_csv
 from solution.transaction import Transaction
 from prompt_toolkit import prompt
 from solution.validation import AmountValidator, DateValidator, type_completer
@@ -8,7 +11,7 @@ import os
 def add_transaction_ui(tracker):
     """Функция для добавления транзакции (взаимодействие с пользователем)."""
     try:
-        amount = float(prompt("Введите сумму: ", validator=AmountValidator()))
+        amount = from_minor(parse_amount(prompt("Введите сумму: ", validator=AmountValidator())))
         category = prompt("Введите категорию: ").strip()
         if not category:
             print("Ошибка: Категория не может быть пустой.")
@@ -26,23 +29,32 @@ def add_transaction_ui(tracker):
             return
 
         transaction = Transaction(amount, category, date, transaction_type)
-        tracker.add_transaction(transaction)
-        print("Транзакция добавлена!")
+        transaction_id = tracker.add_transaction(transaction)
+        print(f"Транзакция добавлена! ID: {transaction_id}")
+        show_alerts(tracker)
     except KeyboardInterrupt:
         print("\nОтменено пользователем.")
     except Exception as e:
         print(f"Неожиданная ошибка: {e}")
 
 
+def show_alerts(tracker):
+    """Печатает предупреждения о достигнутых порогах бюджетов."""
+    for alert in tracker.pop_alerts():
+        print(f"Внимание! {alert}")
+
+
 def edit_transaction_ui(tracker):
     """Интерфейс для редактирования транзакции."""
     try:
-        index = int(prompt("Введите индекс транзакции для редактирования: "))
-        if not (0 <= index < len(tracker.transactions)):
-            print("Неверный индекс транзакции.")
+        transaction_id = int(prompt("Введите ID транзакции для редактирования: "))
+        index = tracker.index_of(transaction_id)
+        if index is None:
+            print("Транзакция с таким ID не найдена.")
             return
+        print(f"Текущая транзакция: {tracker.transactions[index]}")
 
-        amount = float(prompt("Введите новую сумму: ", validator=AmountValidator()))
+        amount = from_minor(parse_amount(prompt("Введите новую сумму: ", validator=AmountValidator())))
         category = prompt("Введите новую категорию: ").strip()
         if not category:
             print("Ошибка: категория не может быть пустой.")
@@ -64,8 +76,9 @@ def edit_transaction_ui(tracker):
             return
 
         new_transaction = Transaction(amount, category, date, transaction_type)
-        tracker.edit_transaction(index, new_transaction, filename)
+        tracker.edit_transaction_by_id(transaction_id, new_transaction, filename)
         print("Транзакция успешно отредактирована!")
+        show_alerts(tracker)
     except KeyboardInterrupt:
         print("\nОтменено пользователем.")
     except Exception as e:
@@ -75,17 +88,19 @@ def edit_transaction_ui(tracker):
 def delete_transaction_ui(tracker):
     """Интерфейс для удаления транзакции."""
     try:
-        index = int(prompt("Введите индекс транзакции для удаления: "))
-        if not (0 <= index < len(tracker.transactions)):
-            print("Неверный индекс транзакции.")
+        transaction_id = int(prompt("Введите ID транзакции для удаления: "))
+        index = tracker.index_of(transaction_id)
+        if index is None:
+            print("Транзакция с таким ID не найдена.")
             return
+        print(f"Удаляется транзакция: {tracker.transactions[index]}")
 
         filename = prompt("Введите имя файла для удаления (например, data.csv): ").strip()
         if not filename:
             print("Ошибка: Имя файла не может быть пустым.")
             return
 
-        tracker.delete_transaction(index, filename)
+        tracker.delete_transaction_by_id(transaction_id, filename)
         print("Транзакция успешно удалена!")
     except KeyboardInterrupt:
         print("\nОтменено пользователем.")
@@ -96,7 +111,7 @@ def delete_transaction_ui(tracker):
 def show_balance_ui(tracker):
     """Функция для показа текущего баланса."""
     balance = tracker.get_balance()
-    print(f"Ваш текущий баланс: {balance} руб.")
+    print(f"Ваш текущий баланс: {format_amount(balance)} руб.")
 
 
 def show_monthly_report_ui(tracker):
@@ -116,9 +131,40 @@ def show_monthly_report_ui(tracker):
         print(f"Неожиданная ошибка: {e}")
 
 
+def budgets_ui(tracker):
+    """Показывает бюджеты за месяц и позволяет задать лимит по категории."""
+    try:
+        month = int(prompt("Введите месяц (1-12): "))
+        year = int(prompt("Введите год: "))
+        report = tracker.get_budget_report(month, year)
+        if report:
+            for category, spent, limit in report:
+                print(f"{category}: потрачено {format_amount(spent)} из {format_amount(limit)} руб.")
+        else:
+            print("Бюджеты не заданы.")
+
+        category = prompt("Категория для нового лимита (Enter — пропустить): ").strip()
+        if not category:
+            return
+        limit = from_minor(parse_amount(prompt("Введите месячный лимит: ", validator=AmountValidator())))
+        only_this_month = prompt("Только для этого месяца? (y/n): ").strip().lower() == "y"
+        tracker.set_budget(category, limit, f"{year:04d}-{month:02d}" if only_this_month else None)
+        print("Бюджет сохранен.")
+    except ValueError as e:
+        print(f"Ошибка: {e}")
+    except KeyboardInterrupt:
+        print("\nОтменено пользователем.")
+    except Exception as e:
+        print(f"Неожиданная ошибка: {e}")
+
+
 def plot_spending_ui(tracker):
     """Функция для визуализации расходов по категориям."""
-    tracker.plot_spending_by_category()
+    output = prompt("Введите имя файла .png/.svg для сохранения (Enter — показать окно): ").strip()
+    if output:
+        ensure_files_directory_exists()
+        output = os.path.join("files", output)
+    tracker.plot_spending_by_category(output or None)
 
 
 def export_to_csv_ui(tracker):
@@ -144,10 +190,42 @@ def export_to_csv_ui(tracker):
         print(f"Неожиданная ошибка: {e}")
 
 
+def convert_ui():
+    """Конвертирует CSV-файл в снапшот или архив по месяцам и обратно в CSV-файл."""
+    try:
+        filename = prompt("Введите имя файла для конвертации (data.csv, data.snap или data.archive): ").strip()
+        name, extension = os.path.splitext(filename)
+        source = os.path.join("files", filename)
+        if extension == ".csv":
+            choice = prompt("Конвертировать в снапшот или архив по месяцам? (snap/archive): ").strip().lower()
+            if choice == "archive":
+                target = os.path.join("files", name + ARCHIVE_SUFFIX)
+                csv_to_archive(source, target)
+            else:
+                target = os.path.join("files", name + SNAPSHOT_SUFFIX)
+                csv_to_snapshot(source, target)
+        elif extension == SNAPSHOT_SUFFIX:
+            target = os.path.join("files", name + ".csv")
+            snapshot_to_csv(source, target)
+        elif extension == ARCHIVE_SUFFIX:
+            target = os.path.join("files", name + ".csv")
+            archive_to_csv(source, target)
+        else:
+            print("Ошибка: Укажите файл с расширением .csv, .snap или .archive.")
+            return
+        print(f"Файл {source} сконвертирован в {target}.")
+    except KeyboardInterrupt:
+        print("\nОтменено пользователем.")
+    except FileNotFoundError:
+        print(f"Файл {source} не найден.")
+    except Exception as e:
+        print(f"Неожиданная ошибка: {e}")
+
+
 def select_csv_file():
-    """Показывает список CSV-файлов в директории files и позволяет выбрать один."""
+    """Показывает список CSV-файлов, снапшотов и архивов в директории files и позволяет выбрать один."""
     ensure_files_directory_exists()
-    csv_files = [f for f in os.listdir("files") if f.endswith(".csv")]
+    csv_files = [f for f in os.listdir("files") if f.endswith((".csv", SNAPSHOT_SUFFIX, ARCHIVE_SUFFIX))]
 
     if not csv_files:
         print("CSV-файлы не найдены. Начинаем с пустого списка.")
@@ -168,8 +246,13 @@ def select_csv_file():
 def main():
     tracker = FinanceTracker()
     selected_file = select_csv_file()
-    if selected_file:
+    if selected_file and selected_file.endswith(SNAPSHOT_SUFFIX):
+        tracker.load_snapshot(selected_file)
+    elif selected_file and selected_file.endswith(ARCHIVE_SUFFIX):
+        tracker.load_archive(selected_file)
+    elif selected_file:
         tracker.load_from_csv(selected_file)
+    tracker.load_budgets()
 
     while True:
         print("\n=== Личный финансовый трекер ===")
@@ -180,7 +263,10 @@ def main():
         print("5. Экспорт в CSV")
         print("6. Редактировать транзакцию")
         print("7. Удалить транзакцию")
-        print("8. Выйти")
+        print("8. Конвертировать CSV/снапшот")
+        print("9. Бюджеты по категориям")
+        # Выход закреплен за 0, чтобы новые пункты не сдвигали его номер
+        print("0. Выйти")
 
         choice = prompt("Выберите действие: ").strip()
         if choice == "1":
@@ -198,6 +284,10 @@ def main():
         elif choice == "7":
             delete_transaction_ui(tracker)
         elif choice == "8":
+            convert_ui()
+        elif choice == "9":
+            budgets_ui(tracker)
+        elif choice == "0":
             print("Выход из программы.")
             break
         else:
@@ -0,0 +1,71 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+
+MINOR_UNITS = 100  # Количество копеек в рубле
+
+
+def to_minor(amount):
+    """
+    Переводит сумму в целое число копеек (фиксированная точка).
+    :param amount: Сумма в рублях (int, float, Decimal или строка).
+    """
+    if isinstance(amount, int):
+        return amount * MINOR_UNITS
+    value = Decimal(str(amount)) * MINOR_UNITS
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor(minor):
+    """
+    Переводит копейки обратно в рубли без потери точности.
+    :return: Decimal с двумя знаками после запятой.
+    """
+    return Decimal(minor).scaleb(-2)
+
+
+def format_minor(minor):
+    """Строка суммы для CSV и вывода: "100", "1500.30", "-0.05"."""
+    sign = "-" if minor < 0 else ""
+    rubles, kopecks = divmod(abs(minor), MINOR_UNITS)
+    if kopecks == 0:
+        return f"{sign}{rubles}"
+    return f"{sign}{rubles}.{kopecks:02d}"
+
+
+def format_amount(amount):
+    """Строка суммы в рублях (int, float или Decimal) для вывода."""
+    return format_minor(to_minor(amount))
+
+
+def parse_amount(text):
+    """
+    Разбирает введенную пользователем сумму в копейки.
+    :raises ValueError: Если это не конечное число или в нем больше двух знаков после запятой.
+    """
+    try:
+        value = Decimal(text.strip())
+    except InvalidOperation:
+        raise ValueError(f"Некорректная сумма: {text!r}")
+    if not value.is_finite():
+        raise ValueError(f"Некорректная сумма: {text!r}")
+    minor = value * MINOR_UNITS
+    if minor != minor.to_integral_value():
+        raise ValueError(f"Больше двух знаков после запятой: {text!r}")
+    return int(minor)
+
+
+def parse_minor(text):
+    """
+    Разбирает сумму из строки сразу в копейки.
+    Простые записи вида "100", "-12.5" или "99.99" разбираются без Decimal.
+    """
+    digits = text.strip()
+    negative = digits.startswith("-")
+    if negative:
+        digits = digits[1:]
+    whole, _, fraction = digits.partition(".")
+    if (whole.isascii() and whole.isdigit() and len(fraction) <= 2
+            and (not fraction or fraction.isdigit())):
+        minor = int(whole) * MINOR_UNITS + int(fraction.ljust(2, "0") or 0)
+        return -minor if negative else minor
+    return to_minor(text)
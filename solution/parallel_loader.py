@@ -0,0 +1,105 @@
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from solution.aggregates import RunningAggregates
+from solution.columnar_store import ColumnarStore
+from solution.csv_loader import DEFAULT_CHUNK_SIZE, iter_row_batches
+from solution.journal import Journal, replay
+
+
+def expand_sources(sources):
+    """
+    Раскрывает список источников в упорядоченный список CSV-файлов.
+    :param sources: Пути к файлам, папкам (берутся все *.csv) или шаблоны glob.
+    :raises FileNotFoundError: Если источнику не соответствует ни один файл.
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(glob.glob(os.path.join(source, "*.csv")))
+        else:
+            matches = sorted(glob.glob(source))
+        if not matches:
+            raise FileNotFoundError(f"Файлы не найдены: {source}")
+        paths.extend(matches)
+    return paths
+
+
+def _has_journal(path):
+    """Есть ли у файла операции в журнале."""
+    return bool(Journal(path).records())
+
+
+def _load_file(path):
+    """
+    Задача процесса: разбирает файл (с учетом журнала) в ColumnarStore.
+    Колоночное хранилище передается обратно в основной процесс компактно,
+    массивами байтов, а не миллионами кортежей.
+    """
+    store = ColumnarStore()
+    if _has_journal(path):
+        store.extend_rows(replay(path))
+    else:
+        for batch in iter_row_batches(path):
+            store.extend_rows(batch)
+    return store
+
+
+def _aggregate_file(path):
+    """Задача процесса: считает частичные итоги файла пакетно, строки обратно не передаются."""
+    return RunningAggregates.from_store(_load_file(path))
+
+
+def _map(func, paths, workers):
+    """Выполняет func для каждого файла: в пуле процессов или, при workers=1, в текущем."""
+    if workers == 1 or len(paths) == 1:
+        yield from map(func, paths)
+        return
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = [executor.submit(func, path) for path in paths]
+    try:
+        for future in futures:
+            yield future.result()
+    finally:
+        # shutdown(cancel_futures=True) появился только в Python 3.9
+        for future in futures:
+            future.cancel()
+        executor.shutdown()
+
+
+def load_files(sources, tracker, workers=None):
+    """
+    Параллельно разбирает CSV-файлы и добавляет их строки в трекер
+    в порядке файлов.
+    :param sources: Пути, папки или шаблоны glob (см. expand_sources).
+    :param tracker: FinanceTracker, в который добавляются строки.
+    :param workers: Количество процессов (по умолчанию — по числу ядер).
+    :return: Количество добавленных строк.
+    """
+    paths = expand_sources(sources)
+
+    def batches():
+        for store in _map(_load_file, paths, workers):
+            rows = store.rows()
+            while True:
+                batch = list(islice(rows, DEFAULT_CHUNK_SIZE))
+                if not batch:
+                    break
+                yield batch
+
+    return tracker.import_rows(batches())
+
+
+def aggregate_files(sources, workers=None):
+    """
+    Режим map-reduce: каждый процесс возвращает итоги своего файла
+    (баланс, суммы по категориям и месяцам), а они складываются здесь.
+    :return: RunningAggregates по всем файлам.
+    """
+    totals = RunningAggregates()
+    for partial in _map(_aggregate_file, expand_sources(sources), workers):
+        totals.merge(partial)
+    return totals
@@ -0,0 +1,175 @@
+import heapq
+import math
+import os
+
+
+IMAGE_FORMATS = (".png", ".svg")  # Форматы файлов для режима без экрана
+OTHER_LABEL = "Прочее"  # Подпись сектора, в который сводятся мелкие категории
+START_ANGLE = 140
+LABEL_DISTANCE = 1.1  # Как в matplotlib.axes.Axes.pie
+PCT_DISTANCE = 0.6
+
+
+def top_slices(totals, limit=None):
+    """
+    Секторы диаграммы: категории по убыванию суммы.
+    :param totals: Словарь {категория: сумма}.
+    :param limit: Сколько крупнейших категорий показать отдельно;
+        остальные сводятся в один сектор «Прочее».
+    :return: Список пар (подпись, сумма).
+    """
+    if limit is None or len(totals) <= limit:
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    top = heapq.nlargest(limit, totals.items(), key=lambda item: item[1])
+    rest = sum(totals.values()) - sum(total for _, total in top)
+    return top + [(OTHER_LABEL, rest)]
+
+
+class ChartData:
+    """
+    Мемоизированные данные диаграммы. Наблюдатель FinanceTracker:
+    кэш сбрасывается только изменениями транзакций нужного типа, а сами
+    суммы по категориям берутся из накопительных итогов трекера.
+    """
+    def __init__(self, totals, transaction_type="expense"):
+        """
+        :param totals: Функция без аргументов, возвращающая {категория: сумма}.
+        :param transaction_type: Тип транзакций на диаграмме.
+        """
+        self._totals = totals
+        self.transaction_type = transaction_type
+        self._cache = {}  # limit -> список секторов
+
+    def slices(self, limit=None):
+        """Секторы диаграммы (см. top_slices), вычисляются один раз до следующего изменения."""
+        result = self._cache.get(limit)
+        if result is None:
+            result = self._cache[limit] = top_slices(self._totals(), limit)
+        return result
+
+    def _touch(self, *rows):
+        """Сбрасывает кэш, если изменилась хотя бы одна строка нужного типа."""
+        if self._cache and any(row[1] == self.transaction_type for row in rows):
+            self._cache.clear()
+
+    def on_add(self, index, row):
+        self._touch(row)
+
+    def on_extend(self, start, rows):
+        self._cache.clear()
+
+    def on_edit(self, index, old_row, new_row):
+        self._touch(old_row, new_row)
+
+    def on_delete(self, index, row):
+        self._touch(row)
+
+    def on_reset(self, rows):
+        self._cache.clear()
+
+
+class SpendingChart:
+    """
+    Круговая диаграмма, которая создается один раз и затем обновляется:
+    при том же количестве секторов меняются только их углы и подписи.
+    """
+    def __init__(self):
+        self.figure = None
+        self.axes = None
+        self._headless = None
+        self._wedges = []
+        self._texts = []
+        self._autotexts = []
+
+    def render(self, slices, output=None):
+        """
+        Рисует секторы.
+        :param slices: Список пар (подпись, сумма).
+        :param output: Путь к файлу .png или .svg. Если указан, график рисуется
+            без графического интерфейса (Agg) и сохраняется в файл, иначе
+            открывается окно matplotlib.
+        :return: Путь к сохраненному файлу или None.
+        """
+        extension = None
+        if output is not None:
+            extension = os.path.splitext(output)[1].lower()
+            if extension not in IMAGE_FORMATS:
+                raise ValueError(f"Неподдерживаемый формат файла: {extension or output}")
+        self._ensure_figure(headless=output is not None)
+        labels = [label for label, _ in slices]
+        values = [float(total) for _, total in slices]
+        if len(self._wedges) == len(values) and sum(values) > 0:
+            self._update(labels, values)
+        else:
+            self._redraw(labels, values)
+        if output is not None:
+            self.figure.savefig(output, format=extension[1:])
+            return output
+        import matplotlib.pyplot as plt
+
+        plt.show()
+        return None
+
+    def _ensure_figure(self, headless):
+        """Создает фигуру при первом вызове или если прежняя больше недоступна."""
+        if self.figure is not None and self._headless == headless:
+            if headless:
+                return
+            import matplotlib.pyplot as plt
+
+            if plt.fignum_exists(self.figure.number):
+                return
+        if headless:
+            # matplotlib импортируется только здесь, при первом построении графика.
+            # Figure без pyplot не создает окон и не меняет глобальный бэкенд
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            from matplotlib.figure import Figure
+
+            self.figure = Figure(figsize=(8, 8))
+            FigureCanvasAgg(self.figure)
+        else:
+            import matplotlib.pyplot as plt
+
+            self.figure = plt.figure(figsize=(8, 8))
+        self._headless = headless
+        self.axes = self.figure.add_subplot()
+        self._wedges = []
+
+    def _redraw(self, labels, values):
+        """Полностью перерисовывает диаграмму (изменилось количество секторов)."""
+        self.axes.clear()
+        self._wedges, self._texts, self._autotexts = self.axes.pie(
+            values, labels=labels, autopct="%1.1f%%", startangle=START_ANGLE
+        )
+        self.axes.set_title("Распределение расходов по категориям")
+
+    def _update(self, labels, values):
+        """Обновляет углы секторов и подписи на месте, как их расставляет Axes.pie."""
+        total = sum(values)
+        theta1 = START_ANGLE / 360
+        for wedge, text, autotext, label, value in zip(
+            self._wedges, self._texts, self._autotexts, labels, values
+        ):
+            fraction = value / total
+            theta2 = theta1 + fraction
+            wedge.set_theta1(360 * theta1)
+            wedge.set_theta2(360 * theta2)
+            wedge.set_label(label)
+            middle = math.pi * (theta1 + theta2)
+            x, y = math.cos(middle), math.sin(middle)
+            text.set_text(label)
+            text.set_position((LABEL_DISTANCE * x, LABEL_DISTANCE * y))
+            text.set_horizontalalignment("left" if x > 0 else "right")
+            autotext.set_text(f"{100 * fraction:.1f}%")
+            autotext.set_position((PCT_DISTANCE * x, PCT_DISTANCE * y))
+            theta1 = theta2
+
+
+def plot_spending(totals, output=None, limit=None):
+    """
+    Рисует круговую диаграмму расходов по категориям на новой фигуре.
+    :param totals: Словарь {категория: сумма}.
+    :param output: Путь к файлу .png или .svg (см. SpendingChart.render).
+    :param limit: Количество крупнейших категорий; остальные — «Прочее».
+    """
+    return SpendingChart().render(top_slices(totals, limit), output)
@@ -0,0 +1,409 @@
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from solution.columnar_store import FLAG_TYPES, type_flag
+from solution.compat import optional_numpy
+from solution.journal import JOURNAL_SUFFIX
+
+
+INDEX_SUFFIX = ".match"
+MAGIC = b"PFTM"
+INDEX_VERSION = 1
+# Заголовок: сигнатура, версия, число записей, число категорий, длина подписи источника.
+HEADER = struct.Struct("<4sHQII")
+STRING_LENGTH = struct.Struct("<I")
+# Столбцы индекса в порядке записи в файл
+COLUMNS = (("dates", "i"), ("kinds", "B"), ("codes", "I"), ("amounts", "q"), ("counts", "I"))
+
+MATCHED = "matched"  # Строка выписки уже есть в журнале (точно или в пределах допуска)
+CONFLICT = "conflict"  # Рядом есть несопоставленная транзакция той же категории с другой суммой
+NEW = "new"  # Похожей транзакции в журнале нет
+STATUSES = (MATCHED, CONFLICT, NEW)
+
+
+def normalize_category(category):
+    """Категория для сравнения: без регистра, лишних пробелов и различия е/ё."""
+    return " ".join(category.casefold().replace("ё", "е").split())
+
+
+def index_path(filepath):
+    """Путь к файлу индекса сверки для файла данных."""
+    return f"{filepath.rstrip(os.sep)}{INDEX_SUFFIX}"
+
+
+def source_signature(filepath):
+    """
+    Подпись файла данных: размер и время изменения самого файла (для папки
+    архива — его манифеста), журнала CSV и WAL-файла SQLite. Если подпись
+    изменилась, индекс сверки устарел.
+    """
+    main = os.path.join(filepath, "manifest.json") if os.path.isdir(filepath) else filepath
+    signature = []
+    for path in (main, f"{filepath}{JOURNAL_SUFFIX}", f"{filepath}-wal"):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            signature.append("-")
+        else:
+            signature.append(f"{stat.st_size}:{stat.st_mtime_ns}")
+    return " ".join(signature)
+
+
+class LedgerIndex:
+    """
+    Индекс журнала для сверки выписок: мультимножество ключей
+    (день, тип, нормализованная категория, сумма в копейках) с количествами.
+
+    Ключи хранятся столбцами array, отсортированными по дню, типу, категории
+    и сумме, поэтому выписке нужны только ключи из ее диапазона дат (два
+    бинарных поиска), а не весь журнал. Одинаковые покупки в один день
+    хранятся одним ключом с количеством. Индекс сохраняется рядом с файлом
+    данных вместе с подписью файла и строится заново, только когда файл
+    изменился.
+    """
+    def __init__(self):
+        self.dates = array("i")  # Порядковые номера дней (по возрастанию)
+        self.kinds = array("B")  # Битовые маски типов
+        self.codes = array("I")  # Коды нормализованных категорий
+        self.amounts = array("q")  # Суммы в копейках
+        self.counts = array("I")  # Сколько раз ключ встречается в журнале
+        self.categories = []  # Код -> нормализованная категория
+        self._codes = {}  # Нормализованная категория -> код
+
+    def __len__(self):
+        """Количество строк журнала (с повторами)."""
+        return sum(self.counts)
+
+    def code(self, category):
+        """Код категории (после нормализации) или None, если ее нет в журнале."""
+        return self._codes.get(normalize_category(category))
+
+    def _encode(self, category, cache):
+        """Код категории; новые категории добавляются в таблицу."""
+        code = cache.get(category)
+        if code is None:
+            normalized = normalize_category(category)
+            code = self._codes.get(normalized)
+            if code is None:
+                code = self._codes[normalized] = len(self.categories)
+                self.categories.append(normalized)
+            cache[category] = code
+        return code
+
+    @classmethod
+    def build(cls, rows):
+        """
+        Строит индекс по строкам журнала.
+        :param rows: Строки (порядковый номер дня, тип, категория, копейки).
+        """
+        index = cls()
+        index.add(rows)
+        return index
+
+    def add(self, rows):
+        """
+        Добавляет строки журнала (например, импортированные из выписки).
+        Новые ключи сортируются отдельно и вливаются в уже отсортированные
+        столбцы одним проходом: O(N + k log k) вместо пересортировки всего индекса.
+        """
+        columns = [array(typecode) for _, typecode in COLUMNS]
+        dates, kinds, codes, amounts, counts = columns
+        cache = {}
+        for ordinal, transaction_type, category, amount_minor in rows:
+            # Тип проверяется до кодирования категории, чтобы ошибка не оставила лишних кодов
+            kind = type_flag(transaction_type)
+            dates.append(ordinal)
+            kinds.append(kind)
+            codes.append(self._encode(category, cache))
+            amounts.append(amount_minor)
+        counts.extend(array("I", [1]) * len(dates))
+        if not dates:
+            return
+        added = _aggregate(*columns)
+        if not self.dates:
+            self.dates, self.kinds, self.codes, self.amounts, self.counts = added
+            return
+        self.dates, self.kinds, self.codes, self.amounts, self.counts = _merge(
+            [self.dates, self.kinds, self.codes, self.amounts, self.counts], added
+        )
+
+    def entries(self, start, end):
+        """
+        Ключи с днем в отрезке [start, end] по порядку дней.
+        :return: Кортежи (день, маска типа, код категории, копейки, количество).
+        """
+        lo = bisect_left(self.dates, start)
+        hi = bisect_right(self.dates, end, lo)
+        return zip(self.dates[lo:hi], self.kinds[lo:hi], self.codes[lo:hi], self.amounts[lo:hi], self.counts[lo:hi])
+
+    def rows(self):
+        """Строки журнала (с повторами) в порядке индекса."""
+        for ordinal, kind, code, amount_minor, count in self.entries(float("-inf"), float("inf")):
+            row = (ordinal, FLAG_TYPES[kind], self.categories[code], amount_minor)
+            for _ in range(count):
+                yield row
+
+    def save(self, filepath, signature):
+        """
+        Атомарно сохраняет индекс.
+        :param filepath: Путь к файлу индекса.
+        :param signature: Подпись файла данных, по которому построен индекс.
+        """
+        tmp_path = f"{filepath}.tmp"
+        encoded = signature.encode("utf-8")
+        with open(tmp_path, mode="wb") as file:
+            file.write(HEADER.pack(MAGIC, INDEX_VERSION, len(self.dates), len(self.categories), len(encoded)))
+            file.write(encoded)
+            for name, _ in COLUMNS:
+                getattr(self, name).tofile(file)
+            for category in self.categories:
+                data = category.encode("utf-8")
+                file.write(STRING_LENGTH.pack(len(data)) + data)
+        os.replace(tmp_path, filepath)
+
+    @classmethod
+    def load(cls, filepath):
+        """
+        Читает индекс из файла.
+        :return: (индекс, подпись файла данных) или (None, None), если файла нет или он поврежден.
+        """
+        try:
+            with open(filepath, mode="rb") as file:
+                magic, version, count, category_count, signature_length = HEADER.unpack(file.read(HEADER.size))
+                if magic != MAGIC or version != INDEX_VERSION:
+                    return None, None
+                signature = file.read(signature_length).decode("utf-8")
+                index = cls()
+                for name, typecode in COLUMNS:
+                    column = array(typecode)
+                    column.fromfile(file, count)
+                    setattr(index, name, column)
+                for code in range(category_count):
+                    (length,) = STRING_LENGTH.unpack(file.read(STRING_LENGTH.size))
+                    category = file.read(length).decode("utf-8")
+                    index.categories.append(category)
+                    index._codes[category] = code
+        except (FileNotFoundError, EOFError, struct.error, UnicodeDecodeError):
+            return None, None
+        return index, signature
+
+    @classmethod
+    def for_source(cls, filepath, rows):
+        """
+        Индекс файла данных: сохраненный, если файл с тех пор не менялся,
+        иначе построенный заново и сохраненный.
+        :param filepath: Путь к файлу данных.
+        :param rows: Функция без аргументов, возвращающая строки журнала.
+        """
+        signature = source_signature(filepath)
+        index, saved = cls.load(index_path(filepath))
+        if index is None or saved != signature:
+            index = cls.build(rows())
+            index.save(index_path(filepath), signature)
+        return index
+
+
+def _aggregate(dates, kinds, codes, amounts, counts):
+    """Сортирует ключи по (день, тип, категория, сумма) и складывает количества одинаковых ключей."""
+    np = optional_numpy()
+    if np is not None and len(dates):
+        columns = [np.frombuffer(column, dtype=dtype) for column, dtype in zip(
+            (dates, kinds, codes, amounts, counts), (np.int32, np.uint8, np.uint32, np.int64, np.uint32)
+        )]
+        order = np.lexsort(columns[3::-1])
+        keys = [column[order] for column in columns[:4]]
+        changed = np.zeros(len(order), dtype=bool)
+        changed[0] = True
+        for column in keys:
+            changed[1:] |= column[1:] != column[:-1]
+        starts = np.flatnonzero(changed)
+        totals = np.add.reduceat(columns[4][order].astype(np.int64), starts).astype(np.uint32)
+        return [array(typecode, column[starts].tobytes()) for column, (_, typecode) in zip(keys, COLUMNS)] + [
+            array("I", totals.tobytes())
+        ]
+    merged = Counter()
+    for key, count in zip(zip(dates, kinds, codes, amounts), counts):
+        merged[key] += count
+    result = [array(typecode) for _, typecode in COLUMNS]
+    for key in sorted(merged):
+        for column, value in zip(result, key):
+            column.append(value)
+        result[4].append(merged[key])
+    return result
+
+
+def _merge(columns, added):
+    """
+    Вливает отсортированные ключи added в отсортированные столбцы columns.
+    Позиция каждого нового ключа ищется бинарным поиском правее предыдущей,
+    одинаковые ключи складывают количества, остальные вставляются между
+    срезами старых столбцов.
+    """
+    dates, kinds, codes, amounts, counts = columns
+    counts = array("I", counts)
+    inserts = []  # (позиция в старых столбцах, номер нового ключа)
+    lo = 0
+    for position, key in enumerate(zip(*added[:4])):
+        hi = len(dates)
+        while lo < hi:
+            middle = (lo + hi) // 2
+            if (dates[middle], kinds[middle], codes[middle], amounts[middle]) < key:
+                lo = middle + 1
+            else:
+                hi = middle
+        if lo < len(dates) and (dates[lo], kinds[lo], codes[lo], amounts[lo]) == key:
+            counts[lo] += added[4][position]
+        else:
+            inserts.append((lo, position))
+    if not inserts:
+        return [dates, kinds, codes, amounts, counts]
+    result = []
+    for old, new in zip((dates, kinds, codes, amounts, counts), added):
+        column = array(old.typecode)
+        start = 0
+        for stop, position in inserts:
+            column.extend(old[start:stop])
+            column.append(new[position])
+            start = stop
+        column.extend(old[start:])
+        result.append(column)
+    return result
+
+
+class ReconcileReport:
+    """Результат сверки: статус каждой строки выписки и сопоставленная транзакция журнала."""
+    def __init__(self, rows):
+        """:param rows: Строки выписки (порядковый номер дня, тип, категория, копейки)."""
+        self.rows = rows
+        self.statuses = [NEW] * len(rows)
+        self.partners = [None] * len(rows)  # (день, копейки) транзакции журнала или None
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __iter__(self):
+        """Перебирает тройки (статус, строка выписки, (день, копейки) из журнала или None)."""
+        return zip(self.statuses, self.rows, self.partners)
+
+    def counts(self):
+        """Количество строк выписки по статусам."""
+        counts = dict.fromkeys(STATUSES, 0)
+        counts.update(Counter(self.statuses))
+        return counts
+
+    def new_rows(self):
+        """Строки выписки, которых нет в журнале, в порядке выписки."""
+        return [row for status, row in zip(self.statuses, self.rows) if status == NEW]
+
+
+def reconcile(index, rows, days=0, tolerance=0):
+    """
+    Сверяет строки выписки с индексом журнала.
+
+    Сначала строки сопоставляются с ключами журнала точно (мультимножество:
+    каждая транзакция журнала подтверждает не более одной строки выписки).
+    Затем оставшиеся строки в порядке дат сопоставляются с ближайшей по
+    сумме, а затем по дате несопоставленной транзакцией того же типа и
+    категории в пределах ±days дней и ±tolerance копеек. Строка, для
+    которой в этом окне дат осталась только транзакция с другой суммой,
+    получает статус конфликта, остальные — статус новой строки.
+
+    Ключи журнала раскладываются по (тип, категория, день) только для
+    диапазона дат выписки, поэтому время сверки растет линейно с размером
+    выписки и числом транзакций журнала в ее диапазоне дат.
+    :param index: LedgerIndex журнала.
+    :param rows: Строки выписки (порядковый номер дня, тип, категория, копейки).
+    :param days: Допустимое расхождение дат в днях.
+    :param tolerance: Допустимое расхождение сумм в копейках.
+    :return: ReconcileReport.
+    """
+    report = ReconcileReport(list(rows))
+    if not report.rows:
+        return report
+    keys = []
+    codes = {}  # Категория выписки -> код категории журнала (нормализуется один раз)
+    for ordinal, transaction_type, category, amount_minor in report.rows:
+        code = codes.get(category, codes)
+        if code is codes:
+            code = codes[category] = index.code(category)
+        keys.append(None if code is None else (type_flag(transaction_type), code))
+    wanted = set(keys)
+    first = min(row[0] for row in report.rows) - days
+    last = max(row[0] for row in report.rows) + days
+    # (маска типа, код категории, день) -> [суммы по возрастанию, оставшиеся количества]
+    slots = {}
+    for ordinal, kind, code, amount_minor, count in index.entries(first, last):
+        if (kind, code) in wanted:
+            slot = slots.get((kind, code, ordinal))
+            if slot is None:
+                slot = slots[(kind, code, ordinal)] = ([], [])
+            slot[0].append(amount_minor)
+            slot[1].append(count)
+
+    pending = []
+    for position, key in enumerate(keys):
+        if key is None:
+            continue
+        ordinal, amount_minor = report.rows[position][0], report.rows[position][3]
+        slot = slots.get(key + (ordinal,))
+        if slot is not None:
+            amounts, counts = slot
+            i = bisect_left(amounts, amount_minor)
+            if i < len(amounts) and amounts[i] == amount_minor and counts[i]:
+                counts[i] -= 1
+                report.statuses[position] = MATCHED
+                report.partners[position] = (ordinal, amount_minor)
+                continue
+        pending.append(position)
+    pending.sort(key=lambda position: (report.rows[position][0], report.rows[position][3]))
+
+    if days or tolerance:
+        unmatched = []
+        for position in pending:
+            found = _nearest(slots, keys[position], report.rows[position], days, tolerance)
+            if found is None:
+                unmatched.append(position)
+            else:
+                report.statuses[position] = MATCHED
+                report.partners[position] = found
+        pending = unmatched
+
+    for position in pending:
+        found = _nearest(slots, keys[position], report.rows[position], days, None)
+        if found is not None:
+            report.statuses[position] = CONFLICT
+            report.partners[position] = found
+    return report
+
+
+def _nearest(slots, key, row, days, tolerance):
+    """
+    Находит и вычеркивает ближайшую несопоставленную транзакцию журнала
+    (сначала по сумме, затем по дате) в пределах ±days дней.
+    :param tolerance: Допустимое расхождение сумм в копейках; None — любое.
+    :return: (день, копейки) найденной транзакции или None.
+    """
+    ordinal, amount_minor = row[0], row[3]
+    best = None
+    for day in range(ordinal - days, ordinal + days + 1):
+        slot = slots.get(key + (day,))
+        if slot is None:
+            continue
+        amounts, counts = slot
+        if tolerance is None:
+            lo, hi = 0, len(amounts)
+        else:
+            lo = bisect_left(amounts, amount_minor - tolerance)
+            hi = bisect_right(amounts, amount_minor + tolerance, lo)
+        for i in range(lo, hi):
+            if counts[i]:
+                score = (abs(amounts[i] - amount_minor), abs(day - ordinal))
+                if best is None or score < best[0]:
+                    best = (score, counts, i, day)
+    if best is None:
+        return None
+    _, counts, i, day = best
+    counts[i] -= 1
+    return day, slots[key + (day,)][0][i]
@@ -0,0 +1,89 @@
+from datetime import date
+from solution.compat import optional_numpy
+
+
+NUMPY_MIN_SIZE = 1024  # Меньшие массивы быстрее суммировать без numpy
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def sum_minor(values):
+    """
+    Точная сумма копеек.
+    :param values: Последовательность целых или array("q").
+    Для больших array("q") используется numpy (int64, без копирования),
+    иначе встроенная sum по целым Python.
+    """
+    np = optional_numpy()
+    if np is not None and len(values) >= NUMPY_MIN_SIZE and hasattr(values, "typecode"):
+        return int(np.frombuffer(values, dtype=np.int64).sum())
+    return sum(values)
+
+
+def masked_sum(amounts, kinds, kind_mask):
+    """
+    Точная сумма копеек по строкам, тип которых входит в битовую маску.
+    :param amounts: array("q") сумм.
+    :param kinds: array("B") битовых масок типов.
+    """
+    np = optional_numpy()
+    if np is not None and len(amounts) >= NUMPY_MIN_SIZE:
+        values = np.frombuffer(amounts, dtype=np.int64)
+        selected = (np.frombuffer(kinds, dtype=np.uint8) & kind_mask) != 0
+        return int(values[selected].sum())
+    return sum(a for a, k in zip(amounts, kinds) if k & kind_mask)
+
+
+def _grouped_numpy(np, keys, amounts):
+    """Суммы и количества по целочисленным ключам: сортировка и np.add.reduceat в int64."""
+    order = np.argsort(keys, kind="stable")
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1])))
+    sums = np.add.reduceat(amounts[order], starts)
+    counts = np.diff(np.append(starts, len(sorted_keys)))
+    return zip(sorted_keys[starts].tolist(), sums.tolist(), counts.tolist())
+
+
+def column_totals(dates, kinds, category_codes, amounts):
+    """
+    Итоги по колонкам ColumnarStore одной пакетной операцией.
+    :return: Словари {(код категории, маска типа): (сумма, количество)}
+        и {(год, месяц, маска типа): (сумма, количество)}, суммы в копейках.
+    """
+    if not len(amounts):
+        return {}, {}
+    np = optional_numpy()
+    if np is None or len(amounts) < NUMPY_MIN_SIZE:
+        return _column_totals_python(dates, kinds, category_codes, amounts)
+
+    amount_values = np.frombuffer(amounts, dtype=np.int64)
+    kind_values = np.frombuffer(kinds, dtype=np.uint8).astype(np.int64)
+    code_values = np.frombuffer(category_codes, dtype=np.uint32).astype(np.int64)
+    by_category = {
+        (key >> 8, key & 0xFF): (total, count)
+        for key, total, count in _grouped_numpy(np, (code_values << 8) | kind_values, amount_values)
+    }
+    days = np.frombuffer(dates, dtype=np.int32).astype(np.int64) - EPOCH_ORDINAL
+    months = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+    by_month = {}
+    for key, total, count in _grouped_numpy(np, (months << 8) | kind_values, amount_values):
+        month_index = key >> 8
+        by_month[(1970 + month_index // 12, month_index % 12 + 1, key & 0xFF)] = (total, count)
+    return by_category, by_month
+
+
+def _column_totals_python(dates, kinds, category_codes, amounts):
+    """Запасной вариант column_totals без numpy."""
+    by_category = {}
+    by_month = {}
+    months = {}  # Кэш: порядковый номер дня -> (год, месяц)
+    for ordinal, kind, code, amount in zip(dates, kinds, category_codes, amounts):
+        total, count = by_category.get((code, kind), (0, 0))
+        by_category[(code, kind)] = (total + amount, count + 1)
+        year_month = months.get(ordinal)
+        if year_month is None:
+            day = date.fromordinal(ordinal)
+            year_month = months[ordinal] = (day.year, day.month)
+        key = (*year_month, kind)
+        total, count = by_month.get(key, (0, 0))
+        by_month[key] = (total + amount, count + 1)
+    return by_category, by_month
@@ -0,0 +1,167 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+from solution.dates import month_bounds
+from solution.fenwick import FenwickTree
+
+
+PERIODS = ("day", "week", "month")
+
+
+def net_amount(row):
+    """Изменение баланса от строки в копейках: доход со знаком плюс, расход — минус."""
+    return row[3] if row[1] == "income" else -row[3]
+
+
+class BalanceRollup:
+    """
+    Баланс во времени.
+
+    Хранит отсортированный массив дней, в которые были транзакции, чистое
+    изменение баланса за каждый день и префиксные суммы в дереве Фенвика.
+    Баланс на дату и оборот за период считаются за O(log D), где D —
+    количество различных дней. Изменение суммы существующего дня (в том числе
+    редактирование и удаление задним числом) стоит O(log D), новый день в конце
+    — тоже O(log D); только новый день в середине перестраивает дерево за O(D).
+    Дни, в которых не осталось транзакций, остаются с нулевой суммой.
+    """
+    def __init__(self):
+        self._days = []  # Порядковые номера дней по возрастанию
+        self._net = []  # Чистое изменение баланса за день, в копейках
+        self._tree = FenwickTree()  # Префиксные суммы по _net
+
+    def __len__(self):
+        return len(self._days)
+
+    def _rebuild(self):
+        """Строит дерево Фенвика по _net за O(D)."""
+        self._tree = FenwickTree(self._net)
+
+    def _prefix(self, count):
+        """Сумма первых count дней."""
+        return self._tree.prefix(count)
+
+    def _update(self, position, delta):
+        """Прибавляет delta к дню с индексом position."""
+        self._net[position] += delta
+        self._tree.add(position, delta)
+
+    def _append_day(self, ordinal, delta):
+        """Добавляет день после последнего за O(log D)."""
+        self._days.append(ordinal)
+        self._net.append(delta)
+        self._tree.append(delta)
+
+    def _find(self, ordinal):
+        """Индекс дня в массиве или None."""
+        position = bisect_left(self._days, ordinal)
+        if position < len(self._days) and self._days[position] == ordinal:
+            return position
+        return None
+
+    def add(self, ordinal, delta):
+        """Прибавляет delta копеек к балансу дня ordinal."""
+        position = self._find(ordinal)
+        if position is not None:
+            self._update(position, delta)
+        elif not self._days or ordinal > self._days[-1]:
+            self._append_day(ordinal, delta)
+        else:
+            position = bisect_left(self._days, ordinal)
+            self._days.insert(position, ordinal)
+            self._net.insert(position, delta)
+            self._rebuild()
+
+    def add_days(self, deltas):
+        """
+        Массово прибавляет суммы по дням.
+        :param deltas: Словарь {порядковый номер дня: изменение в копейках}.
+        """
+        new_days = sorted(day for day in deltas if self._find(day) is None)
+        if new_days and (not self._days or new_days[0] < self._days[-1]):
+            # Новые дни в середине (или первая загрузка): одно слияние и одно перестроение
+            merged = dict(zip(self._days, self._net))
+            for day, delta in deltas.items():
+                merged[day] = merged.get(day, 0) + delta
+            self._days = sorted(merged)
+            self._net = [merged[day] for day in self._days]
+            self._rebuild()
+            return
+        for day, delta in deltas.items():
+            position = self._find(day)
+            if position is not None:
+                self._update(position, delta)
+        for day in new_days:
+            self._append_day(day, deltas[day])
+
+    # Запросы
+
+    def balance_at(self, ordinal):
+        """Баланс в копейках на конец дня ordinal."""
+        return self._prefix(bisect_right(self._days, ordinal))
+
+    def net_flow(self, start, end):
+        """Чистый оборот в копейках за дни с start по end включительно."""
+        if end < start:
+            return 0
+        return self._prefix(bisect_right(self._days, end)) - self._prefix(bisect_left(self._days, start))
+
+    def series(self, start, end, period="month"):
+        """
+        Ряд по периодам, пересекающим [start, end].
+        :param period: "day", "week" (с понедельника) или "month".
+        :return: Список (начало периода, оборот за период, баланс на конец периода),
+            начало периода — порядковый номер дня, суммы — в копейках; периоды
+            на краях обрезаются по start и end.
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Неизвестный период: {period}")
+        points = []
+        current = _period_start(start, period)
+        while current <= end:
+            following = _period_end(current, period)
+            last = min(following - 1, end)
+            points.append((current, self.net_flow(max(current, start), last), self.balance_at(last)))
+            current = following
+        return points
+
+    # Методы-наблюдатели, которые вызывает FinanceTracker при изменениях.
+
+    def on_add(self, index, row):
+        self.add(row[0], net_amount(row))
+
+    def on_extend(self, start, rows):
+        deltas = {}
+        for row in rows:
+            deltas[row[0]] = deltas.get(row[0], 0) + net_amount(row)
+        self.add_days(deltas)
+
+    def on_edit(self, index, old_row, new_row):
+        self.add(old_row[0], -net_amount(old_row))
+        self.add(new_row[0], net_amount(new_row))
+
+    def on_delete(self, index, row):
+        self.add(row[0], -net_amount(row))
+
+    def on_reset(self, rows):
+        self.__init__()
+        self.on_extend(0, rows)
+
+
+def _period_start(ordinal, period):
+    """Первый день периода, содержащего ordinal."""
+    if period == "day":
+        return ordinal
+    day = date.fromordinal(ordinal)
+    if period == "week":
+        return ordinal - day.weekday()
+    return month_bounds(day.month, day.year)[0]
+
+
+def _period_end(start, period):
+    """Первый день следующего периода."""
+    if period == "day":
+        return start + 1
+    if period == "week":
+        return start + 7
+    day = date.fromordinal(start)
+    return month_bounds(day.month, day.year)[1]
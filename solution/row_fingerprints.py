@@ -0,0 +1,159 @@
+import os
+import zlib
+from collections import Counter
+from hashlib import blake2b
+from solution.csv_loader import iter_row_batches
+
+
+FINGERPRINTS_SUFFIX = ".rows"
+STAMP_MARKER = "#stamp "
+TAIL_BLOCK = 64 * 1024  # Сколько последних байт CSV входит в CRC отметки
+
+
+def row_fingerprint(row):
+    """Короткий отпечаток строки (порядковый номер дня, тип, категория, копейки)."""
+    key = "\x1f".join(map(str, row)).encode("utf-8")
+    return blake2b(key, digest_size=8).hexdigest()
+
+
+def sidecar_path(filepath):
+    """Путь к файлу отпечатков строк CSV-файла."""
+    return f"{filepath}{FINGERPRINTS_SUFFIX}"
+
+
+def file_stamp(filepath):
+    """
+    Отметка состояния CSV-файла: размер, время изменения и CRC32 последнего
+    блока. Правка на месте без изменения длины меняет время изменения,
+    а правка в конце файла — еще и CRC.
+    """
+    stat = os.stat(filepath)
+    with open(filepath, mode="rb") as file:
+        file.seek(max(stat.st_size - TAIL_BLOCK, 0))
+        crc = zlib.crc32(file.read(TAIL_BLOCK))
+    return f"{stat.st_size} {stat.st_mtime_ns} {crc}"
+
+
+class FingerprintWriter:
+    """
+    Пишет файл отпечатков строк CSV-файла.
+
+    Файл только дописывается: по строке на каждую запись CSV и после каждой
+    порции маркер "#stamp ..." с отметкой CSV (см. file_stamp). Если отметка
+    CSV не совпадает с последним маркером, отпечатки считаются устаревшими.
+    """
+    def __init__(self, filepath, mode="a"):
+        """
+        :param filepath: Путь к CSV-файлу.
+        :param mode: "w" — начать файл отпечатков заново (во временный файл), "a" — дописать.
+        """
+        self.filepath = filepath
+        self.path = sidecar_path(filepath)
+        self.mode = mode
+        self._write_path = f"{self.path}.tmp" if mode == "w" else self.path
+        self._file = open(self._write_path, mode=mode, encoding="utf-8")
+
+    def add(self, row):
+        """Добавляет отпечаток строки."""
+        self._file.write(row_fingerprint(row) + "\n")
+
+    def close(self):
+        """Завершает порцию маркером с текущей отметкой CSV-файла."""
+        self._file.write(f"{STAMP_MARKER}{file_stamp(self.filepath)}\n")
+        self._file.close()
+        if self.mode == "w":
+            os.replace(self._write_path, self.path)
+
+    def abort(self):
+        """Закрывает файл без маркера: недописанные отпечатки будут считаться устаревшими."""
+        self._file.close()
+
+
+def load_fingerprints(filepath):
+    """
+    Возвращает мультимножество отпечатков строк CSV-файла.
+    Если файл отпечатков отсутствует или устарел, он строится заново по CSV.
+    """
+    if not os.path.exists(filepath):
+        return Counter()
+    counts = Counter()
+    last_stamp = None
+    try:
+        with open(sidecar_path(filepath), mode="r", encoding="utf-8") as file:
+            for line in file:
+                line = line.rstrip("\n")
+                if line.startswith(STAMP_MARKER):
+                    last_stamp = line[len(STAMP_MARKER):]
+                elif line.startswith("#"):
+                    # Маркер старого формата (только размер) не подтверждает отпечатки
+                    last_stamp = None
+                elif line:
+                    counts[line] += 1
+    except FileNotFoundError:
+        last_stamp = None
+    if last_stamp == file_stamp(filepath):
+        return counts
+    return rebuild_fingerprints(filepath)
+
+
+def rebuild_fingerprints(filepath):
+    """Разбирает CSV-файл и заново записывает его отпечатки."""
+    counts = Counter()
+    writer = FingerprintWriter(filepath, mode="w")
+    try:
+        for batch in iter_row_batches(filepath):
+            for row in batch:
+                writer.add(row)
+                counts[row_fingerprint(row)] += 1
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+    return counts
+
+
+class AppendState:
+    """
+    Отметки уровня (high-water mark) для дозаписи в CSV-файлы.
+
+    Для каждого файла хранится количество первых слотов хранилища трекера,
+    уже сопоставленных с файлом, и остаток отпечатков файла, которым пока не
+    нашлось пары. Тогда очередная дозапись просматривает только новые строки.
+    Отметка сбрасывается, если изменилась уже сопоставленная транзакция.
+    """
+    def __init__(self):
+        self._states = {}  # Путь -> (отметка, остаток отпечатков, отметка CSV-файла)
+
+    def take(self, filepath):
+        """
+        Забирает (отметка, остаток отпечатков) для файла, если он не менялся извне.
+        После успешной дозаписи состояние возвращается через set().
+        """
+        state = self._states.pop(filepath, None)
+        if state and os.path.exists(filepath) and file_stamp(filepath) == state[2]:
+            return state[0], state[1]
+        return None
+
+    def set(self, filepath, mark, leftover):
+        self._states[filepath] = (mark, leftover, file_stamp(filepath))
+
+    def _invalidate_from(self, index):
+        """Удаляет отметки, которые покрывают измененный слот."""
+        self._states = {
+            path: state for path, state in self._states.items() if state[0] <= index
+        }
+
+    def on_add(self, index, row):
+        pass
+
+    def on_extend(self, start, rows):
+        pass
+
+    def on_edit(self, index, old_row, new_row):
+        self._invalidate_from(index)
+
+    def on_delete(self, index, row):
+        self._invalidate_from(index)
+
+    def on_reset(self, rows):
+        self._states = {}
@@ -0,0 +1,380 @@
+"""
+Локальный сервер трекера для нескольких клиентов (дашборды, импорт, CLI).
+
+Протокол — JSON по строкам: клиент отправляет {"id": 1, "method": "balance",
+"params": {}}, сервер отвечает {"id": 1, "result": ...} или {"id": 1, "error": "..."}.
+Методы:
+    add      {"amount", "category", "date", "type"} -> {"id": id транзакции}
+    balance  {"at": "ГГГГ-ММ-ДД"} (необязательно) -> "сумма"
+    report   {"month", "year"} | {"quarter", "year"} | {"start", "end"} -> [транзакции]
+    query    {"category"} -> [транзакции] | {"type"} -> {категория: сумма}
+    alerts   {} -> [последние предупреждения бюджетов]
+Суммы передаются строками ("1500.30"), транзакции — словарями
+{"date", "type", "category", "amount"}.
+"""
+import asyncio
+import json
+from array import array
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from solution.aggregates import year_month
+from solution.csv_loader import format_date
+from solution.dates import month_bounds, quarter_bounds, to_ordinal
+from solution.ids import IdIndex
+from solution.money import format_minor, from_minor, parse_amount
+from solution.storage import CsvBackend
+from solution.transaction import Transaction
+
+
+MAX_GROUP = 1000  # Сколько добавлений сохраняется одной записью журнала
+MAX_ALERTS = 100  # Сколько последних предупреждений бюджетов хранит сервер
+STREAM_LIMIT = 1 << 24  # Максимальная длина строки запроса или ответа
+
+
+class ReadView:
+    """
+    Неизменяемое состояние трекера на момент последней сохраненной группы.
+
+    Строки лежат в общих списках, которые писатель только дописывает: пары
+    (строка, id) по порядку и строки по месяцам и по категориям.
+    Представление запоминает длины списков на момент публикации, поэтому
+    строки следующих групп в него не попадают. Публикация копирует только
+    эти длины и итоги — O(месяцев + категорий), а не все строки.
+    """
+    def __init__(self, log, months, categories, aggregates, next_id, alerts):
+        self._log = log  # Пары (строка, id) в порядке трекера
+        self._count = len(log)
+        self._months = months  # (год, месяц) -> строки
+        self._month_counts = {key: len(rows) for key, rows in months.items()}
+        self._categories = categories  # Категория -> строки
+        self._category_counts = {key: len(rows) for key, rows in categories.items()}
+        self.aggregates = aggregates  # Копия RunningAggregates
+        self.next_id = next_id
+        self.alerts = alerts  # Кортеж строк последних предупреждений
+
+    def __len__(self):
+        return self._count
+
+    def balance(self, at=None):
+        """
+        Баланс в копейках, а если указан день at — на конец этого дня: итоги
+        предыдущих месяцев плюс строки месяца до дня включительно.
+        """
+        if at is None:
+            return self.aggregates.balance()
+        day = to_ordinal(at)
+        current = year_month(day)
+        balance = sum(
+            total if kind == "income" else -total
+            for (year, month, kind), total in self.aggregates.by_month.items()
+            if (year, month) < current
+        )
+        for ordinal, kind, _, amount_minor in self._month_rows(current):
+            if ordinal <= day:
+                balance += amount_minor if kind == "income" else -amount_minor
+        return balance
+
+    def rows_between(self, start, end):
+        """Строки с датой в полуинтервале [start, end), упорядоченные по дате."""
+        first, last = year_month(start), year_month(end - 1)
+        rows = [
+            row
+            for key in sorted(self._month_counts) if first <= key <= last
+            for row in self._month_rows(key) if start <= row[0] < end
+        ]
+        rows.sort(key=lambda row: row[0])
+        return rows
+
+    def category_rows(self, category):
+        """Строки категории в порядке добавления."""
+        return self._categories.get(category, [])[:self._category_counts.get(category, 0)]
+
+    def category_totals(self, transaction_type):
+        """Суммы в копейках по категориям указанного типа."""
+        return {
+            category: total
+            for (category, kind), total in self.aggregates.by_category.items()
+            if kind == transaction_type
+        }
+
+    def _month_rows(self, key):
+        return self._months.get(key, [])[:self._month_counts.get(key, 0)]
+
+    def save_to(self, backend):
+        """Сворачивает журнал хранилища в файл строками этого представления."""
+        pairs = self._log[:self._count]
+        ids = IdIndex()
+        ids.extend(array("q", (transaction_id for _, transaction_id in pairs)), len(pairs))
+        ids.reserve(self.next_id)
+        backend.compact([row for row, _ in pairs], ids)
+
+
+class TrackerService:
+    """
+    Обслуживает запросы к одному FinanceTracker.
+
+    Изменения выполняет единственная задача-писатель: она собирает
+    накопившиеся добавления в группу, применяет их к трекеру, сохраняет
+    одной записью журнала в отдельном потоке (не блокируя цикл событий)
+    и после записи публикует новое неизменяемое представление ReadView.
+    Если запись не удалась, добавления группы отменяются. Читатели
+    обращаются только к опубликованному представлению, поэтому видят
+    целостное состояние, в котором есть только сохраненные на диск
+    изменения, а клиент получает ответ на добавление после записи на диск.
+    """
+    def __init__(self, tracker):
+        """
+        :param tracker: Трекер в памяти; если он подключен к CSV-файлу,
+            изменения сохраняются в журнал этого файла.
+        """
+        backend = tracker.backend
+        if backend is not None and not isinstance(backend, CsvBackend):
+            raise ValueError("Сервер сохраняет изменения только в CSV-файл с журналом.")
+        self.tracker = tracker
+        # Сохранением управляет сервис, а не трекер (до close)
+        self.backend, tracker.backend = backend, None
+        self._executor = ThreadPoolExecutor(max_workers=1)  # Один поток: записи идут по порядку
+        self._queue = asyncio.Queue()
+        self._writer = None
+        # Общие списки строк, которые только дописываются (см. ReadView)
+        self._log = []
+        self._months = {}
+        self._categories = {}
+        self._alerts = deque(maxlen=MAX_ALERTS)
+        self._record(list(zip(tracker._rows(), tracker.ids)))
+        self.view = self._publish()
+        self._readers = {
+            "balance": self._balance,
+            "report": self._report,
+            "query": self._query,
+            "alerts": self._recent_alerts,
+        }
+
+    async def start(self):
+        """Запускает задачу-писателя."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def close(self):
+        """
+        Останавливает писателя и возвращает трекеру его хранилище;
+        подтвержденные изменения уже сохранены.
+        """
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        self._executor.shutdown()
+        self.tracker.backend = self.backend
+
+    async def handle(self, method, params):
+        """
+        Выполняет один запрос.
+        :return: Результат, который можно сериализовать в JSON.
+        :raises ValueError: Неизвестный метод или неверные параметры.
+        """
+        reader = self._readers.get(method)
+        if reader is not None:
+            return reader(self.view, **params)
+        if method == "add":
+            row = _parse_row(params)
+            future = asyncio.get_running_loop().create_future()
+            await self._queue.put((row, future))
+            return {"id": await future}
+        raise ValueError(f"Неизвестный метод: {method}")
+
+    # Писатель
+
+    async def _write_loop(self):
+        """Применяет добавления группами: трекер, запись на диск, затем публикация."""
+        loop = asyncio.get_running_loop()
+        tracker = self.tracker
+        while True:
+            group = [await self._queue.get()]
+            while len(group) < MAX_GROUP and not self._queue.empty():
+                group.append(self._queue.get_nowait())
+            rows = [row for row, _ in group]
+            try:
+                # Пакет трекера отменяет добавления группы, если запись не удалась;
+                # id берутся из результата добавления, а не угадываются заранее
+                with tracker.batch():
+                    ids = [tracker.add_transaction(tracker.transaction_class.from_row(row)) for row in rows]
+                    if self.backend is not None:
+                        operations = [("add", transaction_id, row) for transaction_id, row in zip(ids, rows)]
+                        await loop.run_in_executor(self._executor, self.backend.apply, operations)
+            except Exception as e:
+                tracker.pop_alerts()  # Предупреждения отмененных добавлений
+                for _, future in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self._record(list(zip(rows, ids)))
+            self._alerts.extend(str(alert) for alert in tracker.pop_alerts())
+            self.view = self._publish()
+            for (_, future), transaction_id in zip(group, ids):
+                if not future.done():
+                    future.set_result(transaction_id)
+            if self.backend is not None and self.backend.needs_compaction():
+                # Поток читает только опубликованное представление, а не трекер
+                await loop.run_in_executor(self._executor, self.view.save_to, self.backend)
+
+    def _record(self, pairs):
+        """Дописывает сохраненные пары (строка, id) в общие списки."""
+        self._log.extend(pairs)
+        for row, _ in pairs:
+            self._months.setdefault(year_month(row[0]), []).append(row)
+            self._categories.setdefault(row[2], []).append(row)
+
+    def _publish(self):
+        """Новое неизменяемое представление для читателей."""
+        return ReadView(
+            self._log, self._months, self._categories,
+            self.tracker.aggregates.copy(), self.tracker.ids.next_id, tuple(self._alerts),
+        )
+
+    # Читатели: работают только с опубликованным представлением
+
+    @staticmethod
+    def _balance(view, at=None):
+        return format_minor(view.balance(at))
+
+    @staticmethod
+    def _report(view, month=None, quarter=None, year=None, start=None, end=None):
+        if start is not None and end is not None:
+            bounds = to_ordinal(start), to_ordinal(end) + 1
+        elif year is not None and quarter is not None:
+            bounds = quarter_bounds(int(quarter), int(year))
+        elif year is not None and month is not None:
+            try:
+                bounds = month_bounds(int(month), int(year))
+            except ValueError:
+                return []  # Несуществующий месяц, как в get_monthly_report
+        else:
+            raise ValueError("Укажите month и year, quarter и year или start и end.")
+        return [_row_dict(row) for row in view.rows_between(*bounds)]
+
+    @staticmethod
+    def _query(view, category=None, type=None):
+        if category is not None:
+            return [_row_dict(row) for row in view.category_rows(category)]
+        if type in ("income", "expense"):
+            return {name: format_minor(total) for name, total in view.category_totals(type).items()}
+        raise ValueError("Укажите category или type (income/expense).")
+
+    @staticmethod
+    def _recent_alerts(view):
+        return list(view.alerts)
+
+
+def _parse_row(params):
+    """Проверяет параметры add и возвращает строку транзакции."""
+    transaction_type = params.get("type")
+    if transaction_type not in ("income", "expense"):
+        raise ValueError("Тип должен быть 'income' или 'expense'.")
+    category = str(params.get("category", "")).strip()
+    if not category:
+        raise ValueError("Категория не может быть пустой.")
+    amount = from_minor(parse_amount(str(params.get("amount", ""))))
+    return Transaction(amount, category, str(params.get("date")), transaction_type).to_row()
+
+
+def _row_dict(row):
+    """Строка транзакции в виде словаря для JSON."""
+    ordinal, transaction_type, category, amount_minor = row
+    return {
+        "date": format_date(ordinal),
+        "type": transaction_type,
+        "category": category,
+        "amount": format_minor(amount_minor),
+    }
+
+
+async def _serve_connection(service, reader, writer):
+    """Обрабатывает запросы одного клиента по очереди."""
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            request_id = None
+            try:
+                request = json.loads(line)
+                request_id = request.get("id")
+                params = request.get("params") or {}
+                response = {"id": request_id, "result": await service.handle(request.get("method"), params)}
+            except Exception as e:
+                response = {"id": request_id, "error": str(e)}
+            writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(service, path=None, host="127.0.0.1", port=0):
+    """
+    Запускает сервер на Unix-сокете path или, если path не указан,
+    на TCP-порту localhost (port=0 — свободный порт).
+    :return: asyncio.Server.
+    """
+    await service.start()
+
+    def handler(reader, writer):
+        return _serve_connection(service, reader, writer)
+
+    if path is not None:
+        return await asyncio.start_unix_server(handler, path, limit=STREAM_LIMIT)
+    return await asyncio.start_server(handler, host, port, limit=STREAM_LIMIT)
+
+
+async def serve(tracker, path=None, host="127.0.0.1", port=0, ready=None):
+    """
+    Обслуживает трекер до отмены задачи.
+    :param ready: Функция, которой передается адрес сервера после запуска.
+    """
+    service = TrackerService(tracker)
+    server = await start_server(service, path, host, port)
+    try:
+        if ready is not None:
+            ready(path if path is not None else server.sockets[0].getsockname()[:2])
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+class Client:
+    """Клиент сервера: один запрос за раз по одному соединению."""
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=None):
+        """Подключается к Unix-сокету path или к TCP-порту localhost."""
+        if path is not None:
+            return cls(*await asyncio.open_unix_connection(path, limit=STREAM_LIMIT))
+        return cls(*await asyncio.open_connection(host, port, limit=STREAM_LIMIT))
+
+    async def request(self, method, **params):
+        """
+        Отправляет запрос и ждет ответ.
+        :raises RuntimeError: Если сервер вернул ошибку.
+        """
+        self._next_id += 1
+        message = {"id": self._next_id, "method": method, "params": params}
+        self._writer.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        response = json.loads(await self._reader.readline())
+        if "error" in response:
+            raise RuntimeError(response["error"])
+        return response["result"]
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
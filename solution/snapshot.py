@@ -0,0 +1,231 @@
+import mmap
+import os
+import struct
+import zlib
+from itertools import count as sequence, tee
+from solution.columnar_store import EXPENSE, FLAG_TYPES, INCOME, TYPE_FLAGS
+from solution.compat import optional_numpy
+from solution.csv_loader import iter_id_batches
+from solution.ids import IdIndex, saved_next_id
+from solution.journal import Journal, atomic_write_csv, replay_with_index
+
+
+SNAPSHOT_SUFFIX = ".snap"
+MAGIC = b"PFTS"
+SCHEMA_VERSION = 3
+
+# Заголовок: сигнатура, версия схемы, размер записи, число записей,
+# число категорий, CRC32 тела файла (записи + таблица категорий).
+HEADER = struct.Struct("<4sHHQII")
+# Запись: порядковый номер дня (int32), сумма в копейках (int64),
+# битовая маска типа (uint8), код категории (uint32), id транзакции (int64).
+RECORD = struct.Struct("<iqBIq")
+# Запись версии 1 (без id) читается для совместимости
+RECORD_V1 = struct.Struct("<iqBI")
+RECORDS = {1: RECORD_V1, 2: RECORD, SCHEMA_VERSION: RECORD}
+STRING_LENGTH = struct.Struct("<I")
+# С версии 3 после таблицы категорий хранится следующий свободный id (int64)
+NEXT_ID = struct.Struct("<q")
+
+
+class SnapshotError(ValueError):
+    """Файл снапшота поврежден или имеет неподдерживаемую версию."""
+
+
+def write_snapshot(filepath, rows, ids=None, next_id=None):
+    """
+    Записывает строки в бинарный снапшот через временный файл и атомарную замену.
+    :param filepath: Путь к файлу снапшота.
+    :param rows: Строки (порядковый номер дня, тип, категория, копейки).
+    :param ids: id строк; по умолчанию 1, 2, 3...
+    :param next_id: Следующий свободный id; по умолчанию берется из IdIndex ids
+        и не меньше, чем наибольший id плюс один.
+    """
+    if next_id is None:
+        next_id = saved_next_id(ids) or 1
+    tmp_path = f"{filepath}.tmp"
+    categories = []
+    codes = {}
+    count = 0
+    crc = 0
+    pack = RECORD.pack
+    with open(tmp_path, mode="wb") as file:
+        file.write(b"\0" * HEADER.size)
+        for (ordinal, transaction_type, category, amount_minor), transaction_id in zip(
+            rows, sequence(1) if ids is None else ids
+        ):
+            code = codes.get(category)
+            if code is None:
+                code = codes[category] = len(categories)
+                categories.append(category)
+            record = pack(ordinal, amount_minor, TYPE_FLAGS[transaction_type], code, transaction_id)
+            crc = zlib.crc32(record, crc)
+            file.write(record)
+            count += 1
+            if transaction_id >= next_id:
+                next_id = transaction_id + 1
+        for category in categories:
+            encoded = category.encode("utf-8")
+            chunk = STRING_LENGTH.pack(len(encoded)) + encoded
+            crc = zlib.crc32(chunk, crc)
+            file.write(chunk)
+        chunk = NEXT_ID.pack(next_id)
+        crc = zlib.crc32(chunk, crc)
+        file.write(chunk)
+        file.seek(0)
+        file.write(HEADER.pack(MAGIC, SCHEMA_VERSION, RECORD.size, count, len(categories), crc))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, filepath)
+
+
+class Snapshot:
+    """
+    Снапшот журнала, отображенный в память через mmap.
+
+    Записи фиксированной ширины читаются прямо из отображенного буфера,
+    без разбора текста. Итоги можно считать, не загружая строки в трекер.
+    """
+    def __init__(self, filepath, verify=True):
+        """
+        :param filepath: Путь к файлу снапшота.
+        :param verify: Проверять контрольную сумму при открытии.
+        """
+        self.filepath = filepath
+        with open(filepath, mode="rb") as file:
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f"Файл {filepath} не является снапшотом.")
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._parse(verify)
+        except Exception:
+            self._mm.close()
+            raise
+
+    def _parse(self, verify):
+        """Проверяет заголовок и читает таблицу категорий."""
+        magic, version, record_size, count, category_count, crc = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise SnapshotError(f"Файл {self.filepath} не является снапшотом.")
+        self._record = RECORDS.get(version)
+        if self._record is None or record_size != self._record.size:
+            raise SnapshotError(f"Неподдерживаемая версия снапшота: {version}.")
+        self.version = version
+        self.count = count
+        self._records_end = HEADER.size + count * record_size
+        if verify and zlib.crc32(memoryview(self._mm)[HEADER.size:]) != crc:
+            raise SnapshotError(f"Контрольная сумма снапшота {self.filepath} не совпадает.")
+        self.categories = []
+        offset = self._records_end
+        for _ in range(category_count):
+            (length,) = STRING_LENGTH.unpack_from(self._mm, offset)
+            offset += STRING_LENGTH.size
+            self.categories.append(self._mm[offset:offset + length].decode("utf-8"))
+            offset += length
+        # Следующий свободный id; в старых версиях он не хранится
+        self.next_id = NEXT_ID.unpack_from(self._mm, offset)[0] if version >= 3 else None
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Освобождает отображение файла."""
+        self._mm.close()
+
+    def row(self, index):
+        """Возвращает строку (порядковый номер дня, тип, категория, копейки) по индексу."""
+        if not 0 <= index < self.count:
+            raise IndexError("индекс записи вне диапазона")
+        record = self._record.unpack_from(self._mm, HEADER.size + index * self._record.size)
+        ordinal, amount_minor, kind, code = record[:4]
+        return ordinal, FLAG_TYPES[kind], self.categories[code], amount_minor
+
+    def iter_batches(self, chunk_size=50_000):
+        """Выдает строки порциями, читая их прямо из отображенного буфера."""
+        for rows, _ in self.iter_id_batches(chunk_size):
+            yield rows
+
+    def iter_id_batches(self, chunk_size=50_000):
+        """Выдает пары (порция строк, id строк); для версии 1 вместо id — None."""
+        categories = self.categories
+        records = memoryview(self._mm)[HEADER.size:self._records_end]
+        step = chunk_size * self._record.size
+        for start in range(0, len(records), step):
+            unpacked = list(self._record.iter_unpack(records[start:start + step]))
+            rows = [
+                (record[0], FLAG_TYPES[record[2]], categories[record[3]], record[1])
+                for record in unpacked
+            ]
+            yield rows, [record[4] for record in unpacked] if self.version > 1 else None
+
+    def rows(self):
+        """Перебирает все строки снапшота."""
+        for batch in self.iter_batches():
+            yield from batch
+
+    def totals(self):
+        """
+        Доходы и расходы в копейках, посчитанные прямо по отображенному буферу.
+        С numpy — векторно, без него — через struct.iter_unpack.
+        """
+        np = optional_numpy()
+        if np is not None:
+            fields = [("date", "<i4"), ("amount", "<i8"), ("kind", "u1"), ("category", "<u4")]
+            if self.version > 1:
+                fields.append(("id", "<i8"))
+            dtype = np.dtype(fields)
+            records = np.frombuffer(self._mm, dtype=dtype, count=self.count, offset=HEADER.size)
+            amounts = records["amount"]
+            kinds = records["kind"]
+            return int(amounts[kinds == INCOME].sum()), int(amounts[kinds == EXPENSE].sum())
+        income = expense = 0
+        records = memoryview(self._mm)[HEADER.size:self._records_end]
+        for record in self._record.iter_unpack(records):
+            amount_minor, kind = record[1], record[2]
+            if kind == INCOME:
+                income += amount_minor
+            else:
+                expense += amount_minor
+        return income, expense
+
+
+def csv_to_snapshot(csv_path, snapshot_path):
+    """
+    Конвертирует CSV-файл в снапшот. Без журнала файл читается потоково;
+    если журнал есть, его изменения применяются в памяти, как в csv_to_archive.
+    """
+    journal = Journal(csv_path)
+    if journal.records():
+        rows, index = replay_with_index(csv_path)
+        write_snapshot(snapshot_path, rows, index)
+        return
+    write_snapshot(snapshot_path, *_split(iter_id_batches(csv_path)), journal.next_id)
+
+
+def snapshot_to_csv(snapshot_path, csv_path):
+    """Конвертирует снапшот обратно в CSV-файл."""
+    with Snapshot(snapshot_path) as snapshot:
+        atomic_write_csv(csv_path, *_split(snapshot.iter_id_batches()))
+        # Следующий свободный id переходит в заголовок нового журнала CSV
+        Journal(csv_path).reset(snapshot.next_id)
+
+
+def _split(batches):
+    """
+    Разбивает пары (порция строк, id) на потоки строк и id.
+    Недостающие и повторные id выдаются так же, как при загрузке в трекер.
+    """
+    index = IdIndex()
+    pairs = (
+        (row, index.append(transaction_id))
+        for batch, ids in batches
+        for row, transaction_id in zip(batch, ids or [None] * len(batch))
+    )
+    rows, ids = tee(pairs)
+    return (row for row, _ in rows), (transaction_id for _, transaction_id in ids)
@@ -0,0 +1,617 @@
+import os
+import sqlite3
+from array import array
+from contextlib import nullcontext
+from itertools import chain, count as sequence
+from solution.archive import Archive
+from solution.csv_loader import DEFAULT_CHUNK_SIZE, iter_row_batches, iter_id_batches
+from solution.ids import IdIndex, saved_next_id
+from solution.journal import COMPACT_THRESHOLD, Journal, atomic_write_csv
+from solution.snapshot import Snapshot, write_snapshot
+from solution.transaction import Transaction
+
+
+class StorageBackend:
+    """
+    Интерфейс хранилища транзакций.
+
+    Хранилище работает со строками (порядковый номер дня, тип, категория,
+    сумма в копейках), хранит их в порядке добавления вместе с постоянными
+    id и адресует изменения по id, поэтому они не зависят от сдвига позиций.
+    Если pushdown равен True, трекер не держит строки в памяти, а выполняет
+    запросы итогов и отчетов прямо в хранилище.
+    """
+    pushdown = False
+
+    def iter_id_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Выдает сохраненные строки порциями: пары (строки, id); None вместо id, если их нет."""
+        raise NotImplementedError
+
+    def changes(self):
+        """Операции, которые нужно применить поверх iter_id_batches (например, журнал)."""
+        return []
+
+    def next_id(self):
+        """
+        Сохраненный следующий свободный id (вызывается после changes) или None,
+        если хранилище его не хранит и id выдаются после наибольшего сохраненного.
+        """
+        return None
+
+    def append(self, row, transaction_id=None):
+        """Сохраняет новую строку в конце."""
+        raise NotImplementedError
+
+    def extend(self, rows, ids=None):
+        """Сохраняет несколько строк в конце."""
+        for row, transaction_id in zip(rows, ids or [None] * len(rows)):
+            self.append(row, transaction_id)
+
+    def replace(self, transaction_id, row):
+        """Заменяет строку с указанным id."""
+        raise NotImplementedError
+
+    def delete(self, transaction_id):
+        """Удаляет строку с указанным id."""
+        raise NotImplementedError
+
+    def delete_many(self, ids):
+        """Удаляет строки с id из множества ids."""
+        for transaction_id in ids:
+            self.delete(transaction_id)
+
+    def apply(self, operations):
+        """
+        Сохраняет несколько операций сразу.
+        :param operations: Кортежи (op, id, row) с op "add", "edit" или "delete".
+        """
+        for op, transaction_id, row in operations:
+            if op == "add":
+                self.append(row, transaction_id)
+            elif op == "edit":
+                self.replace(transaction_id, row)
+            elif op == "delete":
+                self.delete(transaction_id)
+
+    def begin(self):
+        """Начинает пакет изменений, который фиксируется commit или отменяется rollback."""
+
+    def commit(self):
+        """Фиксирует пакет изменений."""
+
+    def rollback(self):
+        """Отменяет пакет изменений."""
+
+    def save_all(self, rows, ids=None):
+        """Перезаписывает хранилище строками rows с id из ids (по умолчанию 1, 2, 3...)."""
+        raise NotImplementedError
+
+    def needs_compaction(self):
+        """Нужно ли свернуть накопленные изменения."""
+        return False
+
+    def compact(self, rows, ids=None):
+        """Сворачивает накопленные изменения; rows и ids — текущее содержимое."""
+
+    def describes(self, filepath):
+        """Проверяет, хранит ли хранилище данные в файле filepath."""
+        return False
+
+    def close(self):
+        """Освобождает ресурсы хранилища."""
+
+
+class CsvBackend(StorageBackend):
+    """
+    CSV-файл с журналом изменений: строки загружаются в память трекера,
+    а добавление, редактирование и удаление дописываются в журнал.
+    """
+    def __init__(self, filepath):
+        """:param filepath: Путь к CSV-файлу."""
+        self.filepath = filepath
+        self.journal = Journal(filepath)
+
+    def iter_id_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        return iter_id_batches(self.filepath, chunk_size)
+
+    def changes(self):
+        return self.journal.records()
+
+    def next_id(self):
+        return self.journal.next_id
+
+    def append(self, row, transaction_id=None):
+        self.journal.append("add", transaction_id, row)
+
+    def replace(self, transaction_id, row):
+        self.journal.append("edit", transaction_id, row)
+
+    def delete(self, transaction_id):
+        self.journal.append("delete", transaction_id)
+
+    def apply(self, operations):
+        """Все операции записываются одной строкой журнала с одним fsync."""
+        self.journal.append_batch(operations)
+
+    def save_all(self, rows, ids=None):
+        atomic_write_csv(self.filepath, rows, ids)
+        self.journal.reset(saved_next_id(ids))
+
+    def needs_compaction(self):
+        return self.journal.pending >= COMPACT_THRESHOLD
+
+    def compact(self, rows, ids=None):
+        self.journal.compact(rows, ids)
+
+    def describes(self, filepath):
+        return os.path.abspath(self.filepath) == os.path.abspath(filepath)
+
+
+class SnapshotBackend(StorageBackend):
+    """
+    Бинарный снапшот: строки загружаются в память трекера, а файл
+    сохраняется только целиком. Построчные изменения применяются к строкам
+    файла и перезаписывают его атомарно, поэтому каждое стоит O(n); для
+    частых правок подходит CSV с журналом или SQLite.
+    """
+    def __init__(self, filepath):
+        """:param filepath: Путь к файлу снапшота."""
+        self.filepath = filepath
+
+    def iter_id_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        with Snapshot(self.filepath) as snapshot:
+            yield from snapshot.iter_id_batches(chunk_size)
+
+    def next_id(self):
+        if not os.path.exists(self.filepath):
+            return None
+        with Snapshot(self.filepath, verify=False) as snapshot:
+            return snapshot.next_id
+
+    def _read(self):
+        """
+        Строки, id и следующий свободный id файла;
+        строкам снапшота версии 1 выдаются id 1, 2, 3...
+        """
+        rows, ids = [], []
+        if not os.path.exists(self.filepath):
+            return rows, ids, 1
+        with Snapshot(self.filepath) as snapshot:
+            for batch, batch_ids in snapshot.iter_id_batches():
+                rows.extend(batch)
+                ids.extend(range(len(ids) + 1, len(ids) + len(batch) + 1) if batch_ids is None else batch_ids)
+            next_id = max(snapshot.next_id or 1, max(ids, default=0) + 1)
+        return rows, ids, next_id
+
+    def append(self, row, transaction_id=None):
+        self.apply([("add", transaction_id, row)])
+
+    def replace(self, transaction_id, row):
+        self.apply([("edit", transaction_id, row)])
+
+    def delete(self, transaction_id):
+        self.apply([("delete", transaction_id, None)])
+
+    def delete_many(self, ids):
+        self.apply([("delete", transaction_id, None) for transaction_id in ids])
+
+    def apply(self, operations):
+        """Применяет операции к строкам файла и перезаписывает его один раз."""
+        rows, ids, next_id = self._read()
+        positions = {transaction_id: position for position, transaction_id in enumerate(ids)}
+        deleted = set()
+        for op, transaction_id, row in operations:
+            if op == "add":
+                if transaction_id is None:
+                    transaction_id = next_id
+                next_id = max(next_id, transaction_id + 1)
+                positions[transaction_id] = len(rows)
+                rows.append(row)
+                ids.append(transaction_id)
+            elif op == "edit":
+                rows[positions[transaction_id]] = row
+            elif op == "delete":
+                deleted.add(positions.pop(transaction_id))
+        if deleted:
+            kept = [position for position in range(len(rows)) if position not in deleted]
+            rows = [rows[position] for position in kept]
+            ids = [ids[position] for position in kept]
+        write_snapshot(self.filepath, rows, ids, next_id)
+
+    def save_all(self, rows, ids=None):
+        write_snapshot(self.filepath, rows, ids)
+
+    def describes(self, filepath):
+        return os.path.abspath(self.filepath) == os.path.abspath(filepath)
+
+
+class ArchiveBackend(StorageBackend):
+    """
+    Архив по месяцам (см. Archive): строки загружаются в память трекера,
+    добавление дописывается в раздел месяца строки, а правка и удаление
+    переписывают только разделы, в которых находятся изменяемые id.
+    """
+    def __init__(self, filepath, codec=None):
+        """
+        :param filepath: Путь к папке архива.
+        :param codec: Сжатие нового архива ("gzip" или "zstd").
+        """
+        self.filepath = filepath
+        self.archive = Archive(filepath, codec)
+
+    def iter_id_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        return self.archive.iter_id_batches(chunk_size)
+
+    def append(self, row, transaction_id=None):
+        self.extend([row], None if transaction_id is None else [transaction_id])
+
+    def extend(self, rows, ids=None):
+        self.archive.append(zip(rows, sequence(self.archive.next_id) if ids is None else ids))
+
+    def replace(self, transaction_id, row):
+        self.archive.replace(transaction_id, row)
+
+    def delete(self, transaction_id):
+        self.archive.delete_many((transaction_id,))
+
+    def delete_many(self, ids):
+        self.archive.delete_many(ids)
+
+    def next_id(self):
+        return self.archive.next_id
+
+    def save_all(self, rows, ids=None):
+        self.archive.write(zip(rows, sequence(1) if ids is None else ids), saved_next_id(ids))
+
+    def describes(self, filepath):
+        return os.path.abspath(self.filepath) == os.path.abspath(filepath)
+
+
+class SqliteBackend(StorageBackend):
+    """
+    Локальная база SQLite в режиме WAL.
+
+    Строки не загружаются в память: баланс, отчеты и суммы по категориям
+    считаются агрегатными запросами SQL по индексам (date) и (category, type).
+    id транзакции — первичный ключ таблицы (AUTOINCREMENT: id удаленных строк
+    не выдаются повторно), позиция строки — ее номер в порядке id.
+    Соответствие позиций и id хранится в памяти (IdIndex): оно строится одним
+    запросом при первом обращении по позиции и дальше ведется при изменениях,
+    поэтому правка и удаление по позиции не сканируют таблицу через OFFSET.
+    """
+    pushdown = True
+
+    def __init__(self, filepath):
+        """:param filepath: Путь к файлу базы данных."""
+        self.filepath = filepath
+        self._in_batch = False  # Открыт пакет: изменения не фиксируются по одному
+        self.last_id = None  # id последней строки, добавленной через append
+        self._ids = None  # Позиции и id строк (IdIndex), строится при первом обращении
+        self.connection = sqlite3.connect(filepath)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        with self._write():
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS transactions ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, date INTEGER NOT NULL, type TEXT NOT NULL, "
+                "category TEXT NOT NULL, amount INTEGER NOT NULL)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS transactions_date ON transactions (date)"
+            )
+            self.connection.execute(
+                "CREATE INDEX IF NOT EXISTS transactions_category_type ON transactions (category, type)"
+            )
+        self._count = self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def _write(self):
+        """Контекст записи: фиксирует изменение сразу, если не открыт пакет."""
+        return nullcontext() if self._in_batch else self.connection
+
+    def _positions(self):
+        """IdIndex с id строк в порядке id; при первом вызове читается из базы."""
+        if self._ids is None:
+            self._ids = IdIndex()
+            cursor = self.connection.execute("SELECT id FROM transactions ORDER BY id")
+            while True:
+                batch = cursor.fetchmany(DEFAULT_CHUNK_SIZE)
+                if not batch:
+                    break
+                ids = array("q", (record[0] for record in batch))
+                self._ids.extend(ids, len(ids))
+            # Граница выданных id хранится в sqlite_sequence и не уменьшается после удалений
+            try:
+                sequence_row = self.connection.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'transactions'"
+                ).fetchone()
+            except sqlite3.OperationalError:
+                sequence_row = None  # База старого формата, таблица создана без AUTOINCREMENT
+            if sequence_row is not None:
+                self._ids.reserve(sequence_row[0] + 1)
+        return self._ids
+
+    def _track_added(self, ids):
+        """
+        Добавляет id новых строк в конец соответствия позиций. Если id не больше
+        уже существующих, позиции сдвигаются, и соответствие строится заново.
+        """
+        if self._ids is None or not len(ids):
+            return
+        last = self._ids.id_at(len(self._ids) - 1) if len(self._ids) else 0
+        if all(previous < current for previous, current in zip(chain((last,), ids), ids)):
+            self._ids.extend(ids, len(ids))
+        else:
+            self._ids = None
+
+    def id_at(self, index):
+        """id строки по позиции."""
+        return self._positions().id_at(index)
+
+    def position_of(self, transaction_id):
+        """Позиция строки с указанным id или None."""
+        return self._positions().position(transaction_id)
+
+    def row_by_id(self, transaction_id):
+        """Строка по id (поиск по первичному ключу) или None."""
+        return self.connection.execute(
+            "SELECT date, type, category, amount FROM transactions WHERE id = ?", (transaction_id,)
+        ).fetchone()
+
+    def ids(self):
+        """Перебирает id в порядке позиций."""
+        for (transaction_id,) in self.connection.execute("SELECT id FROM transactions ORDER BY id"):
+            yield transaction_id
+
+    def _select(self, where="", params=(), order="id"):
+        """Перебирает строки запроса порциями через fetchmany."""
+        cursor = self.connection.execute(
+            f"SELECT date, type, category, amount FROM transactions {where} ORDER BY {order}", params
+        )
+        while True:
+            batch = cursor.fetchmany(DEFAULT_CHUNK_SIZE)
+            if not batch:
+                return
+            yield from batch
+
+    def iter_id_batches(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        cursor = self.connection.execute(
+            "SELECT date, type, category, amount, id FROM transactions ORDER BY id"
+        )
+        while True:
+            batch = cursor.fetchmany(chunk_size)
+            if not batch:
+                return
+            yield [record[:4] for record in batch], [record[4] for record in batch]
+
+    def append(self, row, transaction_id=None):
+        """Добавляет строку; id, если он не указан, выдает SQLite. :return: id строки."""
+        if transaction_id is None and self._ids is not None:
+            # Новый id больше всех выданных, чтобы строка оказалась последней по позиции
+            transaction_id = self._ids.next_id
+        with self._write():
+            cursor = self.connection.execute(
+                "INSERT INTO transactions (id, date, type, category, amount) VALUES (?, ?, ?, ?, ?)",
+                (transaction_id, *row),
+            )
+        self._count += 1
+        self.last_id = cursor.lastrowid
+        self._track_added([self.last_id])
+        return self.last_id
+
+    def extend(self, rows, ids=None):
+        """Массовая вставка одной транзакцией через executemany."""
+        if ids is None and self._ids is not None:
+            rows = list(rows)
+            ids = range(self._ids.next_id, self._ids.next_id + len(rows))
+        with self._write():
+            if ids is None:
+                cursor = self.connection.executemany(
+                    "INSERT INTO transactions (date, type, category, amount) VALUES (?, ?, ?, ?)", rows
+                )
+            else:
+                cursor = self.connection.executemany(
+                    "INSERT INTO transactions (id, date, type, category, amount) VALUES (?, ?, ?, ?, ?)",
+                    ((transaction_id, *row) for row, transaction_id in zip(rows, ids)),
+                )
+        self._count += cursor.rowcount
+        if ids is not None:
+            self._track_added(array("q", ids))
+
+    def replace(self, transaction_id, row):
+        with self._write():
+            self.connection.execute(
+                "UPDATE transactions SET date = ?, type = ?, category = ?, amount = ? WHERE id = ?",
+                (*row, transaction_id),
+            )
+
+    def delete(self, transaction_id):
+        self.delete_many((transaction_id,))
+
+    def delete_many(self, ids):
+        """Одно пакетное удаление по первичному ключу."""
+        with self._write():
+            cursor = self.connection.executemany(
+                "DELETE FROM transactions WHERE id = ?", ((transaction_id,) for transaction_id in ids)
+            )
+        self._count -= cursor.rowcount
+        if self._ids is not None:
+            for transaction_id in ids:
+                if transaction_id in self._ids:
+                    self._ids.remove(transaction_id)
+
+    def begin(self):
+        self._in_batch = True
+
+    def commit(self):
+        self.connection.commit()
+        self._in_batch = False
+
+    def rollback(self):
+        self.connection.rollback()
+        self._in_batch = False
+        self._ids = None
+        self._count = self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def save_all(self, rows, ids=None):
+        with self._write():
+            self.connection.execute("DELETE FROM transactions")
+            self.connection.executemany(
+                "INSERT INTO transactions (id, date, type, category, amount) VALUES (?, ?, ?, ?, ?)",
+                ((transaction_id, *row) for row, transaction_id in zip(rows, sequence(1) if ids is None else ids)),
+            )
+        self._count = self.connection.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+        self._ids = None
+
+    def import_csv(self, csv_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Потоково импортирует CSV-файл порциями по chunk_size строк."""
+        for batch in iter_row_batches(csv_path, chunk_size):
+            self.extend(batch)
+
+    def describes(self, filepath):
+        return os.path.abspath(self.filepath) == os.path.abspath(filepath)
+
+    def close(self):
+        self.connection.close()
+
+    # Запросы, которые выполняются в базе вместо памяти трекера.
+
+    def count(self):
+        return self._count
+
+    def row(self, index):
+        if index < 0:
+            index += self._count
+        return self.row_by_id(self.id_at(index))
+
+    def rows(self):
+        return self._select()
+
+    def balance(self):
+        """Баланс в копейках одним агрегатным запросом."""
+        totals = dict(self.connection.execute(
+            "SELECT type, SUM(amount) FROM transactions GROUP BY type"
+        ).fetchall())
+        return totals.get("income", 0) - totals.get("expense", 0)
+
+    def daily_net(self):
+        """Чистое изменение баланса по дням в копейках: {порядковый номер дня: сумма}."""
+        return dict(self.connection.execute(
+            "SELECT date, SUM(CASE WHEN type = 'income' THEN amount ELSE -amount END) "
+            "FROM transactions GROUP BY date"
+        ).fetchall())
+
+    def category_daily_expense(self):
+        """Расходы по категориям и дням в копейках: пары ((категория, порядковый номер дня), сумма)."""
+        return [
+            ((category, day), total)
+            for category, day, total in self.connection.execute(
+                "SELECT category, date, SUM(amount) FROM transactions WHERE type = 'expense' "
+                "GROUP BY category, date"
+            )
+        ]
+
+    def category_rows(self, category):
+        return self._select("WHERE category = ?", (category,))
+
+    def rows_between(self, start, end):
+        return self._select("WHERE date >= ? AND date < ?", (start, end), order="date, id")
+
+    def category_totals(self, transaction_type):
+        """Суммы по категориям в копейках."""
+        return dict(self.connection.execute(
+            "SELECT category, SUM(amount) FROM transactions WHERE type = ? GROUP BY category",
+            (transaction_type,),
+        ).fetchall())
+
+    def totals_between(self, start, end):
+        """Суммы по типам в копейках за полуинтервал [start, end) порядковых номеров дней."""
+        return dict(self.connection.execute(
+            "SELECT type, SUM(amount) FROM transactions WHERE date >= ? AND date < ? GROUP BY type",
+            (start, end),
+        ).fetchall())
+
+
+class BackendRows:
+    """
+    Последовательность транзакций поверх хранилища с pushdown.
+    Ведет себя как ColumnarStore: строки читаются из хранилища по запросу.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __len__(self):
+        return self.backend.count()
+
+    def __iter__(self):
+        for row in self.backend.rows():
+            yield Transaction.from_row(row)
+
+    def __getitem__(self, index):
+        return Transaction.from_row(self.backend.row(index))
+
+    def __setitem__(self, index, transaction):
+        self.set_row(index, transaction.to_row())
+
+    def row(self, index):
+        return self.backend.row(index)
+
+    def rows(self):
+        return self.backend.rows()
+
+    def append(self, transaction):
+        self.backend.append(transaction.to_row())
+
+    def append_row(self, row):
+        self.backend.append(row)
+
+    def extend_rows(self, rows):
+        self.backend.extend(rows)
+
+    def set_row(self, index, row):
+        self.backend.replace(self.backend.id_at(index), row)
+
+    def pop(self, index=-1):
+        if index < 0:
+            index += len(self)
+        transaction = self[index]
+        self.backend.delete(self.backend.id_at(index))
+        return transaction
+
+
+class BackendIds:
+    """
+    id транзакций в хранилище с pushdown, с тем же интерфейсом, что IdIndex.
+    id выдает и хранит само хранилище, поэтому методы изменения только
+    сообщают id уже выполненных изменений.
+    """
+    def __init__(self, backend):
+        self.backend = backend
+
+    def __len__(self):
+        return self.backend.count()
+
+    def __iter__(self):
+        return self.backend.ids()
+
+    def __contains__(self, transaction_id):
+        return self.backend.position_of(transaction_id) is not None
+
+    def append(self, transaction_id=None):
+        """id строки, только что добавленной в хранилище."""
+        return self.backend.last_id
+
+    def extend(self, ids, count):
+        pass
+
+    def position(self, transaction_id):
+        return self.backend.position_of(transaction_id)
+
+    def id_at(self, position):
+        return self.backend.id_at(position)
+
+    def remove_at(self, position):
+        """id строки, которая удаляется из хранилища (вызывается до удаления)."""
+        return self.backend.id_at(position)
+
+    def remove_many(self, ids):
+        pass
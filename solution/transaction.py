@@ -1,31 +1,160 @@
-from datetime import datetime
+import sys
+from datetime import date as Date, datetime
+from functools import lru_cache
+from solution.money import format_minor, from_minor, to_minor
+
+
+# Один объект date на каждый день: транзакции одного дня делят его
+_date_from_ordinal = lru_cache(maxsize=65536)(Date.fromordinal)
 
 
 class Transaction:
     """Класс для представления транзакции."""
     def __init__(self, amount, category, date, transaction_type):
-        self.amount = amount  # Сумма транзакции
+        self.amount = amount  # Сумма транзакции (хранится в копейках, см. amount_minor)
         self.category = category  # Категория транзакции (например, "Еда", "Транспорт")
         self.date = datetime.strptime(date, "%Y-%m-%d")  # Дата в формате ГГГГ-ММ-ДД
         self.type = transaction_type  # Тип: "income" (доход) или "expense" (расход)
 
+    @property
+    def amount(self):
+        """Сумма в рублях (Decimal, без ошибок округления float)."""
+        return from_minor(self.amount_minor)
+
+    @amount.setter
+    def amount(self, value):
+        self.amount_minor = to_minor(value)  # Сумма в копейках
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Создает транзакцию из строки колоночного хранилища без вызова strptime.
+        :param row: Кортеж (порядковый номер дня, тип, категория, сумма в копейках).
+        """
+        ordinal, transaction_type, category, amount_minor = row
+        transaction = cls.__new__(cls)
+        transaction.amount_minor = amount_minor
+        transaction.category = category
+        transaction.date = datetime.fromordinal(ordinal)
+        transaction.type = transaction_type
+        return transaction
+
+    def to_row(self):
+        """Возвращает кортеж (порядковый номер дня, тип, категория, сумма в копейках)."""
+        return (self.date.toordinal(), self.type, self.category, self.amount_minor)
+
     def __str__(self):
         """строковое представление транзакции."""
-        return f"{self.date.strftime('%Y-%m-%d')} | {self.type.upper()} | {self.category}: {self.amount} руб."
+        return f"{self.date.strftime('%Y-%m-%d')} | {self.type.upper()} | {self.category}: {format_minor(self.amount_minor)} руб."
 
     def __eq__(self, other):
-        """Сравнивает две транзакции по содержимому."""
-        if not isinstance(other, Transaction):
+        """Сравнивает две транзакции по содержимому (в том числе с FrozenTransaction)."""
+        if not isinstance(other, (Transaction, FrozenTransaction)):
             return False
-        return (
-            self.amount == other.amount
-            and self.category == other.category
-            and self.date == other.date
-            and self.type == other.type
-        )
-    
+        return self.to_row() == other.to_row()
+
     def __hash__(self):
         """
         Возвращает хэш транзакции для использования в множествах и словарях.
+        Совпадает с хэшем FrozenTransaction с тем же содержимым.
         """
-        return hash((self.amount, self.category, self.date, self.type))
+        return hash(self.to_row())
+
+
+class FrozenTransaction:
+    """
+    Компактная неизменяемая транзакция.
+
+    В отличие от Transaction не имеет словаря атрибутов (__slots__), хранит
+    date вместо datetime (объект date общий для всех транзакций дня),
+    тип и категорию как одну общую пару интернированных строк и вычисляет
+    хэш один раз.
+    """
+    __slots__ = ("date", "_label", "amount_minor", "_hash")
+
+    def __init__(self, amount, category, date, transaction_type):
+        _set = object.__setattr__
+        _set(self, "amount_minor", to_minor(amount))  # Сумма в копейках
+        _set(self, "_label", _label(transaction_type, category))  # (тип, категория)
+        _set(self, "date", datetime.strptime(date, "%Y-%m-%d").date())  # Дата без времени
+        _set(self, "_hash", 0)  # 0 — хэш еще не вычислен
+
+    @classmethod
+    def from_row(cls, row):
+        """
+        Создает транзакцию из строки (порядковый номер дня, тип, категория, сумма в копейках).
+        """
+        ordinal, transaction_type, category, amount_minor = row
+        transaction = cls.__new__(cls)
+        _set = object.__setattr__
+        _set(transaction, "amount_minor", amount_minor)
+        _set(transaction, "_label", _label(transaction_type, category))
+        _set(transaction, "date", _date_from_ordinal(ordinal))
+        _set(transaction, "_hash", 0)
+        return transaction
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenTransaction нельзя изменить")
+
+    def __delattr__(self, name):
+        raise AttributeError("FrozenTransaction нельзя изменить")
+
+    def __reduce__(self):
+        """Сериализация для pickle через строку."""
+        return (FrozenTransaction.from_row, (self.to_row(),))
+
+    @property
+    def type(self):
+        """Тип: "income" (доход) или "expense" (расход)."""
+        return self._label[0]
+
+    @property
+    def category(self):
+        """Категория транзакции."""
+        return self._label[1]
+
+    @property
+    def amount(self):
+        """Сумма в рублях (Decimal)."""
+        return from_minor(self.amount_minor)
+
+    def to_row(self):
+        """Возвращает кортеж (порядковый номер дня, тип, категория, сумма в копейках)."""
+        transaction_type, category = self._label
+        return (self.date.toordinal(), transaction_type, category, self.amount_minor)
+
+    def __str__(self):
+        """строковое представление транзакции."""
+        return f"{self.date.isoformat()} | {self.type.upper()} | {self.category}: {format_minor(self.amount_minor)} руб."
+
+    def __eq__(self, other):
+        """Сравнивает транзакции по содержимому; пары (тип, категория) общие, поэтому сравниваются по ссылке."""
+        if isinstance(other, FrozenTransaction):
+            return (
+                self.amount_minor == other.amount_minor
+                and self.date == other.date
+                and self._label is other._label
+            )
+        if isinstance(other, Transaction):
+            return self.to_row() == other.to_row()
+        return NotImplemented
+
+    def __hash__(self):
+        """Хэш вычисляется при первом обращении и запоминается."""
+        value = self._hash
+        if not value:
+            value = hash(self.to_row()) or 1
+            object.__setattr__(self, "_hash", value)
+        return value
+
+
+_labels = {}  # (тип, категория) -> общий кортеж интернированных строк
+
+
+def _label(transaction_type, category):
+    """Возвращает общий кортеж (тип, категория) для всех транзакций с этой парой."""
+    key = (transaction_type, category)
+    label = _labels.get(key)
+    if label is None:
+        label = _labels[key] = (sys.intern(transaction_type), sys.intern(category))
+    return label
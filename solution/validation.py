@@ -1,15 +1,16 @@
 from datetime import datetime
 from prompt_toolkit.validation import Validator, ValidationError
 from prompt_toolkit.completion import WordCompleter
+from solution.money import parse_amount
 
 
 class AmountValidator(Validator):
     '''Валидатор для чисел'''
     def validate(self, document):
         try:
-            float(document.text)
+            parse_amount(document.text)
         except ValueError:
-            raise ValidationError(message="Сумма должна быть числом (например: 100 или 50.5)")
+            raise ValidationError(message="Сумма должна быть числом не более чем с двумя знаками после запятой (например: 100 или 50.5)")
 
 
 class DateValidator(Validator):
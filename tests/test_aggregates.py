@@ -0,0 +1,84 @@
+import random
+from decimal import Decimal
+import pytest
+from solution.aggregates import RunningAggregates
+from solution.dates import to_ordinal
+from solution.finance_tracker import FinanceTracker
+from solution.transaction import Transaction
+
+
+CATEGORIES = ["Еда", "Транспорт", "Зарплата", "Жилье"]
+
+
+def random_transaction(rng):
+    """Создает случайную транзакцию."""
+    amount = rng.randint(1, 100000) / 100
+    date = f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return Transaction(amount, rng.choice(CATEGORIES), date, rng.choice(["income", "expense"]))
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_incremental_totals_match_recomputation(tmpdir, columnar):
+    """Проверяет, что накопительные итоги совпадают с полным пересчетом после каждой операции."""
+    tmpdir.chdir()
+    rng = random.Random(42)
+    tracker = FinanceTracker(columnar=columnar)
+    for _ in range(300):
+        action = rng.random()
+        size = len(tracker.transactions)
+        if action < 0.6 or size == 0:
+            tracker.add_transaction(random_transaction(rng))
+        elif action < 0.8:
+            tracker.edit_transaction(rng.randrange(size), random_transaction(rng))
+        else:
+            tracker.delete_transaction(rng.randrange(size))
+        assert tracker.aggregates == RunningAggregates.from_rows(tracker._rows())
+
+
+def test_totals_are_removed_when_empty(tmpdir):
+    """Проверяет, что после удаления последней транзакции итоги категории исчезают."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.delete_transaction(0)
+    assert tracker.aggregates.by_category == {}
+    assert tracker.aggregates.by_month == {}
+    assert tracker.get_balance() == 0
+
+
+def test_summaries():
+    """Проверяет суммы по категориям и по месяцам."""
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    tracker.add_transaction(Transaction(1500, "Еда", "2023-10-02", "expense"))
+    tracker.add_transaction(Transaction(0.1, "Еда", "2023-11-02", "expense"))
+    tracker.add_transaction(Transaction(0.2, "Еда", "2023-11-03", "expense"))
+    assert tracker.get_category_totals() == {"Еда": Decimal("1500.30")}
+    assert tracker.get_monthly_totals(10, 2023) == {"income": 50000, "expense": 1500}
+
+
+def test_consistency_check_detects_drift():
+    """Проверяет, что режим сверки обнаруживает изменения в обход трекера."""
+    tracker = FinanceTracker(check_consistency=True)
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    assert tracker.get_balance() == -100
+    tracker.transactions.append(Transaction(5, "Еда", "2023-10-01", "expense"))
+    with pytest.raises(RuntimeError):
+        tracker.get_balance()
+
+
+def test_unknown_type_is_rejected(tmpdir):
+    """Строка с неизвестным типом не считается расходом и не попадает ни в трекер, ни в журнал."""
+    tmpdir.chdir()
+    with pytest.raises(ValueError, match="Income"):
+        RunningAggregates.from_rows([(to_ordinal("2023-10-01"), "Income", "Зарплата", 500)])
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.export_to_csv("data.csv")
+    with pytest.raises(ValueError):
+        tracker.add_transaction(Transaction(5, "Зарплата", "2023-10-01", "Income"))
+    assert tracker.backend.journal.pending == 0
+    with pytest.raises(ValueError):
+        tracker.import_rows([[(to_ordinal("2023-10-02"), "expense", "Еда", 1), (to_ordinal("2023-10-02"), "Income", "Еда", 1)]])
+    assert len(tracker.transactions) == 1 and tracker.get_balance() == -100
+    tracker.verify_aggregates()
@@ -0,0 +1,157 @@
+import json
+import os
+import pytest
+from solution.archive import Archive, archive_to_csv, csv_to_archive
+from solution.cli import main
+from solution.dates import month_bounds, to_ordinal
+from solution.finance_tracker import FinanceTracker
+from solution.money import from_minor
+from solution.storage import ArchiveBackend
+from solution.transaction import Transaction
+
+
+LEGACY_CSV = (
+    "Date,Type,Category,Amount\n"
+    "2023-09-30,income,Зарплата,50000\n"
+    "2023-10-01,expense,Еда,1500.30\n"
+    "2023-10-15,expense,Такси,300\n"
+    "2023-11-02,expense,Еда,200\n"
+    "2024-01-10,income,Подарок,1000\n"
+)
+
+
+def write_legacy(path):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(LEGACY_CSV)
+
+
+def test_import_legacy_csv(tmpdir):
+    """CSV старого формата раскладывается по месяцам; манифест хранит количество строк и суммы."""
+    tmpdir.chdir()
+    os.makedirs("files")
+    csv_path = os.path.join("files", "data.csv")
+    write_legacy(csv_path)
+    archive = csv_to_archive(csv_path, os.path.join("files", "data.archive"), codec="gzip")
+    assert sorted(os.listdir(archive.directory)) == [
+        "2023-09.csv.gz", "2023-10.csv.gz", "2023-11.csv.gz", "2024-01.csv.gz", "manifest.json",
+    ]
+    with open(os.path.join(archive.directory, "manifest.json"), encoding="utf-8") as file:
+        october = json.load(file)["partitions"][1]
+    assert october["rows"] == 2 and october["totals"] == {"expense": 180030}
+    assert october["min_id"] == 2 and october["max_id"] == 3
+
+    from_csv = FinanceTracker()
+    from_csv.load_from_csv("data.csv")
+    from_archive = FinanceTracker(columnar=True)
+    from_archive.load_archive("data.archive")
+    assert list(from_archive.ids) == list(from_csv.ids) == [1, 2, 3, 4, 5]
+    assert list(from_archive.transactions.rows()) == list(from_csv._rows())
+
+    archive_to_csv(archive.directory, os.path.join("files", "back.csv"))
+    back = FinanceTracker()
+    back.load_from_csv("back.csv")
+    assert list(back._rows()) == list(from_csv._rows())
+
+
+def test_queries_read_only_needed_partitions(tmpdir, monkeypatch):
+    """Баланс считается по манифесту, отчет за месяц читает один раздел."""
+    csv_path = str(tmpdir.join("data.csv"))
+    write_legacy(csv_path)
+    archive = csv_to_archive(csv_path, str(tmpdir.join("data.archive")))
+    read = []
+    original = Archive.read
+
+    def recording_read(self, partition):
+        read.append(partition.key)
+        return original(self, partition)
+    monkeypatch.setattr(Archive, "read", recording_read)
+
+    assert archive.balance() == 5000000 - 180030 - 20000 + 100000
+    assert archive.category_totals("expense") == {"Еда": 170030, "Такси": 30000}
+    assert archive.totals_between(*month_bounds(10, 2023)) == {"expense": 180030}
+    assert read == []
+    assert archive.rows_between(*month_bounds(10, 2023)) == [
+        (to_ordinal("2023-10-01"), "expense", "Еда", 150030),
+        (to_ordinal("2023-10-15"), "expense", "Такси", 30000),
+    ]
+    assert read == [(2023, 10)]
+    read.clear()
+    assert archive.balance(to_ordinal("2023-10-10")) == 5000000 - 150030
+    assert archive.totals_between(to_ordinal("2023-10-10"), to_ordinal("2023-12-01")) == {"expense": 50000}
+    assert read == [(2023, 10), (2023, 10)]
+
+
+def test_changes_rewrite_only_their_partition(tmpdir):
+    """Добавление, правка с переносом в другой месяц и удаление сохраняются в разделах."""
+    tmpdir.chdir()
+    os.makedirs("files")
+    write_legacy(os.path.join("files", "data.csv"))
+    csv_to_archive(os.path.join("files", "data.csv"), os.path.join("files", "data.archive"))
+    tracker = FinanceTracker()
+    tracker.load_archive("data.archive")
+    november = os.path.join("files", "data.archive", "2023-11.csv.gz")
+    before = os.path.getmtime(november)
+
+    assert tracker.add_transaction(Transaction(100, "Кофе", "2023-10-20", "expense")) == 6
+    tracker.edit_transaction_by_id(3, Transaction(300, "Такси", "2023-12-01", "expense"), "data.archive")
+    tracker.delete_transaction_by_id(1, "data.archive")
+    assert os.path.getmtime(november) == before
+
+    reloaded = FinanceTracker()
+    reloaded.load_archive("data.archive")
+    assert list(reloaded.ids) == [2, 3, 4, 5, 6]
+    assert list(reloaded._rows()) == list(tracker._rows())
+    archive = Archive(os.path.join("files", "data.archive"))
+    assert sorted(archive.partitions) == [(2023, 10), (2023, 11), (2023, 12), (2024, 1)]
+    assert from_minor(archive.balance()) == tracker.get_balance()
+
+    count = reloaded.import_rows([[(to_ordinal("2024-01-11"), "expense", "Еда", 500)]])
+    assert count == 1 and len(Archive(archive.directory)) == 6
+
+
+def test_append_interrupted_before_manifest(tmpdir, monkeypatch):
+    """Блок, дописанный в раздел до сбоя при записи манифеста, отбрасывается при открытии."""
+    csv_path = str(tmpdir.join("data.csv"))
+    write_legacy(csv_path)
+    archive = csv_to_archive(csv_path, str(tmpdir.join("data.archive")), codec="gzip")
+    october = month_bounds(10, 2023)
+    before = archive.rows_between(*october)
+
+    def crash():
+        raise OSError("сбой")
+    monkeypatch.setattr(archive, "write_manifest", crash)
+    with pytest.raises(OSError):
+        archive.append([((to_ordinal("2023-10-20"), "expense", "Кофе", 100), 6)])
+
+    reopened = Archive(archive.directory)
+    assert len(reopened) == 5 and reopened.next_id == 6
+    assert reopened.rows_between(*october) == before
+    reopened.append([((to_ordinal("2023-10-21"), "expense", "Чай", 50), 6)])
+    assert [row[2] for row in Archive(archive.directory).rows_between(*october)] == ["Еда", "Такси", "Чай"]
+
+
+def test_cli_uses_archive(tmpdir, capsys):
+    """Команды balance, report и export работают с архивом."""
+    csv_path = str(tmpdir.join("data.csv"))
+    archive_path = str(tmpdir.join("data.archive"))
+    write_legacy(csv_path)
+    assert main(["export", "--data", csv_path, "--out", archive_path]) == 0
+    assert isinstance(ArchiveBackend(archive_path).archive, Archive)
+    capsys.readouterr()
+    assert main(["balance", "--data", archive_path, "--at", "2023-10-01"]) == 0
+    assert capsys.readouterr().out == "48499.70\n"
+    assert main(["report", "--month", "11", "--year", "2023", "--data", archive_path]) == 0
+    assert capsys.readouterr().out.splitlines() == ["Date,Type,Category,Amount", "2023-11-02,expense,Еда,200"]
+    assert main(["balance", "--data", str(tmpdir.join("missing.archive"))]) == 1
+
+
+def test_zstd_codec(tmpdir):
+    """При установленном zstandard разделы сжимаются zstd."""
+    pytest.importorskip("zstandard")
+    csv_path = str(tmpdir.join("data.csv"))
+    write_legacy(csv_path)
+    archive = csv_to_archive(csv_path, str(tmpdir.join("data.archive")), codec="zstd")
+    archive.append([((to_ordinal("2023-10-20"), "expense", "Кофе", 100), 6)])
+    reopened = Archive(archive.directory)
+    assert reopened.codec == "zstd"
+    assert len(reopened.rows_between(*month_bounds(10, 2023))) == 3
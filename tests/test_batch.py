@@ -0,0 +1,98 @@
+import pytest
+from solution.aggregates import RunningAggregates
+from solution.finance_tracker import FinanceTracker
+from solution.storage import SqliteBackend
+from solution.transaction import Transaction
+
+
+def fill(tracker, count=10):
+    """Добавляет count расходов с суммами 1..count."""
+    for i in range(count):
+        tracker.add_transaction(Transaction(i + 1, "Еда", f"2023-10-{i + 1:02d}", "expense"))
+
+
+def amounts(tracker):
+    return [int(t.amount) for t in tracker.transactions]
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_batch_deletes_by_original_indexes_and_saves_once(tmpdir, monkeypatch, columnar):
+    """Удаления в пакете адресуются исходными индексами, а файл сохраняется один раз."""
+    tmpdir.chdir()
+    tracker = FinanceTracker(columnar=columnar)
+    fill(tracker)
+    tracker.export_to_csv("data.csv")
+    saves = []
+    original = type(tracker.backend).save_all
+    monkeypatch.setattr(type(tracker.backend), "save_all", lambda self, *args: saves.append(1) or original(self, *args))
+
+    with tracker.batch():
+        for index in (1, 3, 5, 7):
+            tracker.delete_transaction(index)
+        tracker.edit_transaction(0, Transaction(100, "Транспорт", "2023-10-01", "expense"))
+        tracker.add_transaction(Transaction(50, "Еда", "2023-10-20", "expense"))
+    assert saves == [1]
+    assert amounts(tracker) == [100, 3, 5, 7, 9, 10, 50]
+    assert tracker.aggregates == RunningAggregates.from_rows(tracker._rows())
+    assert tracker.get_report_between("2023-10-01", "2023-10-05") == [tracker.transactions[i] for i in (0, 1, 2)]
+
+    reloaded = FinanceTracker()
+    reloaded.load_from_csv("data.csv")
+    assert amounts(reloaded) == amounts(tracker)
+
+
+def test_batch_edits_go_to_journal_as_one_record(tmpdir):
+    """Без удалений пакет дописывается в журнал одной строкой."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    fill(tracker, 3)
+    tracker.export_to_csv("data.csv")
+    with tracker.batch():
+        tracker.edit_transaction(0, Transaction(7, "Еда", "2023-10-01", "expense"))
+        tracker.add_transaction(Transaction(8, "Еда", "2023-10-04", "expense"))
+    with open(tracker.backend.journal.path, encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+    reloaded = FinanceTracker()
+    reloaded.load_from_csv("data.csv")
+    assert amounts(reloaded) == [7, 2, 3, 8]
+
+
+def test_batch_rolls_back_on_exception(tmpdir):
+    """Исключение внутри пакета отменяет все его изменения и ничего не сохраняет."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    fill(tracker, 3)
+    tracker.export_to_csv("data.csv")
+    with pytest.raises(RuntimeError):
+        with tracker.batch():
+            tracker.edit_transaction(1, Transaction(20, "Связь", "2023-11-01", "expense"))
+            tracker.add_transaction(Transaction(40, "Еда", "2023-10-04", "expense"))
+            tracker.delete_transaction(0)
+            raise RuntimeError("ошибка")
+    assert amounts(tracker) == [1, 2, 3]
+    assert tracker.aggregates == RunningAggregates.from_rows(tracker._rows())
+    assert tracker.get_transactions_by_category("Связь") == []
+    reloaded = FinanceTracker()
+    reloaded.load_from_csv("data.csv")
+    assert amounts(reloaded) == [1, 2, 3]
+
+
+def test_sqlite_batch_commit_and_rollback(tmpdir):
+    """Пакет в SQLite — одна транзакция базы."""
+    tmpdir.chdir()
+    tracker = FinanceTracker(backend=SqliteBackend("data.db"))
+    fill(tracker, 5)
+    with pytest.raises(RuntimeError):
+        with tracker.batch():
+            tracker.delete_transaction(0)
+            tracker.add_transaction(Transaction(40, "Еда", "2023-10-04", "expense"))
+            raise RuntimeError("ошибка")
+    assert amounts(tracker) == [1, 2, 3, 4, 5]
+    assert tracker.get_balance_at("2023-10-31") == -15
+
+    with tracker.batch():
+        tracker.delete_transaction(0)
+        tracker.delete_transaction(2)
+        tracker.add_transaction(Transaction(40, "Еда", "2023-10-04", "expense"))
+    assert amounts(FinanceTracker(backend=SqliteBackend("data.db"))) == [2, 4, 5, 40]
+    assert tracker.get_balance_at("2023-10-31") == -51
@@ -0,0 +1,113 @@
+import os
+import random
+from solution.budgets import Budget, BudgetEngine
+from solution.finance_tracker import FinanceTracker
+from solution.storage import SqliteBackend
+from solution.transaction import Transaction
+
+
+def expense(amount, category="Еда", date="2023-10-05"):
+    return Transaction(amount, category, date, "expense")
+
+
+def test_alerts_on_thresholds(tmpdir):
+    """Предупреждение выдается один раз при достижении каждого порога."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.set_budget("Еда", 1000)
+    tracker.add_transaction(expense(700))
+    tracker.add_transaction(Transaction(5000, "Еда", "2023-10-05", "income"))
+    assert tracker.pop_alerts() == []
+    first = tracker.add_transaction(expense(150))
+    alerts = tracker.pop_alerts()
+    assert [(a.year, a.month, a.threshold, a.spent_minor) for a in alerts] == [(2023, 10, 80, 85000)]
+    tracker.add_transaction(expense(10))
+    assert tracker.pop_alerts() == []
+    tracker.add_transaction(expense(500, date="2023-11-01"))
+    assert tracker.pop_alerts() == []
+    tracker.add_transaction(expense(200))
+    assert [a.threshold for a in tracker.pop_alerts()] == [100]
+
+    # Правка, уменьшающая расходы, сбрасывает уровень; повторный рост снова предупреждает
+    tracker.edit_transaction_by_id(first, expense(1))
+    assert tracker.pop_alerts() == []
+    tracker.edit_transaction_by_id(first, expense(150))
+    assert [a.threshold for a in tracker.pop_alerts()] == [100]
+    assert tracker.get_budget_report(10, 2023)[0][1:] == (1060, 1000)
+
+
+def test_month_budget_overrides_default(tmpdir):
+    """Бюджет на конкретный месяц заменяет бюджет на каждый месяц."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.set_budget("Еда", 1000)
+    tracker.set_budget("Еда", 5000, month="2023-12")
+    tracker.add_transaction(expense(900, date="2023-12-10"))
+    assert tracker.pop_alerts() == []
+    tracker.add_transaction(expense(900, date="2023-11-10"))
+    assert [a.budget.limit_minor for a in tracker.pop_alerts()] == [100000]
+    # Перенос расхода в другую категорию проверяет ее бюджет
+    tracker.set_budget("Такси", 100)
+    tracker.edit_transaction(0, expense(90, category="Такси"))
+    assert [a.budget.category for a in tracker.pop_alerts()] == ["Такси"]
+    assert tracker.remove_budget("Еда", month="2023-12")
+    assert not tracker.remove_budget("Еда", month="2023-12")
+
+
+def test_budgets_persist_and_load_is_silent(tmpdir):
+    """Бюджеты сохраняются рядом с файлами данных; загрузка журнала не выдает предупреждений."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.set_budget("Еда", 100, thresholds=(50, 100))
+    for _ in range(3):
+        tracker.add_transaction(expense(40))
+    tracker.pop_alerts()
+    tracker.export_to_csv("data.csv")
+    assert os.path.exists(os.path.join("files", "budgets.json"))
+
+    loaded = FinanceTracker()
+    loaded.load_from_csv("data.csv")
+    loaded.load_budgets()
+    assert list(loaded.budgets) == [Budget("Еда", 10000, thresholds=(50, 100))]
+    assert loaded.pop_alerts() == []
+    assert loaded.get_budget_report(10, 2023) == [("Еда", 120, 100)]
+    loaded.delete_transaction(0)
+    loaded.add_transaction(expense(30))
+    assert [a.threshold for a in loaded.pop_alerts()] == [100]
+
+
+def test_sqlite_backend_counters(tmpdir):
+    """В режиме SQLite расходы по категориям и месяцам берутся запросом к базе."""
+    path = str(tmpdir.join("data.db"))
+    tracker = FinanceTracker(backend=SqliteBackend(path))
+    tracker.add_transaction(expense(300))
+    tracker.add_transaction(expense(200, date="2023-10-20"))
+    tracker.backend.close()
+
+    reopened = FinanceTracker(backend=SqliteBackend(path))
+    reopened.load_budgets(str(tmpdir.join("budgets.json")))
+    reopened.set_budget("Еда", 600)
+    reopened.add_transaction(expense(100))
+    assert [a.threshold for a in reopened.pop_alerts()] == [100]
+
+
+def test_counters_match_full_recount():
+    """Приращения расходов совпадают с полным пересчетом после случайных изменений."""
+    rng = random.Random(3)
+    engine = BudgetEngine()
+    rows = []
+    for _ in range(500):
+        row = (738800 + rng.randrange(90), rng.choice(["income", "expense"]), rng.choice("АБВ"), rng.randrange(1, 500))
+        if rows and rng.random() < 0.3:
+            index = rng.randrange(len(rows))
+            if rng.random() < 0.5:
+                engine.on_edit(index, rows[index], row)
+                rows[index] = row
+            else:
+                engine.on_delete(index, rows.pop(index))
+        else:
+            engine.on_add(len(rows), row)
+            rows.append(row)
+    expected = BudgetEngine()
+    expected.on_reset(rows)
+    assert engine.spent == expected.spent
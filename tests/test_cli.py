@@ -0,0 +1,59 @@
+import io
+import pytest
+from solution.cli import main
+
+
+STATEMENT = (
+    "Date,Type,Category,Amount\n"
+    "2023-10-01,income,Зарплата,50000\n"
+    "2023-10-02,expense,Еда,1500.30\n"
+    "2023-11-02,expense,Транспорт,300\n"
+)
+
+
+@pytest.mark.parametrize("data", ["data.csv", "data.db", "data.snap"])
+def test_import_and_report(tmpdir, capsys, data):
+    """Импорт из файла и отчеты работают для всех форматов хранилища."""
+    tmpdir.chdir()
+    tmpdir.join("statement.csv").write_text(STATEMENT, encoding="utf-8")
+    assert main(["import", "statement.csv", "--data", data]) == 0
+    capsys.readouterr()
+    assert main(["balance", "--data", data]) == 0
+    assert capsys.readouterr().out == "48199.70\n"
+    assert main(["report", "--month", "10", "--year", "2023", "--data", data]) == 0
+    assert capsys.readouterr().out.splitlines()[1:] == STATEMENT.splitlines()[1:3]
+    assert main(["by-category", "--data", data]) == 0
+    assert capsys.readouterr().out == "Category,Amount\nЕда,1500.30\nТранспорт,300\n"
+
+
+def test_stdin_to_stdout(tmpdir, capsys, monkeypatch):
+    """Данные читаются из stdin и пишутся в stdout."""
+    tmpdir.chdir()
+    monkeypatch.setattr("sys.stdin", io.StringIO(STATEMENT))
+    assert main(["export", "--data", "-", "--out", "-"]) == 0
+    assert capsys.readouterr().out == (
+        "Date,Type,Category,Amount,Id\n"
+        "2023-10-01,income,Зарплата,50000,1\n"
+        "2023-10-02,expense,Еда,1500.30,2\n"
+        "2023-11-02,expense,Транспорт,300,3\n"
+    )
+
+
+def test_exit_codes(tmpdir, capsys):
+    """Ошибки выполнения возвращают 1, ошибки в аргументах — 2."""
+    tmpdir.chdir()
+    assert main(["balance", "--data", "missing.csv"]) == 1
+    assert "не найден" in capsys.readouterr().err
+    with pytest.raises(SystemExit) as error:
+        main(["report", "--data", "missing.csv"])
+    assert error.value.code == 2
+
+
+def test_balance_over_time(tmpdir, capsys):
+    """Баланс на дату и ряд по месяцам."""
+    tmpdir.chdir()
+    tmpdir.join("data.csv").write_text(STATEMENT, encoding="utf-8")
+    assert main(["balance", "--at", "2023-10-31", "--data", "data.csv"]) == 0
+    assert capsys.readouterr().out == "48499.70\n"
+    assert main(["series", "--from", "2023-10-01", "--to", "2023-11-30", "--data", "data.csv"]) == 0
+    assert capsys.readouterr().out == "Period,Flow,Balance\n2023-10-01,48499.70,48499.70\n2023-11-01,-300,48199.70\n"
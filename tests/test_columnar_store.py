@@ -0,0 +1,68 @@
+from datetime import datetime
+import pytest
+from solution.columnar_store import ColumnarStore
+from solution.finance_tracker import FinanceTracker
+from solution.transaction import Transaction
+
+
+def test_store_roundtrip():
+    """Проверяет, что строки возвращаются в виде эквивалентных транзакций."""
+    store = ColumnarStore()
+    transaction = Transaction(100.5, "Еда", "2023-10-01", "expense")
+    store.append(transaction)
+    assert len(store) == 1
+    assert store[0] == transaction
+    assert store[0].date == datetime(2023, 10, 1)
+
+
+def test_store_dictionary_encodes_categories():
+    """Проверяет, что повторяющиеся категории хранятся один раз."""
+    store = ColumnarStore()
+    for _ in range(3):
+        store.append(Transaction(10, "Еда", "2023-10-01", "expense"))
+    store.append(Transaction(20, "Транспорт", "2023-10-01", "expense"))
+    assert store.categories == ["Еда", "Транспорт"]
+    assert list(store.category_codes) == [0, 0, 0, 1]
+
+
+def test_store_set_and_pop():
+    """Проверяет замену и удаление строк."""
+    store = ColumnarStore()
+    store.append(Transaction(100, "Еда", "2023-10-01", "expense"))
+    store.append(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    store[0] = Transaction(200, "Транспорт", "2023-10-02", "expense")
+    assert store[0].category == "Транспорт"
+    removed = store.pop(0)
+    assert removed.amount == 200
+    assert len(store) == 1
+    assert store[0].category == "Зарплата"
+
+
+def test_columnar_tracker_queries():
+    """Проверяет, что запросы трекера работают одинаково для обоих хранилищ."""
+    rows = [
+        Transaction(50000, "Зарплата", "2023-10-01", "income"),
+        Transaction(1500, "Еда", "2023-10-02", "expense"),
+        Transaction(300.25, "Еда", "2023-11-05", "expense"),
+    ]
+    plain = FinanceTracker()
+    columnar = FinanceTracker(columnar=True)
+    for t in rows:
+        plain.add_transaction(t)
+        columnar.add_transaction(t)
+
+    assert columnar.get_balance() == plain.get_balance()
+    assert columnar.get_transactions_by_category("Еда") == plain.get_transactions_by_category("Еда")
+    assert columnar.get_monthly_report(10, 2023) == plain.get_monthly_report(10, 2023)
+
+
+def test_unknown_type_keeps_columns_aligned():
+    """Строка с неизвестным типом отклоняется до изменения столбцов."""
+    store = ColumnarStore()
+    store.append(Transaction(1, "Еда", "2023-10-01", "expense"))
+    with pytest.raises(ValueError, match="Income"):
+        store.append_row((738794, "Income", "Зарплата", 500))
+    with pytest.raises(ValueError):
+        store.set_row(0, (738794, "gift", "Еда", 1))
+    assert len(store.dates) == len(store.kinds) == len(store.category_codes) == len(store.amounts) == 1
+    assert store[0] == Transaction(1, "Еда", "2023-10-01", "expense")
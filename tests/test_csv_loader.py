@@ -0,0 +1,56 @@
+import csv
+from datetime import date
+import pytest
+from solution.csv_loader import aggregate_csv, iter_row_batches, parse_date
+from solution.finance_tracker import FinanceTracker
+
+
+def write_csv(path, rows):
+    """Записывает CSV-файл с заголовком трекера."""
+    with open(path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Date", "Type", "Category", "Amount"])
+        writer.writerows(rows)
+
+
+def test_parse_date_fast_path():
+    """Проверяет разбор дат без strptime и отказ на неверных датах."""
+    assert parse_date("2023-10-01") == date(2023, 10, 1).toordinal()
+    assert parse_date("2024-02-29") == date(2024, 2, 29).toordinal()
+    with pytest.raises(ValueError):
+        parse_date("2023-02-30")
+
+
+def test_batches_are_bounded(tmpdir):
+    """Проверяет, что строки выдаются порциями не больше chunk_size."""
+    path = tmpdir.join("data.csv")
+    write_csv(path, [["2023-10-01", "expense", "Еда", str(i)] for i in range(10)])
+    batches = list(iter_row_batches(path, chunk_size=4))
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert batches[0][1] == (date(2023, 10, 1).toordinal(), "expense", "Еда", 100)
+
+
+def test_aggregate_csv_streaming(tmpdir):
+    """Проверяет подсчет итогов по файлу без загрузки в трекер."""
+    path = tmpdir.join("data.csv")
+    write_csv(path, [
+        ["2023-10-01", "income", "Зарплата", "50000"],
+        ["2023-10-02", "expense", "Еда", "1500.50"],
+    ])
+    aggregates = aggregate_csv(path, chunk_size=1)
+    assert aggregates.balance() == 4849950
+    assert aggregates.category_total("Еда") == 150050
+
+
+def test_load_from_csv_in_chunks(tmpdir):
+    """Проверяет загрузку трекера небольшими порциями."""
+    tmpdir.chdir()
+    tmpdir.mkdir("files")
+    write_csv(tmpdir.join("files", "data.csv"), [
+        ["2023-10-0%d" % (i % 9 + 1), "expense", "Еда", "10"] for i in range(25)
+    ])
+    tracker = FinanceTracker(columnar=True)
+    tracker.load_from_csv("data.csv", chunk_size=7)
+    assert len(tracker.transactions) == 25
+    assert tracker.get_balance() == -250
+    assert len(tracker.get_monthly_report(10, 2023)) == 25
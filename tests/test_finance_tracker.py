@@ -2,7 +2,7 @@ import os
 import csv
 from datetime import datetime
 from solution.finance_tracker import FinanceTracker
-from solution.transaction import Transaction
+from solution.transaction import FrozenTransaction, Transaction
 
 
 def test_add_transaction():
@@ -35,9 +35,9 @@ def test_export_to_csv(tmpdir):
     with open(filename, mode="r", encoding="utf-8") as file:
         reader = csv.reader(file)
         rows = list(reader)
-        assert rows[0] == ["Date", "Type", "Category", "Amount"]
-        assert rows[1] == ["2023-10-01", "expense", "Еда", "100"]
-        assert rows[2] == ["2023-10-01", "income", "Зарплата", "50000"]
+        assert rows[0] == ["Date", "Type", "Category", "Amount", "Id"]
+        assert rows[1] == ["2023-10-01", "expense", "Еда", "100", "1"]
+        assert rows[2] == ["2023-10-01", "income", "Зарплата", "50000", "2"]
 
 
 def test_load_from_csv(tmpdir):
@@ -126,3 +126,93 @@ def test_delete_transaction_invalid_index():
     assert len(tracker.transactions) == 1
     assert tracker.transactions[0].amount == 100
     assert tracker.transactions[0].category == "Еда"
+
+
+def read_rows(path):
+    """Читает строки CSV-файла без заголовка."""
+    with open(path, mode="r", encoding="utf-8") as file:
+        return list(csv.reader(file))[1:]
+
+
+def test_export_append_keeps_duplicates_and_order(tmpdir):
+    """Проверяет, что дозапись сохраняет порядок и одинаковые транзакции."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(150, "Кофе", "2023-10-01", "expense"))
+    tracker.export_to_csv("data.csv", mode="w")
+
+    other = FinanceTracker()
+    other.add_transaction(Transaction(150, "Кофе", "2023-10-01", "expense"))
+    other.add_transaction(Transaction(150, "Кофе", "2023-10-01", "expense"))
+    other.add_transaction(Transaction(300, "Такси", "2023-10-02", "expense"))
+    other.add_transaction(Transaction(50, "Хлеб", "2023-10-01", "expense"))
+    other.export_to_csv("data.csv", mode="a")
+
+    assert read_rows(os.path.join("files", "data.csv")) == [
+        ["2023-10-01", "expense", "Кофе", "150", "1"],
+        ["2023-10-01", "expense", "Кофе", "150", "2"],
+        ["2023-10-02", "expense", "Такси", "300", "3"],
+        ["2023-10-01", "expense", "Хлеб", "50", "4"],
+    ]
+
+
+def test_export_append_writes_only_new_rows(tmpdir, monkeypatch):
+    """Проверяет, что повторная дозапись не перечитывает CSV-файл."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.export_to_csv("other.csv", mode="w")
+    tracker.export_to_csv("data.csv", mode="a")
+    tracker.add_transaction(Transaction(200, "Еда", "2023-10-02", "expense"))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("CSV-файл не должен перечитываться")
+    monkeypatch.setattr("solution.row_fingerprints.iter_row_batches", fail)
+    tracker.export_to_csv("data.csv", mode="a")
+    tracker.export_to_csv("data.csv", mode="a")
+
+    assert read_rows(os.path.join("files", "data.csv")) == [
+        ["2023-10-01", "expense", "Еда", "100", "1"],
+        ["2023-10-02", "expense", "Еда", "200", "2"],
+    ]
+
+
+def test_export_append_notices_same_size_edit(tmpdir):
+    """Правка CSV на месте без изменения размера делает отпечатки устаревшими."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.export_to_csv("data.csv", mode="w")
+    path = os.path.join("files", "data.csv")
+    stat = os.stat(path)
+    with open(path, "rb") as file:
+        data = file.read()
+    with open(path, "wb") as file:
+        file.write(data.replace(b",100,", b",900,"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    # Без журнала свежесть отпечатков определяется только по их собственному маркеру
+    os.remove(f"{path}.journal")
+
+    other = FinanceTracker()
+    other.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    other.export_to_csv("data.csv", mode="a")
+    assert read_rows(path) == [
+        ["2023-10-01", "expense", "Еда", "900", "1"],
+        ["2023-10-01", "expense", "Еда", "100", "1"],
+    ]
+
+
+def test_frozen_tracker_loads_compact_transactions(tmpdir):
+    """Проверяет загрузку в компактные неизменяемые транзакции."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    tracker.export_to_csv("data.csv")
+
+    frozen = FinanceTracker(frozen=True)
+    frozen.load_from_csv("data.csv")
+    assert all(isinstance(t, FrozenTransaction) for t in frozen.transactions)
+    assert frozen.transactions == tracker.transactions
+    frozen.delete_transaction(0)
+    assert frozen.get_balance() == 50000
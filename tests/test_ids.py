@@ -0,0 +1,158 @@
+import json
+import os
+import pytest
+from solution.finance_tracker import FinanceTracker
+from solution.ids import IdIndex
+from solution.journal import replay_with_ids
+from solution.storage import SqliteBackend
+from solution.transaction import Transaction
+
+
+def make_transactions(count):
+    return [Transaction(100 + i, "Еда", f"2023-10-{i % 28 + 1:02d}", "expense") for i in range(count)]
+
+
+def test_id_index_positions_with_tombstones():
+    """Проверяет позиции и id после удалений, уплотнение и выдачу новых id."""
+    index = IdIndex()
+    index.extend([5, 7, 7, None], 4)
+    assert list(index) == [5, 7, 8, 9]
+    index.remove(7)
+    assert index.position(8) == 1
+    assert index.id_at(2) == 9
+    assert index.position(7) is None
+    assert index.append() == 10
+    assert [index.id_at(i) for i in range(len(index))] == [5, 8, 9, 10]
+    index.remove_at(0)
+    index.remove_at(0)
+    index.remove_at(0)
+    assert list(index) == [10] and index.position(10) == 0
+    assert index.append(3) == 3
+    assert index.position(3) == 1
+
+
+def test_duplicate_ids_do_not_depend_on_chunk_boundary(tmpdir):
+    """Повторный id в следующей порции заменяется новым при любом размере порции."""
+    tmpdir.chdir()
+    os.makedirs("files")
+    with open(os.path.join("files", "data.csv"), "w", encoding="utf-8") as file:
+        file.write("Date,Type,Category,Amount,Id\n")
+        file.write("2023-10-01,expense,Еда,1,5\n2023-10-02,expense,Еда,2,3\n2023-10-03,expense,Еда,3,5\n")
+    for chunk_size in (1, 2, 3):
+        tracker = FinanceTracker()
+        tracker.load_from_csv("data.csv", chunk_size=chunk_size)
+        assert list(tracker.ids) == [5, 3, 6]
+
+
+def test_ids_survive_deletes_and_reload(tmpdir):
+    """Проверяет, что id не меняются после удалений, журнала и перезагрузки."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    for t in make_transactions(5):
+        tracker.add_transaction(t)
+    tracker.export_to_csv("data.csv")
+    tracker.delete_transaction_by_id(2, "data.csv")
+    assert tracker.index_of(4) == 2
+    assert tracker.edit_transaction_by_id(4, Transaction(999, "Такси", "2023-11-01", "expense"), "data.csv")
+    assert not tracker.edit_transaction_by_id(2, Transaction(1, "Такси", "2023-11-01", "expense"), "data.csv")
+    new_id = tracker.add_transaction(Transaction(50, "Хлеб", "2023-11-02", "expense"))
+    assert new_id == 6
+
+    loaded = FinanceTracker(columnar=True)
+    loaded.load_from_csv("data.csv")
+    assert list(loaded.ids) == [1, 3, 4, 5, 6]
+    assert loaded.transactions[loaded.index_of(4)] == Transaction(999, "Такси", "2023-11-01", "expense")
+    rows, ids = replay_with_ids(os.path.join("files", "data.csv"))
+    assert ids == [1, 3, 4, 5, 6] and rows == list(loaded.transactions.rows())
+
+    loaded.compact()
+    reloaded = FinanceTracker()
+    reloaded.load_from_csv("data.csv")
+    assert list(reloaded.ids) == [1, 3, 4, 5, 6]
+
+
+def test_batch_deletes_by_id(tmpdir):
+    """Проверяет удаление по id внутри пакета и сохранение id в снапшоте."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    for t in make_transactions(4):
+        tracker.add_transaction(t)
+    with tracker.batch():
+        tracker.delete_transaction_by_id(1)
+        tracker.delete_transaction_by_id(3)
+        tracker.edit_transaction_by_id(4, Transaction(7, "Кофе", "2023-10-09", "expense"))
+    assert list(tracker.ids) == [2, 4]
+    assert tracker.transactions[1] == Transaction(7, "Кофе", "2023-10-09", "expense")
+    tracker.export_to_snapshot("data.snap")
+    loaded = FinanceTracker()
+    loaded.load_snapshot("data.snap")
+    assert list(loaded.ids) == [2, 4]
+
+
+def test_legacy_csv_and_journal_by_index(tmpdir):
+    """Проверяет файлы старого формата: CSV без Id и журнал с позициями."""
+    tmpdir.chdir()
+    os.makedirs("files")
+    path = os.path.join("files", "data.csv")
+    with open(path, "w", encoding="utf-8") as file:
+        file.write("Date,Type,Category,Amount\n2023-10-01,expense,Еда,100\n2023-10-02,expense,Еда,200\n")
+    tracker = FinanceTracker()
+    tracker.load_from_csv("data.csv")
+    tracker.delete_transaction(0, "data.csv")
+    with open(f"{path}.journal", "a", encoding="utf-8") as file:
+        file.write(json.dumps({"op": "edit", "index": 0, "row": ["2023-10-03", "expense", "Такси", 300]}) + "\n")
+
+    loaded = FinanceTracker()
+    loaded.load_from_csv("data.csv")
+    assert list(loaded.ids) == [2]
+    assert loaded.transactions == [Transaction(3, "Такси", "2023-10-03", "expense")]
+
+
+def test_sqlite_ids(tmpdir):
+    """Проверяет, что в SQLite id транзакции — первичный ключ таблицы."""
+    tracker = FinanceTracker(backend=SqliteBackend(str(tmpdir.join("data.db"))))
+    ids = [tracker.add_transaction(t) for t in make_transactions(3)]
+    assert ids == [1, 2, 3]
+    tracker.delete_transaction_by_id(1)
+    assert tracker.index_of(3) == 1 and tracker.get_id(0) == 2
+    tracker.edit_transaction_by_id(3, Transaction(1, "Кофе", "2023-10-05", "expense"))
+    assert tracker.transactions[1] == Transaction(1, "Кофе", "2023-10-05", "expense")
+    assert list(tracker.ids) == [2, 3]
+
+
+def test_deleted_last_id_is_not_reissued(tmpdir):
+    """id удаленной последней строки не выдается повторно после сохранения и перезагрузки."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    for t in make_transactions(2):
+        tracker.add_transaction(t)
+    tracker.export_to_csv("data.csv")
+    tracker.delete_transaction_by_id(2, "data.csv")
+    tracker.compact()
+    tracker.export_to_snapshot("data.snap")
+    tracker.export_to_archive("data.archive")
+
+    for load, filename in [("load_from_csv", "data.csv"), ("load_snapshot", "data.snap"), ("load_archive", "data.archive")]:
+        loaded = FinanceTracker()
+        getattr(loaded, load)(filename)
+        assert list(loaded.ids) == [1]
+        assert loaded.add_transaction(make_transactions(1)[0]) == 3
+
+    path = str(tmpdir.join("data.db"))
+    stored = FinanceTracker(backend=SqliteBackend(path))
+    for t in make_transactions(2):
+        stored.add_transaction(t)
+    stored.delete_transaction_by_id(2)
+    stored.backend.close()
+    reopened = FinanceTracker(backend=SqliteBackend(path))
+    assert reopened.add_transaction(make_transactions(1)[0]) == 3
+    reopened.backend.close()
+
+
+def test_remove_many_unknown_id():
+    """Удаление неизвестного id сообщает KeyError и не меняет индекс."""
+    index = IdIndex()
+    index.extend(None, 3)
+    with pytest.raises(KeyError):
+        index.remove_many({2, 7})
+    assert list(index) == [1, 2, 3]
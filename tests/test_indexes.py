@@ -0,0 +1,117 @@
+import random
+import time
+from datetime import date
+from solution.dates import to_ordinal
+from solution.finance_tracker import FinanceTracker
+from solution.transaction import Transaction
+
+
+def build_tracker():
+    """Создает трекер с транзакциями за несколько месяцев."""
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-15", "expense"))
+    tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    tracker.add_transaction(Transaction(300, "Транспорт", "2023-11-02", "expense"))
+    tracker.add_transaction(Transaction(200, "Еда", "2023-12-31", "expense"))
+    tracker.add_transaction(Transaction(700, "Еда", "2024-01-01", "expense"))
+    return tracker
+
+
+def test_monthly_report_sorted_by_date():
+    """Проверяет отчет за месяц через индекс дат."""
+    tracker = build_tracker()
+    report = tracker.get_monthly_report(10, 2023)
+    assert [t.category for t in report] == ["Зарплата", "Еда"]
+
+
+def test_quarterly_and_range_reports():
+    """Проверяет отчеты за квартал и за произвольный период."""
+    tracker = build_tracker()
+    assert [t.amount for t in tracker.get_quarterly_report(4, 2023)] == [50000, 100, 300, 200]
+    assert [t.amount for t in tracker.get_report_between("2023-11-01", date(2024, 1, 1))] == [300, 200, 700]
+
+
+def test_category_index_after_edit_and_delete(tmpdir):
+    """Проверяет, что индексы обновляются при редактировании и удалении."""
+    tmpdir.chdir()
+    tracker = build_tracker()
+    tracker.edit_transaction(2, Transaction(300, "Еда", "2023-10-20", "expense"))
+    tracker.delete_transaction(0)
+    assert [t.amount for t in tracker.get_transactions_by_category("Еда")] == [300, 200, 700]
+    assert tracker.get_transactions_by_category("Транспорт") == []
+    assert [t.amount for t in tracker.get_monthly_report(10, 2023)] == [50000, 300]
+
+
+def test_indexes_match_full_scan(tmpdir):
+    """Сравнивает результаты индексов с полным перебором после случайных изменений."""
+    tmpdir.chdir()
+    rng = random.Random(7)
+    tracker = FinanceTracker(columnar=True)
+    for _ in range(200):
+        t = Transaction(rng.randint(1, 500), rng.choice("ABC"),
+                        f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}", "expense")
+        if tracker.transactions and rng.random() < 0.3:
+            if rng.random() < 0.5:
+                tracker.edit_transaction(rng.randrange(len(tracker.transactions)), t)
+            else:
+                tracker.delete_transaction(rng.randrange(len(tracker.transactions)))
+        else:
+            tracker.add_transaction(t)
+
+    rows = list(tracker.transactions)
+    for category in "ABC":
+        assert tracker.get_transactions_by_category(category) == [t for t in rows if t.category == category]
+    for month in range(1, 13):
+        expected = sorted(
+            (t for t in rows if t.date.month == month),
+            key=lambda t: t.date,
+        )
+        assert [t.date for t in tracker.get_monthly_report(month, 2023)] == [t.date for t in expected]
+
+
+def test_monthly_report_invalid_month_is_empty():
+    """Отчет за несуществующий месяц пуст, как и до индекса дат."""
+    tracker = build_tracker()
+    assert tracker.get_monthly_report(13, 2023) == []
+    assert tracker.get_monthly_report(0, 2023) == []
+
+
+def make_rows(count):
+    return [(to_ordinal(date(2023, 1, 1)) + i % 365, "expense", "ABC"[i % 3], 100 + i) for i in range(count)]
+
+
+def test_delete_time_does_not_grow_with_size(tmpdir):
+    """Удаление отмечает надгробие и не сдвигает позиции: время не растет с размером журнала."""
+    tmpdir.chdir()
+
+    def delete_time(count):
+        tracker = FinanceTracker()
+        tracker.import_rows([make_rows(count)])
+        tracker.export_to_csv("data.csv")
+        tracker.get_report_between("2023-01-01", "2023-12-31")  # Индекс дат уже отсортирован
+        start = time.perf_counter()
+        for _ in range(300):
+            tracker.delete_transaction(0, "data.csv")
+        return time.perf_counter() - start
+
+    small = min(delete_time(2_000) for _ in range(2))
+    large = min(delete_time(64_000) for _ in range(2))
+    assert large < small * 8
+
+
+def test_reports_after_compaction(tmpdir):
+    """После удаления больше половины строк хранилище уплотняется, а индексы остаются верными."""
+    tmpdir.chdir()
+    for columnar in (False, True):
+        tracker = FinanceTracker(columnar=columnar)
+        tracker.import_rows([make_rows(30)])
+        ids = list(tracker.ids)
+        for transaction_id in ids[::3] + ids[1::3]:
+            tracker.delete_transaction_by_id(transaction_id)
+        assert list(tracker.ids) == ids[2::3]
+        expected = [tracker.transaction_class.from_row(row) for row in make_rows(30)[2::3]]
+        assert tracker.transactions == expected
+        assert tracker.get_transactions_by_category("C") == expected
+        assert tracker.get_transactions_by_category("A") == []
+        assert sorted(tracker.get_report_between("2023-01-01", "2023-12-31"), key=lambda t: t.date) == expected
+        tracker.verify_aggregates()
@@ -0,0 +1,75 @@
+import json
+import os
+import subprocess
+import sys
+from solution.finance_tracker import FinanceTracker
+from solution.instrumentation import STATS_ENV, Instrumentation
+from solution.transaction import Transaction
+
+
+def test_disabled_by_default(monkeypatch):
+    """Без переменной окружения замеры не включаются."""
+    monkeypatch.delenv(STATS_ENV, raising=False)
+    assert FinanceTracker().instrumentation is None
+
+
+def test_timers_and_counters(tmpdir):
+    """Проверяет таймеры операций и счетчики строк после включения замеров."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.export_to_csv("data.csv")
+
+    loaded = FinanceTracker()
+    instrumentation = loaded.enable_instrumentation()
+    loaded.load_from_csv("data.csv")
+    loaded.get_balance()
+    loaded.get_balance()
+    stats = instrumentation.stats()
+    assert stats["timers"]["get_balance"]["calls"] == 2
+    assert stats["timers"]["load_from_csv"]["calls"] == 1
+    assert stats["counters"]["rows_loaded"] == 1
+    assert "profile" not in stats
+    assert loaded.disable_instrumentation() is instrumentation
+    loaded.get_balance()
+    assert instrumentation.timers["get_balance"][0] == 2
+
+
+def test_profile_and_memory():
+    """Профиль и пик памяти снимаются для внешних операций."""
+    tracker = FinanceTracker()
+    instrumentation = tracker.enable_instrumentation(profile=True, trace_memory=True)
+    for i in range(50):
+        tracker.add_transaction(Transaction(i + 1, "Еда", "2023-10-01", "expense"))
+    tracker.disable_instrumentation()
+    stats = json.loads(instrumentation.dump())
+    assert stats["timers"]["add_transaction"]["calls"] == 50
+    assert "peak_kib" in stats["timers"]["add_transaction"]
+    assert any("add_transaction" in row["function"] for row in stats["profile"])
+
+
+def test_nested_timers():
+    """Вложенная операция попадает в свой таймер."""
+    instrumentation = Instrumentation()
+    with instrumentation.timed("outer"):
+        with instrumentation.timed("inner"):
+            pass
+    assert instrumentation.timers["outer"][0] == instrumentation.timers["inner"][0] == 1
+
+
+def test_stats_file_from_environment(tmpdir):
+    """При FINANCE_TRACKER_STATS статистика дописывается в файл при выходе."""
+    path = str(tmpdir.join("stats.jsonl"))
+    script = (
+        "from solution.finance_tracker import FinanceTracker\n"
+        "FinanceTracker().get_balance()\n"
+        "FinanceTracker().get_balance()\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", script], check=True, cwd=root, env={**os.environ, STATS_ENV: path})
+    with open(path, encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    # Одна строка на процесс: трекеры процесса пишут в общую статистику
+    assert len(lines) == 2
+    assert lines[0]["timers"]["get_balance"]["calls"] == 2
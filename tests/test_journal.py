@@ -0,0 +1,95 @@
+import os
+import pytest
+from solution import journal as journal_module
+from solution.finance_tracker import FinanceTracker
+from solution.journal import Journal
+from solution.transaction import Transaction
+
+
+@pytest.fixture
+def tracker(tmpdir):
+    """Трекер, синхронизированный с файлом files/data.csv."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    tracker.add_transaction(Transaction(300, "Транспорт", "2023-10-03", "expense"))
+    tracker.export_to_csv("data.csv")
+    return tracker
+
+
+def reload():
+    """Загружает files/data.csv в новый трекер."""
+    tracker = FinanceTracker()
+    tracker.load_from_csv("data.csv")
+    return tracker
+
+
+def test_changes_go_to_journal(tracker):
+    """Проверяет, что изменения дописываются в журнал, а CSV не переписывается."""
+    with open(os.path.join("files", "data.csv"), "rb") as file:
+        before = file.read()
+    tracker.edit_transaction(0, Transaction(200, "Еда", "2023-10-02", "expense"))
+    tracker.delete_transaction(1)
+    tracker.add_transaction(Transaction(5, "Связь", "2023-10-04", "expense"))
+    with open(os.path.join("files", "data.csv"), "rb") as file:
+        assert file.read() == before
+    assert tracker.backend.journal.pending == 3
+
+    loaded = reload()
+    assert list(loaded.transactions) == list(tracker.transactions)
+    assert loaded.get_balance() == tracker.get_balance()
+
+
+def test_compaction_folds_journal(tracker):
+    """Проверяет, что свертка переносит журнал в CSV и очищает его."""
+    tracker.delete_transaction(0)
+    tracker.compact()
+    assert Journal(os.path.join("files", "data.csv")).records() == []
+    assert list(reload().transactions) == list(tracker.transactions)
+
+
+def test_crash_after_base_replaced(tracker, monkeypatch):
+    """Сбой после замены CSV, но до сброса журнала: журнал не применяется повторно."""
+    tracker.delete_transaction(0)
+    expected = list(tracker.transactions)
+
+    def crash(self, next_id=None):
+        raise OSError("сбой")
+    monkeypatch.setattr(Journal, "reset", crash)
+    with pytest.raises(OSError):
+        tracker.compact()
+    monkeypatch.undo()
+
+    loaded = reload()
+    assert list(loaded.transactions) == expected
+    # Устаревший журнал отложен, и новые записи не теряются за его заголовком
+    assert os.path.exists(os.path.join("files", "data.csv.journal.stale"))
+    loaded.add_transaction(Transaction(1, "Еда", "2023-10-05", "expense"))
+    assert list(reload().transactions) == list(loaded.transactions)
+
+
+def test_crash_before_base_replaced(tracker, monkeypatch):
+    """Сбой до замены CSV: остаются старый CSV и полный журнал."""
+    tracker.edit_transaction(2, Transaction(999, "Транспорт", "2023-10-03", "expense"))
+    expected = list(tracker.transactions)
+
+    def crash(src, dst):
+        raise OSError("сбой")
+    monkeypatch.setattr(journal_module.os, "replace", crash)
+    with pytest.raises(OSError):
+        tracker.compact()
+    monkeypatch.undo()
+
+    assert list(reload().transactions) == expected
+
+
+def test_torn_journal_record_is_dropped(tracker):
+    """Недописанная запись в конце журнала отбрасывается при загрузке."""
+    tracker.delete_transaction(0)
+    with open(tracker.backend.journal.path, "a", encoding="utf-8") as file:
+        file.write('{"op": "delete", "ind')
+    loaded = reload()
+    assert len(loaded.transactions) == 2
+    loaded.add_transaction(Transaction(1, "Еда", "2023-10-05", "expense"))
+    assert len(reload().transactions) == 3
@@ -0,0 +1,56 @@
+import os
+import random
+from array import array
+from decimal import Decimal
+import pytest
+from solution.aggregates import RunningAggregates
+from solution.columnar_store import ColumnarStore
+from solution.money import format_minor, from_minor, parse_amount, parse_minor, to_minor
+from solution.reductions import sum_minor
+from solution.transaction import Transaction
+
+
+def test_minor_units_are_exact():
+    """Проверяет перевод сумм в копейки и обратно без ошибок float."""
+    assert to_minor(0.1) + to_minor(0.2) == to_minor("0.3")
+    assert from_minor(30) == Decimal("0.30")
+    assert Transaction(0.1, "Еда", "2023-10-01", "expense").amount_minor == 10
+    assert [format_minor(m) for m in (10000, 150030, -5)] == ["100", "1500.30", "-0.05"]
+    assert parse_minor("1500.30") == 150030
+
+
+def test_parse_amount_rejects_bad_input():
+    """Проверяет разбор пользовательского ввода суммы."""
+    assert parse_amount("50.5") == 5050
+    assert parse_amount("1.500") == 150
+    for text in ("abc", "nan", "inf", "0.001"):
+        with pytest.raises(ValueError):
+            parse_amount(text)
+
+
+def test_sum_over_10m_random_amounts_is_exact(monkeypatch):
+    """Сумма 10 млн случайных сумм совпадает с точной суммой целых Python."""
+    # Случайные суммы до ~4.3e9 копеек: сумма гарантированно помещается в int64
+    amounts = array("q", array("I", os.urandom(4 * 10_000_000)))
+    expected = sum(amounts.tolist())
+    assert sum_minor(amounts) == expected
+    monkeypatch.setattr("solution.reductions.optional_numpy", lambda: None)
+    assert sum_minor(amounts) == expected
+
+
+@pytest.mark.parametrize("numpy_enabled", [True, False])
+def test_store_totals_match_row_totals(monkeypatch, numpy_enabled):
+    """Пакетный пересчет по колонкам совпадает с построчным."""
+    if not numpy_enabled:
+        monkeypatch.setattr("solution.reductions.optional_numpy", lambda: None)
+    rng = random.Random(3)
+    store = ColumnarStore()
+    for _ in range(5000):
+        store.append_row((
+            rng.randint(700000, 740000),
+            rng.choice(["income", "expense"]),
+            rng.choice(["Еда", "Транспорт", "Жилье"]),
+            rng.randint(-1000, 10**9),
+        ))
+    assert RunningAggregates.from_store(store) == RunningAggregates.from_rows(store.rows())
+    assert store.total(1) + store.total(2) == store.total(3)
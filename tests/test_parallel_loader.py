@@ -0,0 +1,52 @@
+import os
+import pytest
+from benchmarks.ledger import write_csv
+from solution.aggregates import RunningAggregates
+from solution.finance_tracker import FinanceTracker
+from solution.parallel_loader import aggregate_files, expand_sources, load_files
+from solution.transaction import Transaction
+
+
+@pytest.fixture
+def folder(tmpdir):
+    """Папка с несколькими CSV-файлами; у одного из них есть журнал."""
+    for i in range(3):
+        write_csv(str(tmpdir.join(f"account{i}.csv")), 500, seed=i)
+    tmpdir.chdir()
+    path = str(tmpdir.join("account1.csv"))
+    tracker = FinanceTracker()
+    tracker.load_from_csv(path)
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.delete_transaction(0, path)
+    return tmpdir
+
+
+def serial_rows(folder):
+    """Строки всех файлов, загруженных по очереди."""
+    rows = []
+    for name in ("account0.csv", "account1.csv", "account2.csv"):
+        tracker = FinanceTracker()
+        tracker.load_from_csv(str(folder.join(name)))
+        rows.extend(tracker._rows())
+    return rows
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parallel_load_matches_serial(folder, workers):
+    """Параллельная загрузка дает те же строки в том же порядке."""
+    tracker = FinanceTracker()
+    assert load_files(str(folder), tracker, workers) == 1500
+    assert list(tracker._rows()) == serial_rows(folder)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_map_reduce_totals(folder, workers):
+    """Сложенные частичные итоги совпадают с итогами по всем строкам."""
+    totals = aggregate_files(os.path.join(str(folder), "account*.csv"), workers)
+    assert totals == RunningAggregates.from_rows(serial_rows(folder))
+
+
+def test_missing_sources(tmpdir):
+    """Шаблон без совпадений — ошибка, а не пустой результат."""
+    with pytest.raises(FileNotFoundError):
+        expand_sources(str(tmpdir.join("*.csv")))
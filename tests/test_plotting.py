@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+import pytest
+from solution.finance_tracker import FinanceTracker
+from solution.plotting import OTHER_LABEL, SpendingChart, top_slices
+from solution.transaction import Transaction
+
+
+def test_core_imports_without_optional_packages(tmpdir):
+    """Ядро импортируется, даже если matplotlib и prompt_toolkit не установлены."""
+    code = (
+        "import sys\n"
+        "sys.modules['matplotlib'] = None\n"
+        "sys.modules['prompt_toolkit'] = None\n"
+        "from solution.finance_tracker import FinanceTracker\n"
+        "from solution.storage import SqliteBackend\n"
+        "tracker = FinanceTracker()\n"
+        "tracker.plot_spending_by_category('chart.png')\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=root)
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=tmpdir, env=env)
+    assert result.returncode == 0, result.stderr
+    assert "установите matplotlib" in result.stdout
+
+
+@pytest.mark.parametrize("extension", ["png", "svg"])
+def test_plot_renders_headless(tmpdir, extension):
+    """График сохраняется в файл без графического интерфейса."""
+    pytest.importorskip("matplotlib")
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.add_transaction(Transaction(300, "Транспорт", "2023-10-03", "expense"))
+    output = tmpdir.join(f"chart.{extension}")
+    tracker.plot_spending_by_category(str(output))
+    assert output.size() > 0
+
+
+def test_top_slices_collapse_into_other():
+    """Мелкие категории сводятся в сектор «Прочее»."""
+    totals = {f"Категория {i}": i for i in range(1, 1001)}
+    slices = top_slices(totals, 3)
+    assert slices[:3] == [("Категория 1000", 1000), ("Категория 999", 999), ("Категория 998", 998)]
+    assert slices[3] == (OTHER_LABEL, sum(range(1, 998)))
+
+
+def test_chart_data_is_cached_until_expense_changes(monkeypatch):
+    """Данные диаграммы пересчитываются только после изменения расходов."""
+    tracker = FinanceTracker()
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    calls = []
+    totals = tracker.get_category_totals
+    monkeypatch.setattr(tracker, "get_category_totals", lambda kind: calls.append(kind) or totals(kind))
+    assert tracker.chart_data.slices() == [("Еда", 100)]
+    tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    tracker.chart_data.slices()
+    assert len(calls) == 1
+    tracker.edit_transaction(0, Transaction(300, "Транспорт", "2023-10-02", "expense"))
+    assert tracker.chart_data.slices() == [("Транспорт", 300)]
+    assert len(calls) == 2
+
+
+def test_chart_updates_wedges_in_place(tmpdir):
+    """Повторное построение меняет секторы той же фигуры так же, как новый Axes.pie."""
+    pytest.importorskip("matplotlib")
+    chart = SpendingChart()
+    output = str(tmpdir.join("chart.png"))
+    chart.render([("Еда", 300), ("Транспорт", 100)], output)
+    figure, wedges = chart.figure, list(chart._wedges)
+    chart.render([("Жилье", 100), ("Еда", 100)], output)
+    assert chart.figure is figure and chart._wedges == wedges
+
+    fresh = SpendingChart()
+    fresh.render([("Жилье", 100), ("Еда", 100)], output)
+    for updated, expected in zip(chart._wedges, fresh._wedges):
+        assert updated.theta1 == pytest.approx(expected.theta1)
+        assert updated.theta2 == pytest.approx(expected.theta2)
+    for updated, expected in zip(chart._texts + chart._autotexts, fresh._texts + fresh._autotexts):
+        assert updated.get_text() == expected.get_text()
+        assert updated.get_position() == pytest.approx(expected.get_position())
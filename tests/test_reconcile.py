@@ -0,0 +1,177 @@
+import os
+import pytest
+from solution import reconcile as reconcile_module
+from solution.cli import main
+from solution.dates import to_ordinal
+from solution.finance_tracker import FinanceTracker
+from solution.reconcile import CONFLICT, MATCHED, NEW, LedgerIndex, index_path, normalize_category, reconcile
+from solution.storage import CsvBackend
+
+
+LEDGER_CSV = (
+    "Date,Type,Category,Amount\n"
+    "2023-10-01,expense,Еда,10\n"
+    "2023-10-01,expense,Еда,10\n"
+    "2023-10-03,expense,Такси,5\n"
+    "2023-10-05,expense,Ещё еда,7\n"
+    "2023-10-10,income,Зарплата,1000\n"
+)
+
+STATEMENT_CSV = (
+    "Date,Type,Category,Amount\n"
+    "2023-10-01,expense, еда ,10\n"
+    "2023-10-02,expense,Такси,5.20\n"
+    "2023-10-06,expense,ЕЩЕ ЕДА,9\n"
+    "2023-10-11,income,Подарок,50\n"
+)
+
+
+def row(day, transaction_type, category, amount_minor):
+    return to_ordinal(day), transaction_type, category, amount_minor
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(text)
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_exact_matches_are_a_multiset(monkeypatch, with_numpy):
+    """Одинаковые транзакции считаются поштучно, категории сравниваются после нормализации."""
+    if not with_numpy:
+        monkeypatch.setattr(reconcile_module, "optional_numpy", lambda: None)
+    index = LedgerIndex.build([
+        row("2023-10-01", "expense", "Еда", 1000),
+        row("2023-10-10", "income", "Зарплата", 100000),
+        row("2023-10-01", "expense", "еда", 1000),
+    ])
+    assert len(index) == 3 and index.categories == ["еда", "зарплата"]
+    assert list(index.entries(to_ordinal("2023-10-01"), to_ordinal("2023-10-01"))) == [
+        (to_ordinal("2023-10-01"), 2, 0, 1000, 2),
+    ]
+    statement = [row("2023-10-01", "expense", "ЕДА ", 1000)] * 3
+    report = reconcile(index, statement)
+    assert report.statuses == [MATCHED, MATCHED, NEW]
+    assert report.counts() == {MATCHED: 2, CONFLICT: 0, NEW: 1}
+
+
+@pytest.mark.parametrize("with_numpy", [True, False])
+def test_add_merges_into_sorted_columns(monkeypatch, with_numpy):
+    """Дополненный индекс совпадает с построенным заново; неизвестный тип отклоняется."""
+    if not with_numpy:
+        monkeypatch.setattr(reconcile_module, "optional_numpy", lambda: None)
+    first = [row("2023-10-05", "expense", "Еда", 1000), row("2023-10-01", "income", "Зарплата", 5000)]
+    second = [
+        row("2023-10-05", "expense", "еда", 1000),
+        row("2023-10-03", "expense", "Такси", 300),
+        row("2023-10-09", "expense", "Еда", 100),
+        row("2023-09-30", "income", "Зарплата", 5000),
+    ]
+    index = LedgerIndex.build(first)
+    index.add(second)
+    expected = LedgerIndex.build(first + second)
+    for name in ("dates", "kinds", "amounts", "counts"):
+        assert getattr(index, name) == getattr(expected, name)
+    assert [index.categories[code] for code in index.codes] == [expected.categories[code] for code in expected.codes]
+
+    columns = [list(getattr(index, name)) for name in ("dates", "kinds", "codes", "amounts", "counts")]
+    with pytest.raises(ValueError):
+        index.add([row("2023-10-04", "expense", "Кино", 100), row("2023-10-04", "transfer", "Кино", 100)])
+    assert [list(getattr(index, name)) for name in ("dates", "kinds", "codes", "amounts", "counts")] == columns
+    with pytest.raises(ValueError):
+        reconcile(index, [row("2023-10-05", "transfer", "Еда", 1000)])
+
+
+def test_fuzzy_window_and_conflicts():
+    """Расхождения в пределах допуска сопоставляются, за пределами — конфликт или новая строка."""
+    index = LedgerIndex.build([
+        row("2023-10-03", "expense", "Такси", 500),
+        row("2023-10-05", "expense", "Еда", 700),
+        row("2023-10-05", "expense", "Еда", 760),
+    ])
+    statement = [
+        row("2023-10-04", "expense", "Такси", 520),
+        row("2023-10-06", "expense", "Еда", 750),
+        row("2023-10-06", "expense", "Еда", 900),
+        row("2023-10-09", "expense", "Еда", 700),
+        row("2023-10-04", "income", "Такси", 500),
+    ]
+    report = reconcile(index, statement, days=1, tolerance=50)
+    assert list(report)[:3] == [
+        (MATCHED, statement[0], (to_ordinal("2023-10-03"), 500)),
+        (MATCHED, statement[1], (to_ordinal("2023-10-05"), 760)),
+        (CONFLICT, statement[2], (to_ordinal("2023-10-05"), 700)),
+    ]
+    assert report.new_rows() == statement[3:]
+    # Без окна дат транзакции других дней не рассматриваются
+    assert reconcile(index, statement).counts() == {MATCHED: 0, CONFLICT: 0, NEW: 5}
+
+
+def test_index_is_reused_until_file_changes(tmpdir, monkeypatch):
+    """Индекс сохраняется рядом с файлом и строится заново только после его изменения."""
+    path = str(tmpdir.join("data.csv"))
+    write(path, LEDGER_CSV)
+    built = []
+    original = LedgerIndex.build.__func__
+
+    def counting_build(cls, rows):
+        built.append(path)
+        return original(cls, rows)
+    monkeypatch.setattr(LedgerIndex, "build", classmethod(counting_build))
+    rows = lambda: FinanceTracker(backend=CsvBackend(path))._rows()
+
+    first = LedgerIndex.for_source(path, rows)
+    assert os.path.exists(index_path(path)) and len(built) == 1
+    second = LedgerIndex.for_source(path, rows)
+    assert len(built) == 1 and list(second.rows()) == list(first.rows())
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("2023-10-12,expense,Еда,1\n")
+    assert len(LedgerIndex.for_source(path, rows)) == 6 and len(built) == 2
+
+
+def test_tracker_apply_adds_only_new_rows(tmpdir):
+    """apply=True добавляет новые строки выписки в журнал и дополняет сохраненный индекс."""
+    tmpdir.chdir()
+    os.makedirs("files")
+    write(os.path.join("files", "data.csv"), LEDGER_CSV)
+    tracker = FinanceTracker()
+    tracker.load_from_csv("data.csv")
+    statement = [
+        row("2023-10-01", "expense", "Еда", 1000),
+        row("2023-10-20", "expense", "Кино", 400),
+    ]
+    report = tracker.reconcile_statement([statement], days=2, tolerance="0.50", apply=True)
+    assert report.statuses == [MATCHED, NEW]
+    assert len(tracker.transactions) == 6
+
+    reloaded = FinanceTracker()
+    reloaded.load_from_csv("data.csv")
+    assert list(reloaded._rows()) == list(tracker._rows())
+    index, _ = LedgerIndex.load(index_path(os.path.join("files", "data.csv")))
+    assert sorted(index.rows()) == sorted(
+        (ordinal, kind, normalize_category(category), amount) for ordinal, kind, category, amount in tracker._rows()
+    )
+    again = reloaded.reconcile_statement([statement], apply=True)
+    assert again.statuses == [MATCHED, MATCHED] and len(reloaded.transactions) == 6
+
+
+def test_cli_reconcile(tmpdir, capsys):
+    """Команда reconcile печатает статус каждой строки выписки, --apply дописывает новые."""
+    data = str(tmpdir.join("data.csv"))
+    statement = str(tmpdir.join("statement.csv"))
+    write(data, LEDGER_CSV)
+    write(statement, STATEMENT_CSV)
+    assert main(["reconcile", statement, "--data", data, "--days", "1", "--tolerance", "0.50"]) == 0
+    captured = capsys.readouterr()
+    assert captured.out.splitlines() == [
+        "Status,Date,Type,Category,Amount,LedgerDate,LedgerAmount",
+        "matched,2023-10-01,expense, еда ,10,2023-10-01,10",
+        "matched,2023-10-02,expense,Такси,5.20,2023-10-03,5",
+        "conflict,2023-10-06,expense,ЕЩЕ ЕДА,9,2023-10-05,7",
+        "new,2023-10-11,income,Подарок,50,,",
+    ]
+    assert captured.err == "matched: 2, conflict: 1, new: 1\n"
+    assert main(["reconcile", statement, "--data", data, "--apply"]) == 0
+    capsys.readouterr()
+    assert main(["balance", "--data", data]) == 0
+    assert capsys.readouterr().out == "1003.80\n"
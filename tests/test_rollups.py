@@ -0,0 +1,67 @@
+import random
+from datetime import date
+from decimal import Decimal
+from solution.finance_tracker import FinanceTracker
+from solution.rollups import BalanceRollup, net_amount
+from solution.storage import SqliteBackend
+from solution.transaction import Transaction
+
+
+def random_row(rng):
+    """Случайная строка в пределах 2023 года."""
+    return (
+        date(2023, 1, 1).toordinal() + rng.randrange(365),
+        rng.choice(["income", "expense"]),
+        "Еда",
+        rng.randint(1, 100000),
+    )
+
+
+def test_queries_match_brute_force_after_out_of_order_changes():
+    """Баланс на дату и оборот совпадают с прямым подсчетом после правок задним числом."""
+    rng = random.Random(5)
+    rollup = BalanceRollup()
+    rows = []
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.1:
+            batch = [random_row(rng) for _ in range(rng.randint(1, 20))]
+            rollup.on_extend(len(rows), batch)
+            rows.extend(batch)
+        elif action < 0.6 or not rows:
+            rows.append(random_row(rng))
+            rollup.on_add(len(rows) - 1, rows[-1])
+        elif action < 0.8:
+            index = rng.randrange(len(rows))
+            new_row = random_row(rng)
+            rollup.on_edit(index, rows[index], new_row)
+            rows[index] = new_row
+        else:
+            rollup.on_delete(0, rows.pop(rng.randrange(len(rows))))
+        day = date(2023, 1, 1).toordinal() + rng.randrange(-10, 375)
+        assert rollup.balance_at(day) == sum(net_amount(r) for r in rows if r[0] <= day)
+        end = day + rng.randrange(60)
+        assert rollup.net_flow(day, end) == sum(net_amount(r) for r in rows if day <= r[0] <= end)
+
+
+def test_balance_series(tmpdir):
+    """Ряды по дням, неделям и месяцам; тот же результат у хранилища SQLite."""
+    tmpdir.chdir()
+    trackers = [FinanceTracker(), FinanceTracker(backend=SqliteBackend("data.db"))]
+    for tracker in trackers:
+        tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-02", "income"))
+        tracker.add_transaction(Transaction(1500, "Еда", "2023-10-09", "expense"))
+        tracker.add_transaction(Transaction(300, "Транспорт", "2023-09-30", "expense"))
+    reopened = FinanceTracker(backend=SqliteBackend("data.db"))
+    for tracker in trackers + [reopened]:
+        assert tracker.get_balance_at("2023-10-08") == Decimal("49700")
+        assert tracker.get_net_flow("2023-10-01", "2023-10-31") == Decimal("48500")
+        assert tracker.get_balance_series("2023-09-15", "2023-10-20", "month") == [
+            (date(2023, 9, 1), Decimal("-300"), Decimal("-300")),
+            (date(2023, 10, 1), Decimal("48500"), Decimal("48200")),
+        ]
+        weeks = tracker.get_balance_series("2023-10-01", "2023-10-15", "week")
+        assert [week[0] for week in weeks] == [date(2023, 9, 25), date(2023, 10, 2), date(2023, 10, 9)]
+        assert [week[1] for week in weeks] == [0, 50000, -1500]
+        days = tracker.get_balance_series("2023-10-01", "2023-10-03", "day")
+        assert [day[2] for day in days] == [-300, 49700, 49700]
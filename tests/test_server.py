@@ -0,0 +1,115 @@
+import asyncio
+import os
+import pytest
+from solution.finance_tracker import FinanceTracker
+from solution.server import Client, TrackerService, start_server
+from solution.storage import CsvBackend, SqliteBackend
+
+
+async def run_with_server(path, scenario):
+    """Запускает сервер на Unix-сокете и выполняет scenario(адрес сокета)."""
+    socket_path = f"{path}.sock"
+    service = TrackerService(FinanceTracker(backend=CsvBackend(path)))
+    server = await start_server(service, socket_path)
+    try:
+        return await scenario(socket_path)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await service.close()
+
+
+def test_requests_and_persistence(tmpdir):
+    """Добавление, баланс, отчеты и запросы; изменения сохраняются в журнал."""
+    path = str(tmpdir.join("data.csv"))
+    CsvBackend(path).save_all(())
+
+    async def scenario(socket_path):
+        client = await Client.connect(socket_path)
+        first = await client.request("add", amount="50000", category="Зарплата", date="2023-10-01", type="income")
+        await client.request("add", amount="1500.30", category="Еда", date="2023-10-02", type="expense")
+        assert first == {"id": 1}
+        assert await client.request("balance") == "48499.70"
+        assert await client.request("balance", at="2023-10-01") == "50000"
+        report = await client.request("report", month=10, year=2023)
+        assert report[1] == {"date": "2023-10-02", "type": "expense", "category": "Еда", "amount": "1500.30"}
+        assert await client.request("query", type="expense") == {"Еда": "1500.30"}
+        assert len(await client.request("query", category="Зарплата")) == 1
+        assert await client.request("report", month=13, year=2023) == []
+        assert await client.request("alerts") == []
+        with pytest.raises(RuntimeError, match="Неизвестный метод"):
+            await client.request("drop")
+        with pytest.raises(RuntimeError, match="Тип"):
+            await client.request("add", amount="1", category="Еда", date="2023-10-02", type="gift")
+        await client.close()
+
+    asyncio.run(run_with_server(path, scenario))
+    reloaded = FinanceTracker(backend=CsvBackend(path))
+    assert list(reloaded.ids) == [1, 2]
+    assert str(reloaded.get_balance()) == "48499.70"
+
+
+def test_concurrent_clients_share_group_commits(tmpdir):
+    """Одновременные добавления получают разные id и сохраняются группами."""
+    path = str(tmpdir.join("data.csv"))
+    CsvBackend(path).save_all(())
+
+    async def worker(socket_path, n):
+        client = await Client.connect(socket_path)
+        ids = []
+        for i in range(10):
+            result = await client.request("add", amount=str(n + 1), category="Еда", date="2023-10-01", type="expense")
+            ids.append(result["id"])
+            await client.request("balance")
+        await client.close()
+        return ids
+
+    async def scenario(socket_path):
+        results = await asyncio.gather(*(worker(socket_path, n) for n in range(8)))
+        return [transaction_id for ids in results for transaction_id in ids]
+
+    ids = asyncio.run(run_with_server(path, scenario))
+    assert sorted(ids) == list(range(1, 81))
+    with open(f"{path}.journal", encoding="utf-8") as journal:
+        assert len(journal.readlines()) - 1 < 80
+    reloaded = FinanceTracker(backend=CsvBackend(path))
+    assert sorted(reloaded.ids) == list(range(1, 81))
+    assert str(reloaded.get_balance()) == "-360.00"
+
+
+def test_pushdown_backend_is_rejected(tmpdir):
+    """Сервер не подключается к SQLite: сохранение выполняется только через журнал."""
+    with pytest.raises(ValueError):
+        TrackerService(FinanceTracker(backend=SqliteBackend(os.path.join(str(tmpdir), "data.db"))))
+
+
+def test_failed_group_is_rolled_back(tmpdir):
+    """Если запись группы не удалась, трекер и представление читателей не меняются."""
+    path = str(tmpdir.join("data.csv"))
+    CsvBackend(path).save_all(())
+    tracker = FinanceTracker(backend=CsvBackend(path))
+    backend = tracker.backend
+
+    async def scenario():
+        service = TrackerService(tracker)
+        await service.start()
+        apply = service.backend.apply
+
+        def failing_apply(operations):
+            service.backend.apply = apply
+            raise OSError("диск заполнен")
+        service.backend.apply = failing_apply
+        with pytest.raises(OSError):
+            await service.handle("add", {"amount": "5", "category": "Еда", "date": "2023-10-01", "type": "expense"})
+        view = service.view
+        assert len(tracker.transactions) == 0 and len(view) == 0
+        added = await service.handle("add", {"amount": "7", "category": "Еда", "date": "2023-10-02", "type": "expense"})
+        assert len(view) == 0 and service._balance(view) == "0"
+        assert service._balance(service.view) == "-7"
+        await service.close()
+        return added["id"]
+
+    added_id = asyncio.run(scenario())
+    assert tracker.backend is backend
+    assert list(tracker.ids) == [added_id]
+    assert list(FinanceTracker(backend=CsvBackend(path)).ids) == [added_id]
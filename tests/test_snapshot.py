@@ -0,0 +1,81 @@
+import csv
+import pytest
+from solution.finance_tracker import FinanceTracker
+from solution.snapshot import Snapshot, SnapshotError, csv_to_snapshot, snapshot_to_csv, write_snapshot
+from solution.transaction import Transaction
+
+
+ROWS = [
+    Transaction(50000, "Зарплата", "2023-10-01", "income"),
+    Transaction(1500.75, "Еда", "2023-10-02", "expense"),
+    Transaction(300, "Транспорт", "2023-11-05", "expense"),
+]
+
+
+def test_snapshot_roundtrip(tmpdir):
+    """Проверяет запись снапшота и чтение строк через mmap."""
+    path = str(tmpdir.join("data.snap"))
+    write_snapshot(path, [t.to_row() for t in ROWS])
+    with Snapshot(path) as snapshot:
+        assert len(snapshot) == 3
+        assert snapshot.categories == ["Зарплата", "Еда", "Транспорт"]
+        assert list(snapshot.rows()) == [t.to_row() for t in ROWS]
+        assert snapshot.row(1) == ROWS[1].to_row()
+        assert snapshot.totals() == (5000000, 180075)
+
+
+def test_snapshot_pure_python_totals(tmpdir, monkeypatch):
+    """Проверяет подсчет итогов без numpy."""
+    path = str(tmpdir.join("data.snap"))
+    write_snapshot(path, [t.to_row() for t in ROWS])
+    monkeypatch.setattr("solution.snapshot.optional_numpy", lambda: None)
+    with Snapshot(path) as snapshot:
+        assert snapshot.totals() == (5000000, 180075)
+
+
+def test_corrupted_snapshot_is_rejected(tmpdir):
+    """Проверяет, что поврежденный снапшот не загружается."""
+    path = str(tmpdir.join("data.snap"))
+    write_snapshot(path, [t.to_row() for t in ROWS])
+    with open(path, "r+b") as file:
+        file.seek(30)
+        file.write(b"\xff")
+    with pytest.raises(SnapshotError):
+        Snapshot(path)
+
+
+def test_tracker_snapshot_and_conversion(tmpdir):
+    """Проверяет загрузку трекера из снапшота и конвертацию в обе стороны."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    for t in ROWS:
+        tracker.add_transaction(t)
+    tracker.export_to_snapshot("data.snap")
+
+    loaded = FinanceTracker(columnar=True)
+    loaded.load_snapshot("data.snap")
+    assert list(loaded.transactions) == ROWS
+    assert loaded.get_balance() == tracker.get_balance()
+
+    snapshot_to_csv("files/data.snap", "files/data.csv")
+    with open("files/data.csv", encoding="utf-8") as file:
+        assert list(csv.reader(file))[2] == ["2023-10-02", "expense", "Еда", "1500.75", "2"]
+    csv_to_snapshot("files/data.csv", "files/copy.snap")
+    with Snapshot("files/copy.snap") as snapshot:
+        assert list(snapshot.rows()) == [t.to_row() for t in ROWS]
+
+
+def test_conversion_applies_journal(tmpdir):
+    """Конвертация CSV в снапшот учитывает журнал: удаленных строк нет, добавленные есть."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    for t in ROWS:
+        tracker.add_transaction(t)
+    tracker.export_to_csv("data.csv")
+    tracker.delete_transaction(0, "data.csv")
+    added = Transaction(7, "Кино", "2023-10-05", "expense")
+    tracker.add_transaction(added)
+    csv_to_snapshot("files/data.csv", "files/data.snap")
+    with Snapshot("files/data.snap") as snapshot:
+        assert list(snapshot.rows()) == list(tracker._rows())
+        assert snapshot.next_id == tracker.ids.next_id
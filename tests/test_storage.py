@@ -0,0 +1,129 @@
+import os
+import random
+import pytest
+from solution import storage
+from solution.finance_tracker import FinanceTracker
+from solution.snapshot import write_snapshot
+from solution.storage import SnapshotBackend, SqliteBackend
+from solution.transaction import Transaction
+
+
+CATEGORIES = ["Еда", "Транспорт", "Зарплата", "Жилье"]
+
+
+def random_transaction(rng):
+    """Создает случайную транзакцию."""
+    amount = rng.randint(1, 100000) / 100
+    date = f"2023-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return Transaction(amount, rng.choice(CATEGORIES), date, rng.choice(["income", "expense"]))
+
+
+def test_sqlite_queries_match_memory(tmpdir):
+    """Запросы в SQLite дают те же результаты, что и трекер в памяти."""
+    tmpdir.chdir()
+    rng = random.Random(7)
+    memory = FinanceTracker()
+    stored = FinanceTracker(backend=SqliteBackend("data.db"))
+    for _ in range(200):
+        action = rng.random()
+        size = len(memory.transactions)
+        index = rng.randrange(size) if size else 0
+        transaction = random_transaction(rng)
+        for tracker in (memory, stored):
+            if action < 0.6 or size == 0:
+                tracker.add_transaction(transaction)
+            elif action < 0.8:
+                tracker.edit_transaction(index, transaction)
+            else:
+                tracker.delete_transaction(index)
+    assert list(stored.transactions) == list(memory.transactions)
+    assert stored.get_balance() == memory.get_balance()
+    assert stored.get_category_totals("income") == memory.get_category_totals("income")
+    assert stored.get_monthly_totals(5, 2023) == memory.get_monthly_totals(5, 2023)
+    assert stored.get_quarterly_report(2, 2023) == memory.get_quarterly_report(2, 2023)
+    assert stored.get_transactions_by_category("Еда") == memory.get_transactions_by_category("Еда")
+
+
+def test_sqlite_persists_between_connections(tmpdir):
+    """Изменения сохраняются в базе без экспорта."""
+    tmpdir.chdir()
+    tracker = FinanceTracker(backend=SqliteBackend("data.db"))
+    tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense"))
+    tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income"))
+    tracker.edit_transaction(0, Transaction(250, "Еда", "2023-10-02", "expense"))
+    tracker.backend.close()
+
+    backend = SqliteBackend("data.db")
+    assert list(backend.rows()) == [
+        Transaction(250, "Еда", "2023-10-02", "expense").to_row(),
+        Transaction(50000, "Зарплата", "2023-10-01", "income").to_row(),
+    ]
+    assert backend.balance() == 4975000
+    backend.close()
+
+
+def test_sqlite_imports_csv(tmpdir):
+    """CSV-файл импортируется в базу порциями."""
+    tmpdir.chdir()
+    tracker = FinanceTracker()
+    for i in range(25):
+        tracker.add_transaction(Transaction(i + 1, "Еда", f"2023-10-{i + 1:02d}", "expense"))
+    tracker.export_to_csv("data.csv")
+    backend = SqliteBackend("data.db")
+    backend.import_csv("files/data.csv", chunk_size=10)
+    assert backend.count() == 25
+    assert FinanceTracker(backend=backend).get_balance() == tracker.get_balance()
+    backend.close()
+
+
+def test_sqlite_positions_without_offset_scans(tmpdir):
+    """Правка и удаление по позиции не сканируют таблицу; пакетное удаление не пересчитывает итоги."""
+    tmpdir.chdir()
+    memory = FinanceTracker()
+    stored = FinanceTracker(backend=SqliteBackend("data.db"))
+    statements = []
+    stored.backend.connection.set_trace_callback(statements.append)
+    for day in range(1, 21):
+        for tracker in (memory, stored):
+            tracker.add_transaction(Transaction(day, "Еда", f"2023-10-{day:02d}", "expense"))
+    for tracker in (memory, stored):
+        tracker.delete_transaction(19)  # Удаление строки с наибольшим id, затем добавление
+        tracker.add_transaction(Transaction(500, "Зарплата", "2023-10-25", "income"))
+        tracker.edit_transaction(3, Transaction(7, "Такси", "2023-10-04", "expense"))
+        with tracker.batch():
+            tracker.delete_transaction(0)
+            tracker.delete_transaction(10)
+    assert not [sql for sql in statements if "OFFSET" in sql or "GROUP BY" in sql]
+    assert list(stored.transactions) == list(memory.transactions)
+    assert list(stored.ids) == list(memory.ids)
+    assert stored.get_balance_at("2023-10-10") == memory.get_balance_at("2023-10-10")
+    assert stored.get_budget_report(10, 2023) == memory.get_budget_report(10, 2023)
+
+
+def test_snapshot_backend_persists_changes(tmpdir, monkeypatch):
+    """Добавление, правка и удаление через снапшот сохраняются; при ошибке записи трекер не меняется."""
+    tmpdir.chdir()
+    os.makedirs("files")
+    path = os.path.join("files", "data.snap")
+    write_snapshot(path, [])
+    tracker = FinanceTracker(backend=SnapshotBackend(path))
+    assert tracker.add_transaction(Transaction(100, "Еда", "2023-10-01", "expense")) == 1
+    assert tracker.add_transaction(Transaction(50000, "Зарплата", "2023-10-01", "income")) == 2
+    assert tracker.add_transaction(Transaction(300, "Такси", "2023-10-02", "expense")) == 3
+    tracker.edit_transaction_by_id(1, Transaction(250, "Еда", "2023-10-02", "expense"), "data.snap")
+    tracker.delete_transaction_by_id(2, "data.snap")
+
+    reloaded = FinanceTracker(backend=SnapshotBackend(path))
+    assert list(reloaded.ids) == [1, 3]
+    assert list(reloaded._rows()) == list(tracker._rows())
+
+    def failing_write(*args):
+        raise OSError("диск заполнен")
+    monkeypatch.setattr(storage, "write_snapshot", failing_write)
+    with pytest.raises(OSError):
+        tracker.add_transaction(Transaction(1, "Еда", "2023-10-03", "expense"))
+    with pytest.raises(OSError):
+        tracker.delete_transaction_by_id(3, "data.snap")
+    assert list(tracker.ids) == [1, 3] and tracker.get_balance() == -550
+    monkeypatch.undo()
+    assert tracker.add_transaction(Transaction(1, "Еда", "2023-10-03", "expense")) == 4
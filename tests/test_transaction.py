@@ -1,5 +1,7 @@
-from solution.transaction import Transaction
-from datetime import datetime
+import tracemalloc
+import pytest
+from solution.transaction import FrozenTransaction, Transaction
+from datetime import date, datetime
 
 
 def test_transaction_creation():
@@ -15,3 +17,30 @@ def test_transaction_str():
     transaction = Transaction(100, "Еда", "2023-10-01", "expense")
     expected_str = "2023-10-01 | EXPENSE | Еда: 100 руб."
     assert str(transaction) == expected_str
+
+
+def test_frozen_transaction_matches_transaction():
+    """FrozenTransaction равна Transaction с тем же содержимым и не изменяется."""
+    frozen = FrozenTransaction(100, "Еда", "2023-10-01", "expense")
+    transaction = Transaction(100, "Еда", "2023-10-01", "expense")
+    assert frozen == transaction and transaction == frozen
+    assert hash(frozen) == hash(transaction) == hash(frozen)
+    assert str(frozen) == str(transaction)
+    assert frozen.date == date(2023, 10, 1)
+    assert frozen == FrozenTransaction.from_row(transaction.to_row())
+    with pytest.raises(AttributeError):
+        frozen.amount_minor = 5
+
+
+def test_frozen_transaction_uses_less_than_half_memory():
+    """Компактная транзакция занимает меньше половины памяти Transaction."""
+    rows = [(738000 + i % 365, "expense", f"Категория {i % 10}", 10_000 + i) for i in range(10_000)]
+    used = {}
+    for cls in (Transaction, FrozenTransaction):
+        objects = [None] * len(rows)
+        tracemalloc.start()
+        for i, row in enumerate(rows):
+            objects[i] = cls.from_row(row)
+        used[cls] = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    assert used[FrozenTransaction] * 2 < used[Transaction]